@@ -1,10 +1,13 @@
-from typing import Callable
+from typing import Callable, Optional
 
-from fastapi import Request
+from fastapi import Request, WebSocket
+from sqlalchemy.ext.asyncio import AsyncEngine
 from src.config.settings import Settings, settings
+from src.cache.order_cache import OrderLookupCache
 from src.cache.pinecone_semantic import PineconeSemanticCache
-from src.persistence.mongo import Mongo
-from src.persistence.redis import RedisKV, RedisSessionStore
+from src.ingestion.jobs import IngestionJobManager
+from src.persistence.mongo import AsyncMongo
+from src.persistence.redis import RedisKV, RedisSessionStore, SessionEventBus
 
 
 def get_settings() -> Settings:
@@ -20,9 +23,30 @@ def get_session_store(request: Request) -> RedisSessionStore:
     return request.app.state.redis_session_store
 
 
+def get_ws_session_store(websocket: WebSocket) -> RedisSessionStore:
+    return websocket.app.state.redis_session_store
+
+
+def get_session_events(websocket: WebSocket) -> SessionEventBus:
+    return websocket.app.state.session_events
+
+
 def get_semantic_cache(request: Request) -> PineconeSemanticCache:
     return request.app.state.semantic_cache
 
 
-def get_mongo(request: Request) -> Mongo:
+def get_order_cache(request: Request) -> Optional[OrderLookupCache]:
+    return getattr(request.app.state, "order_cache", None)
+
+
+def get_ingest_jobs(request: Request) -> Optional[IngestionJobManager]:
+    return getattr(request.app.state, "ingest_jobs", None)
+
+
+def get_mongo(request: Request) -> AsyncMongo:
     return request.app.state.mongo
+
+
+def get_pg_engine(request: Request) -> Optional[AsyncEngine]:
+    # None when POSTGRES_DSN is unset or the app runs without its lifespan
+    return getattr(request.app.state, "pg_engine", None)
@@ -1,12 +1,18 @@
+import logging
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 
-from app.api.routes import auth, chat, ingest_docs, ingest_tabular, sessions, escalations
+from app.api.routes import auth, chat, ingest_docs, ingest_jobs, ingest_tabular, orders, sessions, escalations
 from src.config.logging import configure_logging
 from src.config.settings import settings
+from src.cache.order_cache import OrderLookupCache
 from src.cache.pinecone_semantic import PineconeSemanticCache
-from src.persistence.mongo import Mongo
-from src.persistence.redis import RedisKV, RedisSessionStore
+from src.ingestion.jobs import IngestionJobManager
+from src.persistence.mongo import AsyncMongo
+from src.persistence.postgres.client import create_async_engine_from_dsn
+from src.persistence.redis import RedisKV, RedisSessionStore, SessionEventBus
+
+logger = logging.getLogger(__name__)
 
 
 @asynccontextmanager
@@ -17,6 +23,7 @@ async def lifespan(app: FastAPI):
         settings.redis_url,
         recent_window=settings.recent_messages_window,
         ttl_days=settings.session_redis_ttl_days,
+        archive_grace_seconds=settings.session_archive_grace_seconds,
         kv_client=redis_kv,
     )
     semantic_cache = PineconeSemanticCache(
@@ -24,24 +31,62 @@ async def lifespan(app: FastAPI):
         namespace=settings.semantic_cache_namespace,
         similarity_threshold=settings.semantic_cache_similarity_threshold,
     )
-    mongo = Mongo(settings.mongodb_uri, db_name="ecomm")
+    order_cache = OrderLookupCache(
+        redis_kv,
+        max_entries=settings.order_cache_max_entries,
+        local_ttl_seconds=settings.order_cache_local_ttl_seconds,
+        ttl_seconds=settings.order_cache_ttl_seconds,
+    )
+    mongo = AsyncMongo(settings.mongodb_uri, db_name="ecomm", **settings.mongo_client_options())
+    try:
+        await mongo.ensure_indexes()
+    except Exception:
+        # Mongo may come up after the API; indexes are created on the next start
+        logger.warning("mongo.ensure_indexes_failed", exc_info=True)
+    session_events = SessionEventBus(settings.redis_url)
+    pg_engine = (
+        create_async_engine_from_dsn(
+            settings.postgres_dsn,
+            pool_size=settings.postgres_pool_size,
+            max_overflow=settings.postgres_max_overflow,
+            pool_timeout=settings.postgres_pool_timeout,
+            statement_timeout_ms=settings.postgres_statement_timeout_ms,
+            prepare_threshold=settings.postgres_prepare_threshold,
+        )
+        if settings.postgres_dsn
+        else None
+    )
 
     app.state.redis_kv = redis_kv
     app.state.redis_session_store = redis_session_store
     app.state.semantic_cache = semantic_cache
+    app.state.order_cache = order_cache
     app.state.mongo = mongo
+    app.state.session_events = session_events
+    app.state.pg_engine = pg_engine
+    app.state.ingest_jobs = IngestionJobManager(
+        max_workers=settings.ingest_job_workers,
+        max_jobs=settings.ingest_job_history,
+    )
 
     try:
         yield
     finally:
+        app.state.ingest_jobs.shutdown()
         try:
             redis_kv.client.close()
         except Exception:
             pass
         try:
-            mongo.client.close()
+            await mongo.close()
+        except Exception:
+            pass
+        try:
+            await session_events.close()
         except Exception:
             pass
+        if pg_engine is not None:
+            await pg_engine.dispose()
 
 
 def create_app() -> FastAPI:
@@ -54,8 +99,10 @@ def create_app() -> FastAPI:
     app.include_router(chat.router, prefix="/v1")
     app.include_router(ingest_docs.router, prefix="/v1")
     app.include_router(ingest_tabular.router, prefix="/v1")
+    app.include_router(ingest_jobs.router, prefix="/v1")
     app.include_router(sessions.router, prefix="/v1")
     app.include_router(escalations.router, prefix="/v1")
+    app.include_router(orders.router, prefix="/v1")
 
     @app.get("/health")
     async def health(request: Request) -> dict:
@@ -69,7 +116,7 @@ def create_app() -> FastAPI:
             status["status"] = "degraded"
         # Mongo
         try:
-            request.app.state.mongo.client.admin.command("ping")
+            await request.app.state.mongo.ping()
             status["mongo"] = "ok"
         except Exception as e:
             status["mongo"] = f"error:{e.__class__.__name__}"
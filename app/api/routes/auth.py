@@ -1,16 +1,16 @@
+from typing import Optional
+
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel
-from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
 
+from app.api.deps import get_pg_engine
 from src.config.settings import settings
-from src.persistence.postgres.client import create_sync_engine
-from src.persistence.postgres.queries import verify_user_credentials
+from src.persistence.postgres.queries import averify_user_credentials
 
 
 router = APIRouter(tags=["auth"])
 
-_ENGINE = create_sync_engine(settings.postgres_dsn) if settings.postgres_dsn else None
-
 
 class LoginRequest(BaseModel):
     email: str
@@ -23,14 +23,11 @@ class LoginResponse(BaseModel):
 
 
 @router.post("/auth/login", response_model=LoginResponse)
-async def login(payload: LoginRequest) -> LoginResponse:
+async def login(
+    payload: LoginRequest,
+    engine: Optional[AsyncEngine] = Depends(get_pg_engine),
+) -> LoginResponse:
     """Authenticate a user and return user details."""
-    if not _ENGINE:
-        raise HTTPException(
-            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
-            detail="Database not configured",
-        )
-
     admin_email = settings.admin_email.strip()
     admin_passcode = settings.admin_passcode.strip()
     if admin_email and admin_passcode:
@@ -45,8 +42,14 @@ async def login(payload: LoginRequest) -> LoginResponse:
                 },
             )
 
-    user = verify_user_credentials(
-        _ENGINE, user_id=payload.email, passcode=payload.passcode
+    if engine is None:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Database not configured",
+        )
+
+    user = await averify_user_credentials(
+        engine, user_id=payload.email, passcode=payload.passcode
     )
     if not user:
         raise HTTPException(
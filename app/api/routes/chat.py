@@ -1,11 +1,13 @@
 from datetime import datetime, timezone
-from typing import List, Optional
+from typing import Any, Dict, List, Optional
 from uuid import uuid4
 
 from fastapi import APIRouter, Depends, HTTPException, status
 from pydantic import BaseModel, Field
+from sqlalchemy.ext.asyncio import AsyncEngine
 
-from app.api.deps import get_session_store, get_semantic_cache
+from app.api.deps import get_order_cache, get_pg_engine, get_session_store, get_semantic_cache
+from src.cache.order_cache import OrderLookupCache
 from src.cache.pinecone_semantic import PineconeSemanticCache
 from src.persistence.redis import RedisSessionStore
 from src.graph.graph import build_graph
@@ -54,6 +56,8 @@ async def chat_endpoint(
     payload: ChatRequest,
     session_store: RedisSessionStore = Depends(get_session_store),
     semantic_cache: PineconeSemanticCache = Depends(get_semantic_cache),
+    pg_engine: Optional[AsyncEngine] = Depends(get_pg_engine),
+    order_cache: Optional[OrderLookupCache] = Depends(get_order_cache),
 ) -> ChatResponse:
     if not payload.user_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="user_id is required")
@@ -62,12 +66,16 @@ async def chat_endpoint(
 
     session_id = payload.session_id or generate_readable_session_id(payload.user_id)
 
-    meta = session_store.read_session_meta(session_id)
+    meta, recent_messages = session_store.load_turn_context(session_id)
+    pending_messages: List[Dict[str, Any]] = []
+    register_user: Optional[str] = None
     now = datetime.now(timezone.utc)
     if meta:
         stored_user = meta.get("user_id")
         if stored_user and stored_user != payload.user_id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Session does not belong to user")
+        if meta.get("status") == "closing":
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Session is closed")
     else:
         meta = {
             "user_id": payload.user_id,
@@ -77,35 +85,32 @@ async def chat_endpoint(
             "summary_message_count": 0,
             "greeting_sent": False,
         }
-        session_store.write_session_meta(session_id, meta)
-        session_store.register_session(session_id, payload.user_id)
+        register_user = payload.user_id
 
     first_name = meta.get("first_name")
     last_name = meta.get("last_name")
-    meta_dirty = False
     if not first_name and not last_name:
         derived_first, derived_last = derive_name_from_email(payload.user_id)
         if derived_first:
             meta["first_name"] = derived_first
             first_name = derived_first
-            meta_dirty = True
         if derived_last:
             meta["last_name"] = derived_last
             last_name = derived_last
-            meta_dirty = True
 
     if not meta.get("greeting_sent"):
         greeting_name = first_name or "there"
         greeting_text = f"Hello {greeting_name}, how can I assist you today!"
         greeting_ts = datetime.now(timezone.utc)
-        session_store.append_message(
-            session_id,
-            {
-                "role": "assistant",
-                "content": greeting_text,
-                "created_at": greeting_ts.isoformat(),
-            },
-        )
+        greeting = {
+            "role": "assistant",
+            "content": greeting_text,
+            "created_at": greeting_ts.isoformat(),
+        }
+        pending_messages.append(greeting)
+        recent_messages.append(greeting)
+        if session_store.recent_window:
+            recent_messages = recent_messages[-session_store.recent_window:]
         meta.update(
             {
                 "greeting_sent": True,
@@ -114,21 +119,21 @@ async def chat_endpoint(
                 "message_count": int(meta.get("message_count", 0)) + 1,
             }
         )
-        meta_dirty = True
 
-    if meta_dirty:
-        session_store.write_session_meta(session_id, meta)
+    if register_user or pending_messages:
+        # Create the session before the graph runs so a failed turn still
+        # leaves it registered, with its greeting, for the user to come back to.
+        session_store.commit_turn(session_id, meta, pending_messages, user_id=register_user)
+        pending_messages = []
 
-    recent_messages = session_store.get_recent_messages(session_id)
     session_summary = meta.get("session_summary")
     summary_message_count = int(meta.get("summary_message_count") or 0)
 
     session_status = meta.get("status", "active")
     if session_status in {"pending_handoff", "live_agent"}:
         user_ts = datetime.now(timezone.utc)
-        session_store.append_message(
-            session_id,
-            {"role": "user", "content": payload.query, "created_at": user_ts.isoformat()},
+        pending_messages.append(
+            {"role": "user", "content": payload.query, "created_at": user_ts.isoformat()}
         )
         meta.update(
             {
@@ -137,8 +142,7 @@ async def chat_endpoint(
                 "message_count": int(meta.get("message_count", 0)) + 1,
             }
         )
-        session_store.write_session_meta(session_id, meta)
-        session_store.touch_session(session_id)
+        session_store.commit_turn(session_id, meta, pending_messages)
         return ChatResponse(
             session_id=session_id,
             answer="",
@@ -156,10 +160,12 @@ async def chat_endpoint(
         recent_messages=recent_messages,
         session_summary=session_summary,
         semantic_cache=semantic_cache,
+        pg_engine=pg_engine,
+        order_cache=order_cache,
         first_name=meta.get("first_name"),
         last_name=meta.get("last_name"),
     )
-    out = _graph.invoke(state)
+    out = await _graph.ainvoke(state)
 
     # Normalize graph output to a dict
     out_dict = {}  # type: ignore[var-annotated]
@@ -185,9 +191,8 @@ async def chat_endpoint(
             continue
 
     now = datetime.now(timezone.utc)
-    session_store.append_message(
-        session_id,
-        {"role": "user", "content": payload.query, "created_at": now.isoformat()},
+    pending_messages.append(
+        {"role": "user", "content": payload.query, "created_at": now.isoformat()}
     )
 
     should_escalate = bool(out_dict.get("should_escalate", False))
@@ -201,9 +206,8 @@ async def chat_endpoint(
             answer = ESCALATION_MESSAGE
 
     assistant_ts = datetime.now(timezone.utc)
-    session_store.append_message(
-        session_id,
-        {"role": "assistant", "content": answer, "created_at": assistant_ts.isoformat()},
+    pending_messages.append(
+        {"role": "assistant", "content": answer, "created_at": assistant_ts.isoformat()}
     )
     meta_message_count = int(meta.get("message_count", 0)) + 2
     meta.update(
@@ -216,6 +220,9 @@ async def chat_endpoint(
         }
     )
 
+    if out_dict.get("query_type") == "billing_issue":
+        meta["billing_issue"] = True
+
     notify_slack = False
     if should_escalate:
         previous_status = meta.get("status") or "active"
@@ -236,7 +243,10 @@ async def chat_endpoint(
         and meta_message_count > summary_message_count
     ):
         history_limit = settings.session_summary_history_limit * 2
-        history_messages = session_store.get_all_messages(session_id, limit=history_limit)
+        # The current turn is not persisted yet; read only the stored prefix we need.
+        stored_limit = history_limit - len(pending_messages)
+        history_messages = session_store.get_all_messages(session_id, limit=stored_limit) + pending_messages
+        history_messages = history_messages[-history_limit:]
         summary_payload = [
             {
                 "role": msg.get("role", "user"),
@@ -251,11 +261,14 @@ async def chat_endpoint(
                 meta["session_summary"] = summary_text
                 meta["summary_message_count"] = meta_message_count
 
-    session_store.write_session_meta(session_id, meta)
-    session_store.touch_session(session_id)
+    session_store.commit_turn(
+        session_id,
+        meta,
+        pending_messages,
+        escalate=notify_slack,
+    )
 
     if notify_slack:
-        session_store.enqueue_escalation(session_id)
         session_link = ""
         if settings.frontend_base_url:
             session_link = f"{settings.frontend_base_url.rstrip('/')}/?session_id={session_id}&view=agent"
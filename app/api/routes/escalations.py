@@ -28,6 +28,8 @@ class EscalationSummary(BaseModel):
 
 class EscalationListResponse(BaseModel):
     escalations: List[EscalationSummary] = Field(default_factory=list)
+    next_cursor: str | None = None
+    next_agent_cursor: int | None = None
 
 
 class ClaimEscalationRequest(BaseModel):
@@ -45,6 +47,16 @@ class AgentMessageResponse(BaseModel):
     messages: List[Dict[str, Any]] = Field(default_factory=list)
 
 
+class NextEscalationRequest(BaseModel):
+    agent_id: str
+
+
+class EscalationMetricsResponse(BaseModel):
+    depth: int = 0
+    oldest_wait_seconds: float = 0.0
+    waiting_over_seconds: Dict[str, int] = Field(default_factory=dict)
+
+
 class EscalationDetailResponse(BaseModel):
     escalation: EscalationSummary
     messages: List[Dict[str, Any]] = Field(default_factory=list)
@@ -65,23 +77,85 @@ def _serialize_meta(meta: Dict[str, Any]) -> EscalationSummary:
     )
 
 
+def _assign_agent(
+    session_store: RedisSessionStore,
+    session_id: str,
+    meta: Dict[str, Any],
+    agent_id: str,
+) -> EscalationSummary:
+    now = datetime.now(timezone.utc).isoformat()
+    meta.update(
+        {
+            "status": "live_agent",
+            "agent_id": agent_id,
+            "claimed_at": now,
+            "last_updated": now,
+        }
+    )
+    session_store.write_session_meta(session_id, meta)
+    session_store.dequeue_escalation(session_id)
+    session_store.assign_agent_session(session_id, agent_id)
+    session_store.publish_status(session_id, meta)
+    return _serialize_meta(meta)
+
+
 @router.get("/escalations", response_model=EscalationListResponse)
 async def list_escalations(
     agent_id: str | None = Query(default=None),
+    limit: int = Query(50, ge=1, le=200),
+    cursor: str | None = Query(default=None),
+    agent_cursor: int | None = Query(default=None, ge=0),
     session_store: RedisSessionStore = Depends(get_session_store),
 ) -> EscalationListResponse:
-    metas = session_store.list_escalations()
-    if agent_id:
-        agent_metas = session_store.list_agent_sessions(agent_id)
-    else:
-        agent_metas = []
+    # The queue and the agent's claimed sessions page independently; after the
+    # first page each is only read while the caller still holds its cursor.
+    first_page = cursor is None and agent_cursor is None
+    next_cursor: str | None = None
+    metas: List[Dict[str, Any]] = []
+    if first_page or cursor is not None:
+        next_cursor, metas = session_store.scan_escalations(cursor=cursor, count=limit)
+    next_agent_cursor = 0
+    agent_metas: List[Dict[str, Any]] = []
+    if agent_id and (first_page or agent_cursor is not None):
+        next_agent_cursor, agent_metas = session_store.scan_agent_sessions(
+            agent_id, cursor=agent_cursor or 0, count=limit
+        )
 
     combined: Dict[str, Dict[str, Any]] = {}
     for meta in metas + agent_metas:
         sid = str(meta.get("session_id"))
         combined[sid] = meta
     summaries = [_serialize_meta(meta) for meta in combined.values()]
-    return EscalationListResponse(escalations=summaries)
+    return EscalationListResponse(
+        escalations=summaries,
+        next_cursor=next_cursor,
+        next_agent_cursor=next_agent_cursor or None,
+    )
+
+
+@router.get("/escalations/metrics", response_model=EscalationMetricsResponse)
+async def escalation_metrics(
+    session_store: RedisSessionStore = Depends(get_session_store),
+) -> EscalationMetricsResponse:
+    return EscalationMetricsResponse(**session_store.escalation_queue_stats())
+
+
+@router.post("/escalations/next", response_model=EscalationSummary)
+async def claim_next_escalation(
+    payload: NextEscalationRequest,
+    session_store: RedisSessionStore = Depends(get_session_store),
+) -> EscalationSummary:
+    if not payload.agent_id:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="agent_id is required")
+
+    while True:
+        session_id = session_store.pop_next_escalation()
+        if session_id is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="No pending escalations")
+        meta = session_store.read_session_meta(session_id)
+        # Skip ids whose session expired or was closed while queued
+        if meta and meta.get("status") in {"pending_handoff", "live_agent"}:
+            return _assign_agent(session_store, session_id, meta, payload.agent_id)
 
 
 @router.get("/escalations/{session_id}", response_model=EscalationDetailResponse)
@@ -113,19 +187,7 @@ async def claim_escalation(
     if status_value not in {"pending_handoff", "live_agent"}:
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Session is not escalated")
 
-    now = datetime.now(timezone.utc).isoformat()
-    meta.update(
-        {
-            "status": "live_agent",
-            "agent_id": payload.agent_id,
-            "claimed_at": now,
-            "last_updated": now,
-        }
-    )
-    session_store.write_session_meta(session_id, meta)
-    session_store.dequeue_escalation(session_id)
-    session_store.assign_agent_session(session_id, payload.agent_id)
-    return _serialize_meta(meta)
+    return _assign_agent(session_store, session_id, meta, payload.agent_id)
 
 
 @router.post("/escalations/{session_id}/messages", response_model=AgentMessageResponse)
@@ -161,8 +223,6 @@ async def agent_send_message(
         "session_id": session_id,
         "agent_id": payload.agent_id,
     }
-    session_store.append_message(session_id, message)
-
     meta.update(
         {
             "status": "live_agent",
@@ -173,8 +233,7 @@ async def agent_send_message(
             "message_count": int(meta.get("message_count", 0)) + 1,
         }
     )
-    session_store.write_session_meta(session_id, meta)
-    session_store.touch_session(session_id)
+    session_store.commit_turn(session_id, meta, [message])
     session_store.assign_agent_session(session_id, meta.get("agent_id", ""))
 
     messages = session_store.get_all_messages(session_id)
@@ -1,9 +1,11 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, status
 from pydantic import BaseModel
 
-from app.api.deps import get_settings
+from app.api.deps import get_ingest_jobs
+from app.api.routes.ingest_jobs import IngestDocsJobRequest, require_ingest_jobs, submit_docs_job
+from src.ingestion.jobs import IngestionJobManager
 
 
 router = APIRouter(tags=["ingestion"])
@@ -17,12 +19,14 @@ class IngestDocsRequest(BaseModel):
 class IngestResponse(BaseModel):
     status: str
     chunks_indexed: int = 0
+    job_id: Optional[str] = None
 
 
-@router.post("/ingest/docs", response_model=IngestResponse)
-async def ingest_docs(payload: IngestDocsRequest, settings=Depends(get_settings)) -> IngestResponse:
-    """Stub for document ingestion. Will call ingestion pipeline in later steps."""
-    # TODO: wire to src/ingestion/documents/pipeline.py and Pinecone store
-    return IngestResponse(status="accepted", chunks_indexed=0)
-
-
+@router.post("/ingest/docs", response_model=IngestResponse, status_code=status.HTTP_202_ACCEPTED)
+async def ingest_docs(
+    payload: IngestDocsRequest,
+    jobs: Optional[IngestionJobManager] = Depends(get_ingest_jobs),
+) -> IngestResponse:
+    """Queue document ingestion; poll ``GET /ingest/jobs/{job_id}`` for progress."""
+    job = submit_docs_job(require_ingest_jobs(jobs), IngestDocsJobRequest(sources=payload.sources, namespace=payload.namespace))
+    return IngestResponse(status="accepted", job_id=job.id)
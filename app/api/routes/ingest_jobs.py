@@ -0,0 +1,148 @@
+import asyncio
+import time
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel
+
+from app.api.deps import get_ingest_jobs, get_order_cache
+from app.api.routes.ingest_tabular import IngestTabularRequest
+from src.cache.order_cache import OrderLookupCache
+from src.ingestion.documents.pipeline import ingest_files_with_preprocessing
+from src.ingestion.jobs import IngestionJob, IngestionJobManager
+from src.ingestion.progress import IngestionProgress
+from src.ingestion.tabular.loader import close_engine, create_engine_from_dsn, load_csvs
+
+
+router = APIRouter(tags=["ingestion"])
+
+
+class IngestDocsJobRequest(BaseModel):
+    sources: List[str]
+    namespace: Optional[str] = None
+    semantic: bool = True
+    # Remove vectors of previously indexed sources not listed in this request
+    prune: bool = False
+
+
+class JobProgress(BaseModel):
+    stage: str
+    docs_processed: int = 0
+    chunks_embedded: int = 0
+    vectors_upserted: int = 0
+    rows_loaded: int = 0
+    units_done: int = 0
+    units_total: int = 0
+    elapsed_seconds: float = 0.0
+    eta_seconds: Optional[float] = None
+
+
+class IngestJobResponse(BaseModel):
+    job_id: str
+    kind: str
+    status: str
+    params: Dict[str, Any]
+    progress: JobProgress
+    result: Optional[Dict[str, Any]] = None
+    error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+
+
+def _job_response(job: IngestionJob) -> IngestJobResponse:
+    return IngestJobResponse(**job.snapshot())
+
+
+def require_ingest_jobs(jobs: Optional[IngestionJobManager]) -> IngestionJobManager:
+    if jobs is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Ingestion jobs are not configured")
+    return jobs
+
+
+def submit_docs_job(jobs: IngestionJobManager, payload: IngestDocsJobRequest) -> IngestionJob:
+    def run(progress: IngestionProgress) -> Dict[str, Any]:
+        upserted = ingest_files_with_preprocessing(
+            payload.sources,
+            payload.namespace,
+            semantic=payload.semantic,
+            prune=payload.prune,
+            progress=progress,
+        )
+        return {"vectors_upserted": upserted}
+
+    return jobs.submit("docs", run, payload.model_dump())
+
+
+def submit_csv_job(
+    jobs: IngestionJobManager,
+    payload: IngestTabularRequest,
+    order_cache: Optional[OrderLookupCache],
+) -> IngestionJob:
+    async def load(progress: IngestionProgress) -> int:
+        engine = create_engine_from_dsn(payload.dsn)
+        try:
+            return await load_csvs(
+                engine,
+                payload.customers_csv_path,
+                payload.orders_csv_path,
+                payload.products_csv_path,
+                mode=payload.mode,
+                order_cache=order_cache,
+                progress=progress,
+            )
+        finally:
+            await close_engine(engine)
+
+    def run(progress: IngestionProgress) -> Dict[str, Any]:
+        # A loop of its own in the job thread: COPY parsing never stalls the API loop
+        started = time.perf_counter()
+        rows = asyncio.run(load(progress))
+        elapsed = time.perf_counter() - started
+        return {"rows_loaded": rows, "rows_per_second": round(rows / elapsed, 1) if elapsed else 0.0}
+
+    # The DSN carries credentials; keep it out of job listings
+    return jobs.submit("csv", run, payload.model_dump(exclude={"dsn"}))
+
+
+@router.post("/ingest/jobs/docs", response_model=IngestJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_docs_job(
+    payload: IngestDocsJobRequest,
+    jobs: Optional[IngestionJobManager] = Depends(get_ingest_jobs),
+) -> IngestJobResponse:
+    """Queue preprocessing, chunking and indexing of documents into Pinecone."""
+    return _job_response(submit_docs_job(require_ingest_jobs(jobs), payload))
+
+
+@router.post("/ingest/jobs/csv", response_model=IngestJobResponse, status_code=status.HTTP_202_ACCEPTED)
+async def create_csv_job(
+    payload: IngestTabularRequest,
+    jobs: Optional[IngestionJobManager] = Depends(get_ingest_jobs),
+    order_cache: Optional[OrderLookupCache] = Depends(get_order_cache),
+) -> IngestJobResponse:
+    """Queue a CSV load into Postgres; see ``POST /ingest/csv`` for the modes."""
+    return _job_response(submit_csv_job(require_ingest_jobs(jobs), payload, order_cache))
+
+
+@router.get("/ingest/jobs", response_model=List[IngestJobResponse])
+async def list_jobs(jobs: Optional[IngestionJobManager] = Depends(get_ingest_jobs)) -> List[IngestJobResponse]:
+    """Recent jobs accepted by this API worker, newest first."""
+    return [_job_response(job) for job in require_ingest_jobs(jobs).list()]
+
+
+@router.get("/ingest/jobs/{job_id}", response_model=IngestJobResponse)
+async def get_job(job_id: str, jobs: Optional[IngestionJobManager] = Depends(get_ingest_jobs)) -> IngestJobResponse:
+    job = require_ingest_jobs(jobs).get(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return _job_response(job)
+
+
+@router.post("/ingest/jobs/{job_id}/cancel", response_model=IngestJobResponse)
+async def cancel_job(job_id: str, jobs: Optional[IngestionJobManager] = Depends(get_ingest_jobs)) -> IngestJobResponse:
+    """Cancel a queued job, or stop a running one at its next file or batch."""
+    job = require_ingest_jobs(jobs).cancel(job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return _job_response(job)
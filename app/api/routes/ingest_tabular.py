@@ -1,9 +1,11 @@
-from typing import Optional
+import time
+from typing import Literal, Optional
 
 from fastapi import APIRouter, Depends, HTTPException
 from pydantic import BaseModel
 
-from app.api.deps import get_settings
+from app.api.deps import get_order_cache, get_settings
+from src.cache.order_cache import OrderLookupCache
 from src.ingestion.tabular.loader import create_engine_from_dsn, load_csvs, close_engine
 
 
@@ -15,26 +17,42 @@ class IngestTabularRequest(BaseModel):
     customers_csv_path: Optional[str] = None
     orders_csv_path: Optional[str] = None
     products_csv_path: Optional[str] = None
+    # "copy" streams rows with COPY FROM STDIN; use it for large files.
+    # "upsert" merges into the live tables and only counts changed rows.
+    mode: Literal["insert", "copy", "upsert"] = "insert"
 
 
 class IngestResponse(BaseModel):
     status: str
     rows_loaded: int = 0
+    rows_per_second: float = 0.0
 
 
 @router.post("/ingest/csv", response_model=IngestResponse)
-async def ingest_tabular(payload: IngestTabularRequest, settings=Depends(get_settings)) -> IngestResponse:
+async def ingest_tabular(
+    payload: IngestTabularRequest,
+    settings=Depends(get_settings),
+    order_cache: Optional[OrderLookupCache] = Depends(get_order_cache),
+) -> IngestResponse:
     """Load CSV data into Postgres database."""
     try:
         engine = create_engine_from_dsn(payload.dsn)
+        started = time.perf_counter()
         rows = await load_csvs(
             engine, 
             payload.customers_csv_path, 
             payload.orders_csv_path, 
-            payload.products_csv_path
+            payload.products_csv_path,
+            mode=payload.mode,
+            order_cache=order_cache,
         )
+        elapsed = time.perf_counter() - started
         await close_engine(engine)
-        return IngestResponse(status="success", rows_loaded=rows)
+        return IngestResponse(
+            status="success",
+            rows_loaded=rows,
+            rows_per_second=round(rows / elapsed, 1) if elapsed else 0.0,
+        )
     except Exception as e:
         raise HTTPException(status_code=400, detail=f"Ingestion failed: {str(e)}")
 
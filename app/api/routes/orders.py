@@ -0,0 +1,32 @@
+from __future__ import annotations
+
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, status
+from pydantic import BaseModel
+
+from app.api.deps import get_order_cache
+from src.cache.order_cache import OrderLookupCache
+
+
+router = APIRouter(tags=["orders"])
+
+
+class OrderCacheMetricsResponse(BaseModel):
+    local_hits: int
+    redis_hits: int
+    misses: int
+    invalidations: int
+    errors: int
+    local_entries: int
+    hit_ratio: float
+
+
+@router.get("/orders/cache/metrics", response_model=OrderCacheMetricsResponse)
+async def order_cache_metrics(
+    order_cache: Optional[OrderLookupCache] = Depends(get_order_cache),
+) -> OrderCacheMetricsResponse:
+    if order_cache is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Order cache is not configured")
+    # Counters are per API worker; scrape every worker for totals
+    return OrderCacheMetricsResponse(**order_cache.stats())
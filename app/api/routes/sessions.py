@@ -1,18 +1,19 @@
 from __future__ import annotations
 
+import asyncio
 from datetime import datetime, timezone
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 from uuid import uuid4
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from fastapi import APIRouter, Depends, HTTPException, Query, WebSocket, WebSocketDisconnect, status
 from pydantic import BaseModel, Field
 
-from app.api.deps import get_mongo, get_session_store
-from src.persistence.mongo import Mongo
-from src.persistence.redis import RedisSessionStore
-from src.utils.summarize import summarize_messages
+from app.api.deps import get_mongo, get_session_events, get_session_store, get_ws_session_store
+from src.persistence.mongo import AsyncMongo
+from src.persistence.redis import RedisSessionStore, SessionEventBus
 from src.config.settings import settings
 from src.utils.ids import generate_readable_session_id
+from src.workers.archiver import aarchive_session
 
 
 router = APIRouter(tags=["sessions"])
@@ -70,6 +71,30 @@ def _serialize_message(doc: Dict[str, Any]) -> Dict[str, Any]:
     return out
 
 
+# Message cursors are tagged with the store that issued them: a Redis ``seq``
+# while the session is live, a Mongo keyset token once it has been archived.
+_REDIS_CURSOR_PREFIX = "r:"
+_MONGO_CURSOR_PREFIX = "m:"
+
+
+def _parse_message_cursor(cursor: Optional[str]) -> Tuple[Optional[int], Optional[str]]:
+    """Split a messages cursor into ``(redis_seq, mongo_token)``."""
+
+    if not cursor:
+        return None, None
+    if cursor.startswith(_MONGO_CURSOR_PREFIX):
+        return None, cursor[len(_MONGO_CURSOR_PREFIX) :] or None
+    raw = cursor[len(_REDIS_CURSOR_PREFIX) :] if cursor.startswith(_REDIS_CURSOR_PREFIX) else cursor
+    if raw.isdigit():
+        return int(raw), None
+    # Untagged cursors from before the prefixes were Mongo tokens
+    return None, cursor
+
+
+def _tag_cursor(prefix: str, value: Optional[Any]) -> Optional[str]:
+    return f"{prefix}{value}" if value is not None else None
+
+
 class SessionCreateRequest(BaseModel):
     user_id: str
     session_id: Optional[str] = None
@@ -86,6 +111,7 @@ class SessionCreateResponse(BaseModel):
 
 class SessionListResponse(BaseModel):
     sessions: List[Dict[str, Any]] = Field(default_factory=list)
+    next_cursor: Optional[int] = None
 
 
 class SessionMessagesResponse(BaseModel):
@@ -108,7 +134,7 @@ class SessionCloseResponse(BaseModel):
 async def create_session_endpoint(
     payload: SessionCreateRequest,
     session_store: RedisSessionStore = Depends(get_session_store),
-    mongo: Mongo = Depends(get_mongo),
+    mongo: AsyncMongo = Depends(get_mongo),
 ) -> SessionCreateResponse:
     if not payload.user_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="user_id is required")
@@ -118,7 +144,7 @@ async def create_session_endpoint(
     if redis_meta and redis_meta.get("user_id") not in (None, payload.user_id):
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Session ID already in use")
 
-    existing = mongo.get_session(session_id)
+    existing = await mongo.get_session(session_id)
     if existing and existing.get("user_id") not in (None, payload.user_id):
         raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail="Session ID already in use")
 
@@ -148,12 +174,13 @@ async def list_sessions_endpoint(
     user_id: str = Query(..., description="Filter by user id"),
     limit: int = Query(20, ge=1, le=100),
     include_closed: bool = Query(False),
+    cursor: int = Query(0, ge=0),
     session_store: RedisSessionStore = Depends(get_session_store),
-    mongo: Mongo = Depends(get_mongo),
+    mongo: AsyncMongo = Depends(get_mongo),
 ) -> SessionListResponse:
-    active_metas = session_store.list_sessions(user_id)
+    next_cursor, active_metas = session_store.scan_sessions(user_id, cursor=cursor, count=limit)
     active_docs: List[Dict[str, Any]] = []
-    for meta in active_metas[:limit]:
+    for meta in active_metas:
         session_id = meta.get("session_id")
         created_at = _parse_datetime(meta.get("created_at"))
         last_updated = _parse_datetime(meta.get("last_updated"))
@@ -188,17 +215,17 @@ async def list_sessions_endpoint(
         doc.update(extra_keys)
         active_docs.append(doc)
 
-    remaining = max(limit - len(active_docs), 0)
+    # Closed sessions follow the last page of active ones; an SSCAN page can
+    # run past ``limit``, so active sessions are never trimmed to fit.
+    remaining = limit - len(active_docs)
     closed_docs: List[Dict[str, Any]] = []
-    if include_closed and remaining >= 0:
-        closed = mongo.list_sessions(user_id, limit=remaining, include_closed=True)
-        closed_docs = closed
+    if include_closed and next_cursor == 0 and remaining > 0:
+        closed_docs = await mongo.list_sessions(user_id, limit=remaining, include_closed=True)
 
     combined = [_serialize_session(doc) for doc in active_docs]
-    if include_closed:
-        combined.extend(_serialize_session(doc) for doc in closed_docs)
+    combined.extend(_serialize_session(doc) for doc in closed_docs)
 
-    return SessionListResponse(sessions=combined[:limit])
+    return SessionListResponse(sessions=combined, next_cursor=next_cursor or None)
 
 
 @router.get("/sessions/{session_id}/messages", response_model=SessionMessagesResponse)
@@ -207,7 +234,7 @@ async def get_session_messages_endpoint(
     user_id: str = Query(..., description="Must match the session owner"),
     limit: int = Query(50, ge=1, le=200),
     cursor: Optional[str] = Query(None),
-    mongo: Mongo = Depends(get_mongo),
+    mongo: AsyncMongo = Depends(get_mongo),
     session_store: RedisSessionStore = Depends(get_session_store),
 ) -> SessionMessagesResponse:
     meta = session_store.read_session_meta(session_id)
@@ -215,9 +242,8 @@ async def get_session_messages_endpoint(
         stored_user = meta.get("user_id")
         if stored_user != user_id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Session does not belong to user")
-        history = session_store.get_all_messages(session_id)
-        if limit:
-            history = history[-limit:]
+        before, _ = _parse_message_cursor(cursor)
+        history, next_seq = session_store.page_messages(session_id, limit=limit, before=before)
         serialized = [
             {
                 "id": None,
@@ -228,27 +254,25 @@ async def get_session_messages_endpoint(
             }
             for msg in history
         ]
-        return SessionMessagesResponse(messages=serialized, next_cursor=None)
+        return SessionMessagesResponse(
+            messages=serialized, next_cursor=_tag_cursor(_REDIS_CURSOR_PREFIX, next_seq)
+        )
 
-    session_doc = mongo.get_session(session_id)
+    session_doc = await mongo.get_session(session_id)
     if not session_doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
     if session_doc.get("user_id") != user_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Session does not belong to user")
 
-    messages = mongo.get_messages(session_id, limit=limit, cursor=cursor)
+    # A seq cursor from before the archive resumes on the (session_id, seq) index
+    before_seq, token = _parse_message_cursor(cursor)
+    messages, next_cursor = await mongo.get_messages_page(
+        session_id, limit=limit, cursor=token, before_seq=before_seq
+    )
     serialized = [_serialize_message(doc) for doc in messages]
-    next_cursor = None
-    if len(messages) == limit:
-        tail = messages[0]
-        created_at = tail.get("created_at")
-        if isinstance(created_at, datetime):
-            next_cursor = created_at.isoformat()
-        else:
-            msg_id = tail.get("_id")
-            if msg_id is not None:
-                next_cursor = str(msg_id)
-    return SessionMessagesResponse(messages=serialized, next_cursor=next_cursor)
+    return SessionMessagesResponse(
+        messages=serialized, next_cursor=_tag_cursor(_MONGO_CURSOR_PREFIX, next_cursor)
+    )
 
 
 @router.post("/sessions/{session_id}/close", response_model=SessionCloseResponse)
@@ -256,7 +280,7 @@ async def close_session_endpoint(
     session_id: str,
     payload: SessionCloseRequest,
     user_id: str = Query(..., description="Must match the session owner"),
-    mongo: Mongo = Depends(get_mongo),
+    mongo: AsyncMongo = Depends(get_mongo),
     session_store: RedisSessionStore = Depends(get_session_store),
 ) -> SessionCloseResponse:
     meta = session_store.read_session_meta(session_id)
@@ -264,77 +288,104 @@ async def close_session_endpoint(
         stored_user = meta.get("user_id")
         if stored_user != user_id:
             raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Session does not belong to user")
-        history = session_store.get_all_messages(session_id)
-        agent_id = meta.get("agent_id")
-        summary_text = payload.summary or meta.get("session_summary")
-        if not summary_text and history:
-            summary_payload = [
-                {"role": msg.get("role", "user"), "content": msg.get("content", "")}
-                for msg in history
-                if msg.get("content")
-            ]
-            if summary_payload:
-                summary_text = summarize_messages(
-                    summary_payload,
-                    max_length=settings.session_summary_max_chars,
-                )
-
-        meta_metadata = {
-            k: v
-            for k, v in meta.items()
-            if k
-            not in {
-                "session_id",
-                "user_id",
-                "status",
-                "created_at",
-                "last_updated",
-                "session_summary",
-                "summary_message_count",
-                "message_count",
-            }
-        }
-        combined_metadata = {**meta_metadata, **(payload.metadata or {})}
-        mongo.create_session(session_id, user_id, metadata=combined_metadata or None)
-        for msg in history:
-            created_at = None
-            raw_ts = msg.get("created_at")
-            if isinstance(raw_ts, str):
-                try:
-                    created_at = datetime.fromisoformat(raw_ts)
-                except ValueError:
-                    created_at = None
-            mongo.append_message(
-                session_id,
-                msg.get("role", "user"),
-                msg.get("content", ""),
-                user_id=user_id,
-                created_at=created_at,
-            )
-        if summary_text:
-            mongo.upsert_session_summary(
+        if settings.session_archive_async:
+            # Hand summarization and Mongo writes to the archiver worker
+            now = datetime.now(timezone.utc)
+            meta.update({"status": "closing", "last_updated": now.isoformat()})
+            session_store.write_session_meta(session_id, meta)
+            session_store.request_archive(
                 session_id,
-                summary_text,
-                user_id=user_id,
-                message_count=len(history),
+                reason="closed",
+                summary=payload.summary,
+                metadata=payload.metadata or None,
             )
-        mongo.close_session(session_id, summary=summary_text, metadata=combined_metadata or None)
-        session_store.dequeue_escalation(session_id)
-        if agent_id:
-            session_store.unassign_agent_session(session_id, agent_id)
-        session_store.delete_session(session_id)
-        session_store.unregister_session(session_id, user_id)
-        updated = mongo.get_session(session_id)
+            return SessionCloseResponse(session_id=session_id, status="closed", closed_at=now.isoformat())
+
+        await aarchive_session(
+            session_store,
+            mongo,
+            session_id,
+            summary=payload.summary,
+            metadata=payload.metadata or None,
+        )
+        updated = await mongo.get_session(session_id)
         closed_at = _serialize_datetime(updated.get("closed_at")) if updated else None
         return SessionCloseResponse(session_id=session_id, status="closed", closed_at=closed_at)
 
-    session_doc = mongo.get_session(session_id)
+    session_doc = await mongo.get_session(session_id)
     if not session_doc:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Session not found")
     if session_doc.get("user_id") != user_id:
         raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Session does not belong to user")
 
-    mongo.close_session(session_id, summary=payload.summary, metadata=payload.metadata or None)
-    updated = mongo.get_session(session_id)
+    await mongo.close_session(session_id, summary=payload.summary, metadata=payload.metadata or None)
+    updated = await mongo.get_session(session_id)
     closed_at = _serialize_datetime(updated.get("closed_at")) if updated else None
     return SessionCloseResponse(session_id=session_id, status="closed", closed_at=closed_at)
+
+
+async def _wait_for_disconnect(websocket: WebSocket) -> None:
+    while True:
+        message = await websocket.receive()
+        if message["type"] == "websocket.disconnect":
+            return
+
+
+@router.websocket("/sessions/{session_id}/ws")
+async def session_events_websocket(
+    websocket: WebSocket,
+    session_id: str,
+    user_id: Optional[str] = Query(None),
+    agent_id: Optional[str] = Query(None),
+    since: Optional[int] = Query(None, ge=0),
+    session_store: RedisSessionStore = Depends(get_ws_session_store),
+    events: SessionEventBus = Depends(get_session_events),
+) -> None:
+    """Push new messages and status changes for an active session.
+
+    Connect as the session owner (``user_id``) or the assigned agent
+    (``agent_id``). Pass the last seen ``seq`` as ``since`` to replay anything
+    missed before live events start.
+    """
+
+    meta = session_store.read_session_meta(session_id)
+    allowed = bool(meta) and (
+        (user_id is not None and meta.get("user_id") == user_id)
+        or (agent_id is not None and meta.get("agent_id") == agent_id)
+    )
+    if not allowed:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    async with events.subscribe(session_store.events_channel(session_id)) as queue:
+        # Subscribe before replaying so nothing published in between is lost;
+        # duplicates are dropped by seq below.
+        last_seq = since or 0
+        if since is not None:
+            for message in session_store.messages_since(session_id, since):
+                await websocket.send_json({"type": "message", "message": message})
+                last_seq = max(last_seq, int(message.get("seq") or 0))
+
+        disconnect = asyncio.create_task(_wait_for_disconnect(websocket))
+        try:
+            while True:
+                next_event = asyncio.create_task(queue.get())
+                done, _ = await asyncio.wait({next_event, disconnect}, return_when=asyncio.FIRST_COMPLETED)
+                if disconnect in done:
+                    next_event.cancel()
+                    return
+                event = next_event.result()
+                if event.get("type") == "message":
+                    seq = int(event.get("message", {}).get("seq") or 0)
+                    if seq <= last_seq:
+                        continue
+                    last_seq = seq
+                await websocket.send_json(event)
+                if event.get("type") == "status" and event.get("status") == "closed":
+                    await websocket.close()
+                    return
+        except WebSocketDisconnect:
+            return
+        finally:
+            disconnect.cancel()
@@ -0,0 +1,113 @@
+"""Document preprocessing throughput on the bundled policy PDFs.
+
+Loads every PDF under ``data/`` once, then times ``preprocess_documents``
+against a copy of the previous implementation (seven uncompiled
+``re.sub``/``replace`` passes per page, every page split into lines twice)
+and reports pages/second for each. Exits non-zero unless both produce
+byte-identical documents:
+
+    python -m benchmarks.preprocess --repeat 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import re
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List
+
+from langchain.schema import Document
+
+from src.ingestion.documents.loaders import load_from_pdf_dir
+from src.ingestion.documents.preprocess import HEADER_FOOTER_MAX_LINES, preprocess_documents
+
+DATA_DIR = Path(__file__).resolve().parents[1] / "data"
+
+
+def _reference_normalize(text: str) -> str:
+    text = text.replace("\u00AD", "")
+    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
+    text = re.sub(r"\n{3,}", "\n\n", text)
+    text = re.sub(r"[ \t\x0b\x0c\r]+", " ", text)
+    text = re.sub(r" *\n *", "\n", text)
+    text = text.replace("\n", " ")
+    text = re.sub(r" +", " ", text)
+    return text.strip()
+
+
+def _reference_repeated_lines(pages: List[str]) -> set[str]:
+    counts: dict[str, int] = {}
+    for page in pages:
+        lines = [l.strip() for l in page.splitlines() if l.strip()]
+        if not lines:
+            continue
+        for l in lines[:HEADER_FOOTER_MAX_LINES] + lines[-HEADER_FOOTER_MAX_LINES:]:
+            counts[l] = counts.get(l, 0) + 1
+    return {l for l, c in counts.items() if c >= max(2, len(pages) // 3)}
+
+
+def _reference_remove(page_text: str, repeated_lines: set[str]) -> str:
+    lines = page_text.splitlines()
+    for _ in range(min(HEADER_FOOTER_MAX_LINES, len(lines))):
+        if lines and lines[0].strip() in repeated_lines:
+            lines.pop(0)
+    for _ in range(min(HEADER_FOOTER_MAX_LINES, len(lines))):
+        if lines and lines[-1].strip() in repeated_lines:
+            lines.pop()
+    return "\n".join(lines)
+
+
+def reference_preprocess(documents: Iterable[Document]) -> List[Document]:
+    """``preprocess_documents`` as it was before the single-pass normalizer."""
+    by_source: Dict[str, List[Document]] = {}
+    for d in documents:
+        by_source.setdefault(str((d.metadata or {}).get("source", "unknown")), []).append(d)
+    cleaned: List[Document] = []
+    for group in by_source.values():
+        repeated = _reference_repeated_lines([g.page_content for g in group])
+        for g in group:
+            text = _reference_normalize(_reference_remove(g.page_content, repeated))
+            cleaned.append(Document(page_content=text, metadata=g.metadata))
+    return cleaned
+
+
+IMPLEMENTATIONS: Dict[str, Callable[[Iterable[Document]], List[Document]]] = {
+    "reference": reference_preprocess,
+    "current": preprocess_documents,
+}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--data-dir", default=str(DATA_DIR))
+    parser.add_argument("--repeat", type=int, default=200)
+    args = parser.parse_args()
+
+    docs = load_from_pdf_dir(args.data_dir)
+    outputs = {name: impl(docs) for name, impl in IMPLEMENTATIONS.items()}
+    identical = [
+        (a.page_content.encode("utf-8"), a.metadata) == (b.page_content.encode("utf-8"), b.metadata)
+        for a, b in zip(outputs["reference"], outputs["current"])
+    ]
+    print(f"{len(docs)} pages, {sum(len(d.page_content) for d in docs):,} characters, x{args.repeat}")
+
+    print(f"{'implementation':<16} {'seconds':>8} {'pages/s':>10}")
+    seconds: Dict[str, float] = {}
+    for name, impl in IMPLEMENTATIONS.items():
+        started = time.perf_counter()
+        for _ in range(args.repeat):
+            impl(docs)
+        seconds[name] = time.perf_counter() - started
+        print(f"{name:<16} {seconds[name]:>8.3f} {len(docs) * args.repeat / seconds[name]:>10,.0f}")
+    print(f"speedup x{seconds['reference'] / seconds['current']:.2f}")
+
+    if len(outputs["reference"]) != len(outputs["current"]) or not all(identical):
+        print(f"output differs on {identical.count(False)} pages", file=sys.stderr)
+        sys.exit(1)
+    print("output byte-identical")
+
+
+if __name__ == "__main__":
+    main()
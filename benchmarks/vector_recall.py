@@ -0,0 +1,144 @@
+"""Recall@k and query latency of reduced and quantized vectors.
+
+The baseline is an exact float32 scan at the full embedding dimension.
+Each configuration is measured against it:
+
+* shortened vectors (the first ``d`` components, renormalised), which is
+  what the ``dimensions`` parameter of text-embedding-3 models returns
+* ``QuantizedIndex`` with int8 or binary storage, with and without the
+  float re-scoring pass
+
+Synthetic clustered vectors are used by default, with variance decaying
+across dimensions as in real embeddings. Pass ``--embeddings`` a ``.npy``
+matrix of real embeddings (e.g. of the bundled policy chunks); its first
+``--queries`` rows become the queries and are left out of the corpus:
+
+    python -m benchmarks.vector_recall --corpus 20000 --k 10
+    python -m benchmarks.vector_recall --embeddings chunks.npy
+"""
+
+from __future__ import annotations
+
+import argparse
+import time
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.vectorstores.quantized import QuantizedIndex
+
+
+def synthetic_embeddings(rows: int, dim: int = 1536, *, clusters: int = 200, seed: int = 0) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    spectrum = (np.arange(1, dim + 1, dtype=np.float32) ** -0.5)[None, :]
+    centers = rng.standard_normal((clusters, dim), dtype=np.float32) * spectrum
+    noise = rng.standard_normal((rows, dim), dtype=np.float32) * spectrum * 0.6
+    return centers[rng.integers(0, clusters, rows)] + noise
+
+
+def shorten(vectors: np.ndarray, dimensions: int) -> np.ndarray:
+    """Leading ``dimensions`` components, renormalised."""
+    head = vectors[:, :dimensions]
+    return head / np.linalg.norm(head, axis=1, keepdims=True)
+
+
+def exact_top_k(corpus: np.ndarray, queries: np.ndarray, k: int) -> List[List[int]]:
+    corpus = corpus / np.linalg.norm(corpus, axis=1, keepdims=True)
+    queries = queries / np.linalg.norm(queries, axis=1, keepdims=True)
+    scores = queries @ corpus.T
+    top = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    return [row[np.argsort(-scores[i, row])].tolist() for i, row in enumerate(top)]
+
+
+def recall_at_k(expected: Sequence[Sequence[int]], found: Sequence[Sequence[int]]) -> float:
+    """Mean fraction of each query's true top-k that was returned."""
+    return float(np.mean([len(set(e) & set(f)) / len(e) for e, f in zip(expected, found)]))
+
+
+def indexed_top_k(
+    corpus: np.ndarray,
+    queries: np.ndarray,
+    k: int,
+    *,
+    quantization: str,
+    keep_float: bool = True,
+    rescore_factor: int = 10,
+) -> Tuple[List[List[int]], float, Dict[str, int]]:
+    """Top-k row numbers from a ``QuantizedIndex``, seconds per query and its memory."""
+    index = QuantizedIndex(
+        corpus.shape[1], quantization=quantization, keep_float=keep_float, rescore_factor=rescore_factor
+    )
+    for start in range(0, len(corpus), 1000):
+        index.upsert(
+            vectors=[{"id": str(start + i), "values": row} for i, row in enumerate(corpus[start:start + 1000])]
+        )
+    index.query(vector=queries[0], top_k=k)  # build the scan matrices outside the timing
+    started = time.perf_counter()
+    found = [[int(m.id) for m in index.query(vector=query, top_k=k).matches] for query in queries]
+    return found, (time.perf_counter() - started) / len(queries), index.stats()
+
+
+CONFIGS: List[Tuple[str, Optional[int], str, bool]] = [
+    # name, dimensions (None = full), quantization, keep_float
+    ("float32", None, "none", True),
+    ("int8+rescore", None, "int8", True),
+    ("int8", None, "int8", False),
+    ("binary+rescore", None, "binary", True),
+    ("binary", None, "binary", False),
+    ("d512 float32", 512, "none", True),
+    ("d512 int8+rescore", 512, "int8", True),
+    ("d256 float32", 256, "none", True),
+    ("d256 int8+rescore", 256, "int8", True),
+]
+
+
+def evaluate(corpus: np.ndarray, queries: np.ndarray, k: int = 10, rescore_factor: int = 10) -> List[Dict[str, float]]:
+    """One result row per entry of ``CONFIGS`` that fits the embedding dimension."""
+    expected = exact_top_k(corpus, queries, k)
+    results: List[Dict[str, float]] = []
+    for name, dimensions, quantization, keep_float in CONFIGS:
+        if dimensions is not None and dimensions >= corpus.shape[1]:
+            continue
+        docs, qs = (corpus, queries) if dimensions is None else (shorten(corpus, dimensions), shorten(queries, dimensions))
+        found, seconds, stats = indexed_top_k(
+            docs, qs, k, quantization=quantization, keep_float=keep_float, rescore_factor=rescore_factor
+        )
+        results.append(
+            {
+                "config": name,
+                "recall": recall_at_k(expected, found),
+                "ms_per_query": seconds * 1000,
+                "scan_mb": stats["scan_bytes"] / 1e6,
+                "rescore_mb": stats["rescore_bytes"] / 1e6,
+            }
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--embeddings", help=".npy matrix of real embeddings")
+    parser.add_argument("--corpus", type=int, default=20_000)
+    parser.add_argument("--dim", type=int, default=1536)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--rescore-factor", type=int, default=10)
+    args = parser.parse_args()
+
+    if args.embeddings:
+        vectors = np.load(args.embeddings).astype(np.float32)
+    else:
+        vectors = synthetic_embeddings(args.corpus + args.queries, args.dim)
+    queries, corpus = vectors[:args.queries], vectors[args.queries:]
+
+    print(f"{len(corpus):,} vectors x {corpus.shape[1]} dims, {len(queries)} queries, recall@{args.k}")
+    print(f"{'config':<20} {'recall':>7} {'ms/query':>9} {'scan MB':>8} {'rescore MB':>11}")
+    for row in evaluate(corpus, queries, args.k, args.rescore_factor):
+        print(
+            f"{row['config']:<20} {row['recall']:>7.3f} {row['ms_per_query']:>9.2f} "
+            f"{row['scan_mb']:>8.1f} {row['rescore_mb']:>11.1f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
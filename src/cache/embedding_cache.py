@@ -0,0 +1,57 @@
+"""Bounded in-process cache of text embeddings."""
+
+from __future__ import annotations
+
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Sequence
+
+import numpy as np
+
+
+class EmbeddingCache:
+    """LRU of float32 embedding vectors keyed by model and text.
+
+    Producers that already hold a vector for a text (the semantic splitter
+    derives chunk vectors from sentence embeddings) put it here, and
+    :class:`~src.vectorstores.pinecone_store.PineconeStore` reads it instead
+    of calling the embeddings API. Keys are digests, so long chunks cost 32
+    bytes of key each; ``max_entries`` bounds memory at roughly
+    ``max_entries * dim * 4`` bytes.
+    """
+
+    def __init__(self, max_entries: int = 4096) -> None:
+        self.max_entries = max(max_entries, 0)
+        self._entries: "OrderedDict[bytes, np.ndarray]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "misses": 0}
+
+    @staticmethod
+    def _key(model: str, text: str) -> bytes:
+        return hashlib.sha256(f"{model}\0{text}".encode("utf-8")).digest()
+
+    def get(self, model: str, text: str) -> Optional[np.ndarray]:
+        key = self._key(model, text)
+        with self._lock:
+            vector = self._entries.get(key)
+            if vector is None:
+                self._stats["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return vector
+
+    def put(self, model: str, text: str, vector: Sequence[float]) -> None:
+        if not self.max_entries:
+            return
+        key = self._key(model, text)
+        with self._lock:
+            self._entries[key] = np.asarray(vector, dtype=np.float32)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {**self._stats, "entries": len(self._entries)}
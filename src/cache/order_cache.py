@@ -0,0 +1,257 @@
+"""Two-tier read-through cache for per-user order lookups."""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.persistence.redis import RedisKV
+
+logger = logging.getLogger(__name__)
+
+ORDER_CACHE_PREFIX = "orders:lookup"
+
+OrderRow = Optional[Dict[str, Any]]
+LoadSnapshot = Tuple[int, Optional[str]]
+
+
+def _encode_value(value: Any) -> Any:
+    # Order rows carry DATE and NUMERIC columns; tag them so they round-trip
+    if isinstance(value, datetime):
+        return {"$datetime": value.isoformat()}
+    if isinstance(value, date):
+        return {"$date": value.isoformat()}
+    if isinstance(value, Decimal):
+        return {"$decimal": str(value)}
+    raise TypeError(f"Unsupported value in order row: {type(value).__name__}")
+
+
+def _decode_object(obj: Dict[str, Any]) -> Any:
+    if len(obj) == 1:
+        if "$datetime" in obj:
+            return datetime.fromisoformat(obj["$datetime"])
+        if "$date" in obj:
+            return date.fromisoformat(obj["$date"])
+        if "$decimal" in obj:
+            return Decimal(obj["$decimal"])
+    return obj
+
+
+def dumps_row(row: OrderRow) -> str:
+    return json.dumps(row, default=_encode_value)
+
+
+def loads_row(raw: str) -> OrderRow:
+    return json.loads(raw, object_hook=_decode_object)
+
+
+class OrderLookupCache:
+    """Read-through cache for :func:`get_order_for_user` results.
+
+    Lookups try a small in-process LRU, then Redis, then the loader. Misses
+    are cached too, so repeated questions about an unknown order id do not
+    keep re-running the join. Redis keys embed a generation counter: a data
+    reload bumps it and every worker stops reading the old entries, which
+    then age out on their TTL. Local entries live for ``local_ttl_seconds``,
+    which bounds how long another worker can serve rows from before a reload.
+    A row whose load overlapped an invalidation is returned but not cached.
+    """
+
+    def __init__(
+        self,
+        kv: Optional[RedisKV] = None,
+        *,
+        max_entries: int = 1024,
+        local_ttl_seconds: float = 5.0,
+        ttl_seconds: int = 60,
+        prefix: str = ORDER_CACHE_PREFIX,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        self.kv = kv
+        self.max_entries = max(max_entries, 0)
+        self.local_ttl_seconds = local_ttl_seconds
+        self.ttl_seconds = ttl_seconds
+        self.prefix = prefix
+        self._clock = clock
+        self._generation_key = f"{prefix}:generation"
+        self._local: "OrderedDict[Tuple[str, int], Tuple[float, OrderRow]]" = OrderedDict()
+        self._generation: Optional[Tuple[float, str]] = None
+        self._epoch = 0
+        self._lock = threading.Lock()
+        self._stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "invalidations": 0, "errors": 0}
+
+    def _redis_key(self, generation: str, user_id: str, order_id: int) -> str:
+        return f"{self.prefix}:{generation}:{user_id}:{order_id}"
+
+    def _bump(self, name: str) -> None:
+        with self._lock:
+            self._stats[name] += 1
+
+    def _current_generation(self) -> str:
+        now = self._clock()
+        with self._lock:
+            cached = self._generation
+        if cached is not None and cached[0] > now:
+            return cached[1]
+        generation = self.kv.get(self._generation_key) or "0"
+        with self._lock:
+            self._generation = (now + self.local_ttl_seconds, generation)
+        return generation
+
+    def _local_get(self, key: Tuple[str, int]) -> Tuple[bool, OrderRow]:
+        now = self._clock()
+        with self._lock:
+            entry = self._local.get(key)
+            if entry is None:
+                return False, None
+            expires_at, row = entry
+            if expires_at <= now:
+                del self._local[key]
+                return False, None
+            self._local.move_to_end(key)
+        return True, row
+
+    def _local_put(self, key: Tuple[str, int], row: OrderRow) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._local[key] = (self._clock() + self.local_ttl_seconds, row)
+            self._local.move_to_end(key)
+            while len(self._local) > self.max_entries:
+                self._local.popitem(last=False)
+
+    def get(self, user_id: str, order_id: int) -> Tuple[bool, OrderRow]:
+        """Return ``(found, row)``; ``row`` may be None for a cached miss."""
+
+        found, row = self._get_local(user_id, order_id)
+        if found:
+            return True, row
+        return self._get_shared(user_id, order_id)
+
+    def _get_local(self, user_id: str, order_id: int) -> Tuple[bool, OrderRow]:
+        found, row = self._local_get((user_id, order_id))
+        if not found:
+            return False, None
+        self._bump("local_hits")
+        return True, dict(row) if row else None
+
+    def _get_shared(self, user_id: str, order_id: int) -> Tuple[bool, OrderRow]:
+        if self.kv is not None:
+            try:
+                raw = self.kv.get(self._redis_key(self._current_generation(), user_id, order_id))
+            except Exception:
+                # A Redis outage should only cost us the cache, not the lookup
+                logger.warning("order_cache.redis_get_failed", exc_info=True)
+                self._bump("errors")
+                raw = None
+            if raw is not None:
+                row = loads_row(raw)
+                self._local_put((user_id, order_id), row)
+                self._bump("redis_hits")
+                return True, dict(row) if row else None
+
+        self._bump("misses")
+        return False, None
+
+    def put(self, user_id: str, order_id: int, row: OrderRow) -> None:
+        self._local_put((user_id, order_id), dict(row) if row else None)
+        if self.kv is None:
+            return
+        try:
+            key = self._redis_key(self._current_generation(), user_id, order_id)
+            self.kv.set(key, dumps_row(row), ex=self.ttl_seconds)
+        except Exception:
+            logger.warning("order_cache.redis_set_failed", exc_info=True)
+            self._bump("errors")
+
+    def _get_for_load(self, user_id: str, order_id: int) -> Tuple[bool, OrderRow, LoadSnapshot]:
+        """Shared-tier lookup plus the generation a loader on a miss runs under."""
+
+        found, row = self._get_shared(user_id, order_id)
+        with self._lock:
+            epoch = self._epoch
+        generation: Optional[str] = None
+        if not found and self.kv is not None:
+            try:
+                generation = self._current_generation()
+            except Exception:
+                logger.warning("order_cache.redis_get_failed", exc_info=True)
+                self._bump("errors")
+        return found, row, (epoch, generation)
+
+    def _put_loaded(self, user_id: str, order_id: int, row: OrderRow, snapshot: LoadSnapshot) -> None:
+        """Cache a loaded row unless an invalidation landed while it was loading."""
+
+        epoch, generation = snapshot
+        with self._lock:
+            current = self._epoch == epoch
+        if current and self.kv is not None:
+            try:
+                current = generation is not None and (self.kv.get(self._generation_key) or "0") == generation
+            except Exception:
+                logger.warning("order_cache.redis_get_failed", exc_info=True)
+                self._bump("errors")
+                current = False
+        if not current:
+            # The row may predate the reload; let the next lookup fetch it again
+            with self._lock:
+                self._generation = None
+            return
+        self.put(user_id, order_id, row)
+
+    def get_or_load(self, user_id: str, order_id: int, loader: Callable[[], OrderRow]) -> OrderRow:
+        found, row = self._get_local(user_id, order_id)
+        if found:
+            return row
+        found, row, snapshot = self._get_for_load(user_id, order_id)
+        if found:
+            return row
+        row = loader()
+        self._put_loaded(user_id, order_id, row, snapshot)
+        return row
+
+    async def aget_or_load(
+        self, user_id: str, order_id: int, loader: Callable[[], Awaitable[OrderRow]]
+    ) -> OrderRow:
+        found, row = self._get_local(user_id, order_id)
+        if found:
+            return row
+        # RedisKV is synchronous; keep its round trips off the event loop
+        found, row, snapshot = await asyncio.to_thread(self._get_for_load, user_id, order_id)
+        if found:
+            return row
+        row = await loader()
+        await asyncio.to_thread(self._put_loaded, user_id, order_id, row, snapshot)
+        return row
+
+    def invalidate(self) -> None:
+        """Drop every cached lookup after order, customer or product data changes."""
+
+        with self._lock:
+            self._local.clear()
+            self._generation = None
+            self._epoch += 1
+            self._stats["invalidations"] += 1
+        if self.kv is None:
+            return
+        try:
+            self.kv.incr(self._generation_key)
+        except Exception:
+            # Other workers fall back to the Redis TTL to stop serving old rows
+            logger.warning("order_cache.invalidate_failed", exc_info=True)
+            self._bump("errors")
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats: Dict[str, Any] = dict(self._stats)
+            stats["local_entries"] = len(self._local)
+        lookups = stats["local_hits"] + stats["redis_hits"] + stats["misses"]
+        stats["hit_ratio"] = (stats["local_hits"] + stats["redis_hits"]) / lookups if lookups else 0.0
+        return stats
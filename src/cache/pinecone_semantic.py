@@ -16,6 +16,7 @@ except ImportError:  # pragma: no cover - tests supply their own embedder
     OpenAI = None  # type: ignore
 
 from src.config.settings import settings
+from src.vectorstores.quantized import local_vector_client
 
 EMBEDDING_MODEL = "text-embedding-3-small"
 
@@ -41,18 +42,23 @@ class PineconeSemanticCache:
         pinecone_client: Optional[Any] = None,
         openai_client: Optional[Any] = None,
         embedding_model: str = EMBEDDING_MODEL,
+        dimensions: Optional[int] = None,
     ) -> None:
         self.index_name = index_name
         self.namespace = namespace
         self.similarity_threshold = similarity_threshold
         self.top_k = top_k
         self.embedding_model = embedding_model
+        # The cache namespace shares the index, and so its dimension
+        self.dimensions = dimensions or settings.embedding_dimensions or None
 
         self._pc = pinecone_client or self._build_pinecone()
         self._index = self._pc.Index(index_name)
         self._openai = openai_client or self._build_openai()
 
     def _build_pinecone(self) -> Any:
+        if settings.vector_backend == "local":
+            return local_vector_client()
         if Pinecone is None:
             raise RuntimeError("pinecone package is required for PineconeSemanticCache")
         api_key = settings.pinecone_api_key
@@ -74,7 +80,8 @@ class PineconeSemanticCache:
         return hashlib.sha256(base.encode("utf-8", "ignore")).hexdigest()
 
     def _embed(self, text: str) -> Iterable[float]:
-        response = self._openai.embeddings.create(model=self.embedding_model, input=[text])
+        extra = {"dimensions": self.dimensions} if self.dimensions else {}
+        response = self._openai.embeddings.create(model=self.embedding_model, input=[text], **extra)
         return response.data[0].embedding
 
     def similar(self, query: str) -> Optional[Dict[str, Any]]:
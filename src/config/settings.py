@@ -18,16 +18,48 @@ class Settings(BaseSettings):
 
     # Vector / DB / Cache
     pinecone_index: str = Field(default="ecomm-policies-v1")
+    ingest_manifest_path: str = Field(default=".ingest_manifest.json", env="INGEST_MANIFEST_PATH")
+    # 0 keeps the model's full dimension; text-embedding-3 models accept e.g. 256 or 512
+    embedding_dimensions: int = Field(default=0, env="EMBEDDING_DIMENSIONS")
+    # "pinecone", or "local" for the in-process quantized index (dev/tests only: in memory, per process)
+    vector_backend: str = Field(default="pinecone", env="VECTOR_BACKEND")
+    vector_quantization: str = Field(default="int8", env="VECTOR_QUANTIZATION")
+    vector_rescore_factor: int = Field(default=10, env="VECTOR_RESCORE_FACTOR")
+    vector_keep_float: bool = Field(default=True, env="VECTOR_KEEP_FLOAT")
+    embedding_requests_per_minute: int = Field(default=3000, env="EMBEDDING_REQUESTS_PER_MINUTE")
+    embedding_tokens_per_minute: int = Field(default=1_000_000, env="EMBEDDING_TOKENS_PER_MINUTE")
+    embedding_max_concurrency: int = Field(default=4, env="EMBEDDING_MAX_CONCURRENCY")
+    embedding_cache_max_entries: int = Field(default=4096, env="EMBEDDING_CACHE_MAX_ENTRIES")
+    ingest_dedupe_max_distance: int = Field(default=6, env="INGEST_DEDUPE_MAX_DISTANCE")
+    ingest_job_workers: int = Field(default=1, env="INGEST_JOB_WORKERS")
+    ingest_job_history: int = Field(default=100, env="INGEST_JOB_HISTORY")
     postgres_dsn: str = Field(default="", env="POSTGRES_DSN")
+    postgres_pool_size: int = Field(default=10, env="POSTGRES_POOL_SIZE")
+    postgres_max_overflow: int = Field(default=10, env="POSTGRES_MAX_OVERFLOW")
+    postgres_pool_timeout: float = Field(default=10.0, env="POSTGRES_POOL_TIMEOUT")
+    postgres_statement_timeout_ms: int = Field(default=5000, env="POSTGRES_STATEMENT_TIMEOUT_MS")
+    postgres_prepare_threshold: int = Field(default=0, env="POSTGRES_PREPARE_THRESHOLD")
     redis_url: str = Field(default="redis://localhost:6379/0", env="REDIS_URL")
     mongodb_uri: str = Field(default="", env="MONGODB_URI")
+    mongo_max_pool_size: int = Field(default=100, env="MONGO_MAX_POOL_SIZE")
+    mongo_min_pool_size: int = Field(default=0, env="MONGO_MIN_POOL_SIZE")
+    mongo_max_idle_time_ms: int = Field(default=60000, env="MONGO_MAX_IDLE_TIME_MS")
+    mongo_server_selection_timeout_ms: int = Field(default=5000, env="MONGO_SERVER_SELECTION_TIMEOUT_MS")
     recent_messages_window: int = Field(default=12, env="RECENT_MESSAGES_WINDOW")
     session_redis_ttl_days: int = Field(default=7, env="SESSION_REDIS_TTL_DAYS")
+    order_cache_max_entries: int = Field(default=1024, env="ORDER_CACHE_MAX_ENTRIES")
+    order_cache_local_ttl_seconds: float = Field(default=5.0, env="ORDER_CACHE_LOCAL_TTL_SECONDS")
+    order_cache_ttl_seconds: int = Field(default=60, env="ORDER_CACHE_TTL_SECONDS")
     semantic_cache_namespace: str = Field(default="semantic_cache", env="SEMANTIC_CACHE_NAMESPACE")
     semantic_cache_similarity_threshold: float = Field(default=0.9, env="SEMANTIC_CACHE_SIMILARITY_THRESHOLD")
     session_summary_min_messages: int = Field(default=12, env="SESSION_SUMMARY_MIN_MESSAGES")
     session_summary_history_limit: int = Field(default=40, env="SESSION_SUMMARY_HISTORY_LIMIT")
     session_summary_max_chars: int = Field(default=256, env="SESSION_SUMMARY_MAX_CHARS")
+    session_archive_async: bool = Field(default=False, env="SESSION_ARCHIVE_ASYNC")
+    session_archive_grace_seconds: int = Field(default=3600, env="SESSION_ARCHIVE_GRACE_SECONDS")
+    archiver_batch_size: int = Field(default=50, env="ARCHIVER_BATCH_SIZE")
+    archiver_max_attempts: int = Field(default=5, env="ARCHIVER_MAX_ATTEMPTS")
+    archiver_claim_idle_ms: int = Field(default=60000, env="ARCHIVER_CLAIM_IDLE_MS")
     slack_webhook_url: str = Field(default="", env="SLACK_WEBHOOK_URL")
     slack_bot_token: str = Field(default="", env="SLACK_BOT_TOKEN")
     slack_channel_id: str = Field(default="", env="SLACK_CHANNEL_ID")
@@ -35,6 +67,15 @@ class Settings(BaseSettings):
     admin_email: str = Field(default="", env="ADMIN_EMAIL")
     admin_passcode: str = Field(default="", env="ADMIN_PASSCODE")
 
+    def mongo_client_options(self) -> dict:
+        """Connection pool options shared by the sync and async Mongo clients."""
+        return {
+            "maxPoolSize": self.mongo_max_pool_size,
+            "minPoolSize": self.mongo_min_pool_size,
+            "maxIdleTimeMS": self.mongo_max_idle_time_ms,
+            "serverSelectionTimeoutMS": self.mongo_server_selection_timeout_ms,
+        }
+
     class Config:
         env_file = ".env"
         extra = "ignore"
@@ -1,9 +1,10 @@
+from langchain_core.runnables import RunnableLambda
 from langgraph.graph import StateGraph, END
 
 from src.graph.state import RAGState
 from src.graph.nodes.router import router_node
 from src.graph.nodes.retrieve_docs import retrieve_docs_node
-from src.graph.nodes.retrieve_sql import retrieve_sql_node
+from src.graph.nodes.retrieve_sql import aretrieve_sql_node, retrieve_sql_node
 from src.graph.nodes.generate import generate_node
 from src.graph.nodes.groundedness import groundedness_node
 from src.graph.nodes.cache_check import cache_check_node
@@ -18,7 +19,8 @@ def build_graph():
 
     builder.add_node("router", router_node)
     builder.add_node("cache_check", cache_check_node)
-    builder.add_node("retrieve_sql", retrieve_sql_node)
+    # Sync under invoke(); under ainvoke() the order lookup uses the async pool
+    builder.add_node("retrieve_sql", RunnableLambda(retrieve_sql_node, afunc=aretrieve_sql_node))
     builder.add_node("retrieve_docs", retrieve_docs_node)
     builder.add_node("generate", generate_node)
     builder.add_node("groundedness", groundedness_node)
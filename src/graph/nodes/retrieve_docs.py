@@ -4,19 +4,26 @@ from src.graph.state import RAGState, Citation
 from src.config.settings import settings
 from src.retrievers.pinecone_retriever import PineconeRetriever
 from src.retrievers.reranker import Reranker
+from src.retrievers.scoping import document_filter, scope_documents
 import os
 
 
+# Candidates fetched for reranking; fewer when scoped to a few documents
+INITIAL_K = 10
+SCOPED_K = 6
+FINAL_K = 3
+
+
 _retriever: Optional[PineconeRetriever] = None
 _reranker: Optional[Reranker] = None
 
 
 def _get_retriever() -> Optional[PineconeRetriever]:
     global _retriever
-    # Require both Pinecone and OpenAI keys to be present
+    # Require both Pinecone and OpenAI keys to be present (no Pinecone key for the local backend)
     pinecone_key = settings.pinecone_api_key or os.getenv("PINECONE_API_KEY", "")
     openai_key = settings.openai_api_key or os.getenv("OPENAI_API_KEY", "")
-    if not pinecone_key or not openai_key:
+    if (not pinecone_key and settings.vector_backend != "local") or not openai_key:
         return None
     if _retriever is None:
         try:
@@ -77,9 +84,16 @@ def retrieve_docs_node(state: RAGState) -> RAGState:
         state.citations = []
         return state
 
-    # Retrieve more documents for reranking (e.g., 10) then rerank to top 3
-    initial_k = 10
-    results = retr.retrieve(query=state.query, k=initial_k)
+    # Search only the policy documents the query type and wording point at
+    # (one query embedding serves both the scoped and the widened search)
+    vector = retr.embed_query(state.query)
+    scope = scope_documents(state.query, state.query_type)
+    results = retr.retrieve_by_vector(vector, k=SCOPED_K, filter=document_filter(scope)) if scope else []
+    if len(results) < FINAL_K:
+        # Too few scoped hits (or chunks indexed before documents were tagged): widen
+        seen = {d.page_content for d in results}
+        widened = [d for d in retr.retrieve_by_vector(vector, k=INITIAL_K) if d.page_content not in seen]
+        results = results + widened[:INITIAL_K - len(results)]
     docs = [_doc_to_state_dict(d) for d in results]
     
     # Apply reranking if available
@@ -88,14 +102,14 @@ def retrieve_docs_node(state: RAGState) -> RAGState:
         try:
             # Convert to reranker format and rerank
             rerank_docs = [_dict_to_rerank_format(d) for d in docs]
-            reranked = reranker.rerank(query=state.query, docs=rerank_docs, top_k=3)
+            reranked = reranker.rerank(query=state.query, docs=rerank_docs, top_k=FINAL_K)
             state.docs = reranked
         except Exception:
             # Fall back to original results if reranking fails
-            state.docs = docs[:3]
+            state.docs = docs[:FINAL_K]
     else:
         # No reranker available, use top 3 from retrieval
-        state.docs = docs[:3]
+        state.docs = docs[:FINAL_K]
 
     # Build citations from final documents
     citations: List[Citation] = []
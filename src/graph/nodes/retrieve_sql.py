@@ -1,14 +1,19 @@
+import asyncio
 import re
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Optional
 
 from src.config.settings import settings
 from copy import deepcopy
-from src.persistence.postgres import create_sync_engine, get_order_for_user
+from src.persistence.postgres import aget_order_for_user, create_sync_engine, get_order_for_user
 from src.graph.state import RAGState, Citation
 from src.utils.masking import mask_email
 
 
-_ENGINE = create_sync_engine(settings.postgres_dsn) if settings.postgres_dsn else None
+_ENGINE = (
+    create_sync_engine(settings.postgres_dsn, prepare_threshold=settings.postgres_prepare_threshold)
+    if settings.postgres_dsn
+    else None
+)
 
 
 def _extract_entities(user_query: str) -> Dict[str, Any]:
@@ -50,20 +55,10 @@ def _mask_row(row: Dict[str, Any], query: str) -> Dict[str, Any]:
     return masked
 
 
-def retrieve_sql_node(state: RAGState) -> RAGState:
-    if not state.should_retrieve_sql:
-        state.sql_rows = []
-        return state
-
-    # If DSN not configured or engine missing, skip
-    if _ENGINE is None or not settings.postgres_dsn:
-        state.sql_rows = []
-        return state
-
-    user_id = state.user_id
-    if not user_id:
-        state.sql_rows = []
-        return state
+def _resolve_order_id(state: RAGState) -> Optional[int]:
+    """Work out which order to look up; None means skip the query."""
+    if not state.user_id:
+        return None
 
     entities = _extract_entities(state.query)
     if state.order_id is None and entities.get("order_id") is not None:
@@ -71,18 +66,19 @@ def retrieve_sql_node(state: RAGState) -> RAGState:
             state.order_id = int(entities["order_id"])
         except (TypeError, ValueError):
             state.order_id = None
+    return state.order_id
 
+
+def _apply_order_row(state: RAGState, od: Optional[Dict[str, Any]]) -> RAGState:
     sql_rows: List[Dict[str, Any]] = []
 
-    if state.order_id is not None:
-        od = get_order_for_user(_ENGINE, user_id, int(state.order_id))
-        if od:
-            masked = _mask_row(od, state.query)
-            sql_rows.append(masked)
-            if not state.first_name and masked.get("first_name"):
-                state.first_name = str(masked.get("first_name"))
-            if not state.last_name and masked.get("last_name"):
-                state.last_name = str(masked.get("last_name"))
+    if od:
+        masked = _mask_row(od, state.query)
+        sql_rows.append(masked)
+        if not state.first_name and masked.get("first_name"):
+            state.first_name = str(masked.get("first_name"))
+        if not state.last_name and masked.get("last_name"):
+            state.last_name = str(masked.get("last_name"))
 
     state.sql_rows = sql_rows
 
@@ -92,3 +88,48 @@ def retrieve_sql_node(state: RAGState) -> RAGState:
         state.citations = (state.citations or []) + db_cites
 
     return state
+
+
+def retrieve_sql_node(state: RAGState) -> RAGState:
+    if not state.should_retrieve_sql:
+        state.sql_rows = []
+        return state
+
+    # If DSN not configured or engine missing, skip
+    if _ENGINE is None or not settings.postgres_dsn:
+        state.sql_rows = []
+        return state
+
+    order_id = _resolve_order_id(state)
+    if order_id is None:
+        od = None
+    elif state.order_cache is not None:
+        od = state.order_cache.get_or_load(
+            state.user_id, int(order_id), lambda: get_order_for_user(_ENGINE, state.user_id, int(order_id))
+        )
+    else:
+        od = get_order_for_user(_ENGINE, state.user_id, int(order_id))
+    return _apply_order_row(state, od)
+
+
+async def aretrieve_sql_node(state: RAGState) -> RAGState:
+    """Async node used by ``graph.ainvoke``; queries the shared async pool."""
+    engine = state.pg_engine
+    if engine is None:
+        # No async pool (e.g. the graph runs outside the API): keep the loop free
+        return await asyncio.to_thread(retrieve_sql_node, state)
+
+    if not state.should_retrieve_sql:
+        state.sql_rows = []
+        return state
+
+    order_id = _resolve_order_id(state)
+    if order_id is None:
+        od = None
+    elif state.order_cache is not None:
+        od = await state.order_cache.aget_or_load(
+            state.user_id, int(order_id), lambda: aget_order_for_user(engine, state.user_id, int(order_id))
+        )
+    else:
+        od = await aget_order_for_user(engine, state.user_id, int(order_id))
+    return _apply_order_row(state, od)
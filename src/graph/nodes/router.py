@@ -6,6 +6,7 @@ from typing import Literal
 from src.config.settings import settings
 from src.graph.state import RAGState
 from src.graph.nodes.retrieve_sql import _extract_entities
+from src.retrievers.scoping import policy_summary
 from src.utils.openai_client import get_openai_client
 
 
@@ -18,12 +19,7 @@ QueryType = Literal[
     "escalation",
 ]
 
-_POLICY_SUMMARY = (
-    "Policies available for reference: Customer_Account_Management_Policy.pdf (account access and profile updates), "
-    "Returns_and_Exchanges_Policy.pdf (return windows and processes), Shipping_and_Delivery_Policy.pdf (shipping methods and delays), "
-    "Order_Management_Guide.pdf (order status, cancellations), Payment_and_Billing_Policy.pdf (charges, refunds, invoices), "
-    "Product_Information_Guide.pdf (product specs and availability)."
-)
+_POLICY_SUMMARY = policy_summary()
 
 
 def _classify_query_type_llm(query: str) -> str | None:
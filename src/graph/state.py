@@ -32,6 +32,8 @@ class RAGState(BaseModel):
     cache_hit: bool = False
     should_cache: bool = False
     semantic_cache: Optional[Any] = Field(default=None, exclude=True)
+    pg_engine: Optional[Any] = Field(default=None, exclude=True)
+    order_cache: Optional[Any] = Field(default=None, exclude=True)
     trace_id: Optional[str] = None
     grounded: Optional[bool] = None
     grounded_explanation: Optional[str] = None
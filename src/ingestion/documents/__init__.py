@@ -1,11 +1,15 @@
 """Document ingestion utilities: loaders, preprocessing, pipelines."""
 
 from .loaders import load_from_url, load_from_pdf_dir, load_from_pdf_file, load_from_txt, load_from_docx
+from .manifest import IngestionManifest
 from .preprocess import preprocess_documents
+from .semantic import SemanticSplitter
 from .pipeline import (
     infer_source_type,
     load_documents,
+    load_source_groups,
     split_documents,
+    sync_sources,
     ingest_sources,
     ingest_files_with_preprocessing,
 )
@@ -16,10 +20,14 @@ __all__ = [
     "load_from_pdf_file",
     "load_from_txt",
     "load_from_docx",
+    "IngestionManifest",
     "preprocess_documents",
+    "SemanticSplitter",
     "infer_source_type",
     "load_documents",
+    "load_source_groups",
     "split_documents",
+    "sync_sources",
     "ingest_sources",
     "ingest_files_with_preprocessing",
 ]
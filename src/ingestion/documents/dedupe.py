@@ -0,0 +1,89 @@
+"""SimHash near-duplicate detection for chunks, run before they are embedded."""
+
+from __future__ import annotations
+
+import hashlib
+import re
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+WORD = re.compile(r"\w+")
+
+SHINGLE_WORDS = 3
+
+# Manku et al. use 3 bits for whole web pages; a one-word edit to a
+# chunk-sized text (~100 words) moves about 4-7 bits, unrelated chunks ~30.
+DEFAULT_MAX_DISTANCE = 6
+
+# A few shingles cannot outvote a changed one, so short texts differing in a
+# single word (a policy number, an amount) can land within the distance.
+# Below this many words only identical fingerprints count as duplicates.
+NEAR_MATCH_MIN_WORDS = 12
+
+
+def _shingles(words: List[str], shingle_words: int) -> List[str]:
+    size = min(shingle_words, len(words))
+    return [" ".join(words[i:i + size]) for i in range(len(words) - size + 1)]
+
+
+def simhash(text: str, shingle_words: int = SHINGLE_WORDS) -> int:
+    """64-bit SimHash of the lowercase word shingles of ``text``."""
+    return _simhash(_shingles(WORD.findall(text.lower()), shingle_words))
+
+
+def _simhash(shingles: List[str]) -> int:
+    if not shingles:
+        return 0
+    digests = b"".join(hashlib.blake2b(s.encode("utf-8"), digest_size=8).digest() for s in shingles)
+    bits = np.unpackbits(np.frombuffer(digests, dtype=np.uint8).reshape(len(shingles), 8), axis=1)
+    # Each bit is set where more shingles vote 1 than 0
+    votes = bits.sum(axis=0, dtype=np.int64) * 2 - len(shingles)
+    return int.from_bytes(np.packbits(votes > 0).tobytes(), "big")
+
+
+class NearDuplicateIndex:
+    """Finds a fingerprint within ``max_distance`` bits of one already added.
+
+    Fingerprints are split into ``max_distance + 1`` bands; two fingerprints
+    that differ in at most ``max_distance`` bits agree exactly on at least
+    one band, so bucketing by band finds every match without a full scan.
+    """
+
+    def __init__(self, max_distance: int = DEFAULT_MAX_DISTANCE) -> None:
+        self.max_distance = max_distance
+        edges = np.linspace(0, 64, max_distance + 2).astype(int).tolist()
+        self._bands: List[Tuple[int, int]] = [
+            (start, (1 << (end - start)) - 1) for start, end in zip(edges[:-1], edges[1:])
+        ]
+        self._buckets: Dict[Tuple[int, int], List[Tuple[str, int]]] = defaultdict(list)
+
+    def _keys(self, fingerprint: int) -> List[Tuple[int, int]]:
+        return [(band, (fingerprint >> shift) & mask) for band, (shift, mask) in enumerate(self._bands)]
+
+    def add(self, key: str, fingerprint: int) -> None:
+        for bucket in self._keys(fingerprint):
+            self._buckets[bucket].append((key, fingerprint))
+
+    def find(self, fingerprint: int, max_distance: Optional[int] = None) -> Optional[str]:
+        """Key of the earliest added fingerprint close enough, if any."""
+        limit = self.max_distance if max_distance is None else min(max_distance, self.max_distance)
+        for bucket in self._keys(fingerprint):
+            for key, candidate in self._buckets.get(bucket, ()):
+                if (candidate ^ fingerprint).bit_count() <= limit:
+                    return key
+        return None
+
+    def match(self, key: str, text: str) -> Tuple[Optional[str], int]:
+        """Return ``(canonical key, fingerprint)`` for ``text``.
+
+        The canonical key is None when nothing added so far is a near
+        duplicate; ``key`` is then added as a new canonical entry.
+        """
+        words = WORD.findall(text.lower())
+        fingerprint = _simhash(_shingles(words, SHINGLE_WORDS))
+        canonical = self.find(fingerprint, None if len(words) >= NEAR_MATCH_MIN_WORDS else 0)
+        if canonical is None:
+            self.add(key, fingerprint)
+        return canonical, fingerprint
@@ -0,0 +1,155 @@
+"""Ingestion manifest: which sources are indexed and the chunks they produced."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from langchain.schema import Document
+
+
+MANIFEST_VERSION = 1
+
+
+def hash_file(path: Union[str, Path]) -> str:
+    digest = hashlib.sha256()
+    with open(path, "rb") as fp:
+        for block in iter(lambda: fp.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def hash_directory(directory: Union[str, Path], pattern: str = "*.pdf") -> str:
+    """Hash every file matching ``pattern`` below ``directory``, names included."""
+    root = Path(directory)
+    digest = hashlib.sha256()
+    for path in sorted(root.rglob(pattern)):
+        if path.name.startswith("."):
+            continue
+        digest.update(str(path.relative_to(root)).encode("utf-8"))
+        digest.update(hash_file(path).encode("ascii"))
+    return digest.hexdigest()
+
+
+def hash_documents(docs: Iterable[Document]) -> str:
+    """Hash loaded page text, for sources (URLs) with no file to hash up front."""
+    digest = hashlib.sha256()
+    for doc in docs:
+        digest.update(doc.page_content.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+class IngestionManifest:
+    """JSON record of what each source contributed to a vector index.
+
+    Entries are grouped by scope (``"<index>/<namespace>"``) and keyed by the
+    source string passed to ingestion. Each holds the source's content hash,
+    a fingerprint of the pipeline settings that chunked it, and the ids of the
+    chunks it produced, so a re-run can skip unchanged sources and delete the
+    vectors of chunks that disappeared.
+
+    With near-duplicate collapsing, an entry also keeps the SimHash
+    ``fingerprints`` of the chunks it owns, so later runs match against
+    them, and ``shared_ids``: canonical chunks owned by other sources that
+    stand in for this source's duplicates. A vector's ``sources`` metadata
+    is its owner followed by every source sharing it.
+    """
+
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self._scopes: Dict[str, Dict[str, Dict[str, Any]]] = {}
+        if self.path.exists():
+            data = json.loads(self.path.read_text(encoding="utf-8"))
+            if data.get("version") == MANIFEST_VERSION:
+                self._scopes = data.get("scopes", {})
+
+    @staticmethod
+    def scope(index_name: str, namespace: Optional[str]) -> str:
+        return f"{index_name}/{namespace or ''}"
+
+    def get(self, scope: str, source: str) -> Optional[Dict[str, Any]]:
+        return self._scopes.get(scope, {}).get(source)
+
+    def sources(self, scope: str) -> List[str]:
+        return list(self._scopes.get(scope, {}))
+
+    def is_current(self, scope: str, source: str, content_hash: Optional[str], pipeline: str) -> bool:
+        entry = self.get(scope, source)
+        return (
+            entry is not None
+            and content_hash is not None
+            and entry.get("content_hash") == content_hash
+            and entry.get("pipeline") == pipeline
+        )
+
+    def record(
+        self,
+        scope: str,
+        source: str,
+        *,
+        content_hash: str,
+        pipeline: str,
+        chunk_ids: Iterable[str],
+        fingerprints: Optional[Dict[str, int]] = None,
+        shared_ids: Iterable[str] = (),
+    ) -> None:
+        entry: Dict[str, Any] = {
+            "content_hash": content_hash,
+            "pipeline": pipeline,
+            "chunk_ids": sorted(chunk_ids),
+            "updated_at": datetime.now(timezone.utc).isoformat(),
+        }
+        if fingerprints:
+            entry["fingerprints"] = {cid: f"{fp:016x}" for cid, fp in sorted(fingerprints.items())}
+        shared = sorted(shared_ids)
+        if shared:
+            entry["shared_ids"] = shared
+        self._scopes.setdefault(scope, {})[source] = entry
+
+    def fingerprints(self, scope: str, exclude: Iterable[str] = ()) -> Iterator[Tuple[str, int]]:
+        """``(chunk id, fingerprint)`` for owned chunks of every source not in ``exclude``."""
+        skipped = set(exclude)
+        for source, entry in self._scopes.get(scope, {}).items():
+            if source not in skipped:
+                for cid, fp in entry.get("fingerprints", {}).items():
+                    yield cid, int(fp, 16)
+
+    def chunk_sources(self, scope: str, chunk_ids: Iterable[str]) -> Dict[str, List[str]]:
+        """Owner then sharing sources of each chunk id, in manifest order."""
+        wanted = set(chunk_ids)
+        owners: Dict[str, List[str]] = {}
+        sharers: Dict[str, List[str]] = {}
+        for source, entry in self._scopes.get(scope, {}).items():
+            for cid in wanted.intersection(entry.get("chunk_ids", ())):
+                owners.setdefault(cid, []).append(source)
+            for cid in wanted.intersection(entry.get("shared_ids", ())):
+                sharers.setdefault(cid, []).append(source)
+        return {cid: owners.get(cid, []) + sharers.get(cid, []) for cid in wanted if cid in owners or cid in sharers}
+
+    def adopt(self, scope: str, source: str, chunk_id: str, previous_owner: str) -> None:
+        """Make ``source`` own a chunk it shared, keeping the previous owner's fingerprint."""
+        entries = self._scopes.get(scope, {})
+        entry = entries[source]
+        entry["shared_ids"] = [cid for cid in entry.get("shared_ids", []) if cid != chunk_id]
+        if not entry["shared_ids"]:
+            del entry["shared_ids"]
+        entry["chunk_ids"] = sorted(set(entry.get("chunk_ids", [])) | {chunk_id})
+        fp = entries.get(previous_owner, {}).get("fingerprints", {}).get(chunk_id)
+        if fp is not None:
+            entry.setdefault("fingerprints", {})[chunk_id] = fp
+
+    def forget(self, scope: str, source: str) -> None:
+        self._scopes.get(scope, {}).pop(source, None)
+
+    def save(self) -> None:
+        """Write the manifest atomically so a crash never leaves half a file."""
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_suffix(self.path.suffix + ".tmp")
+        payload = {"version": MANIFEST_VERSION, "scopes": self._scopes}
+        tmp_path.write_text(json.dumps(payload, indent=2, sort_keys=True), encoding="utf-8")
+        os.replace(tmp_path, self.path)
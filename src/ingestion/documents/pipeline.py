@@ -1,31 +1,26 @@
-from typing import List, Optional, Type
+import multiprocessing
+import os
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+from typing import Any, Deque, Dict, Iterable, Iterator, List, Optional, Set, Tuple
 
 from langchain_text_splitters import RecursiveCharacterTextSplitter
 from langchain.schema import Document
-from langchain_openai import OpenAIEmbeddings
-
-# SemanticChunker may not be available in all environments
-try:
-    from langchain_text_splitters import SemanticChunker  # legacy location
-    SEMANTIC_CHUNKER_AVAILABLE = True
-except ImportError:
-    try:
-        # Current location in langchain-experimental
-        from langchain_experimental.text_splitter import SemanticChunker
-        SEMANTIC_CHUNKER_AVAILABLE = True
-    except ImportError:
-        SemanticChunker = None
-        SEMANTIC_CHUNKER_AVAILABLE = False
 
+from .dedupe import NearDuplicateIndex
 from .loaders import (
     load_from_url,
-    load_from_pdf_dir,
     load_from_pdf_file,
     load_from_txt,
     load_from_docx,
 )
+from .manifest import IngestionManifest, hash_directory, hash_documents, hash_file
 from .preprocess import preprocess_documents
-from src.vectorstores.pinecone_store import PineconeStore
+from .semantic import SemanticSplitter
+from src.ingestion.progress import IngestionProgress
+from src.vectorstores.pinecone_store import PineconeStore, chunk_id, document_names, estimate_tokens
 from src.config.settings import settings
 
 
@@ -42,66 +37,409 @@ def infer_source_type(src: str) -> str:
     return "pdf_dir"
 
 
-def load_documents(sources: List[str]) -> List[Document]:
-    docs: List[Document] = []
-    for src in sources:
-        typ = infer_source_type(src)
-        if typ == "url":
-            docs.extend(load_from_url(src))
-        elif typ == "txt":
-            docs.extend(load_from_txt(src))
-        elif typ == "pdf_file":
-            docs.extend(load_from_pdf_file(src))
-        elif typ == "docx":
-            docs.extend(load_from_docx(src))
-        else:  # pdf_dir
-            docs.extend(load_from_pdf_dir(src))
-    return docs
+_LOADERS = {
+    "url": load_from_url,
+    "txt": load_from_txt,
+    "pdf_file": load_from_pdf_file,
+    "docx": load_from_docx,
+}
 
+# Spawned workers re-import langchain and the loaders, which takes seconds;
+# below this many files loading inline is faster.
+PARALLEL_LOAD_MIN_TASKS = 8
+
+# Loaded files the pool may hold or have queued per worker before the
+# splitting/embedding stages catch up.
+LOAD_AHEAD_PER_WORKER = 2
+
+
+def _pdf_files(directory: str) -> List[str]:
+    """PDFs PyPDFDirectoryLoader would load from ``directory``, in sorted order."""
+    root = Path(directory)
+    return [
+        str(path)
+        for path in sorted(root.glob("**/[!.]*.pdf"))
+        if path.is_file() and not any(part.startswith(".") for part in path.relative_to(root).parts)
+    ]
+
+
+def _load_tasks(src: str) -> List[Tuple[str, str]]:
+    """Split a source into ``(type, path)`` load tasks; directories fan out per file."""
+    typ = infer_source_type(src)
+    if typ == "pdf_dir":
+        return [("pdf_file", path) for path in _pdf_files(src)]
+    return [(typ, src)]
 
-def split_documents(documents: List[Document], chunk_size: int = 800, chunk_overlap: int = 150, semantic: bool = True) -> List[Document]:
-    """Split documents using semantic chunking when available; fallback to recursive chars.
 
-    Semantic chunker uses OpenAI embeddings to find natural breakpoints.
+def _load_task(typ: str, path: str, preprocess: bool = False) -> List[Document]:
+    """Load one file or URL, optionally preprocessed; runs in a worker process."""
+    docs = _LOADERS[typ](path)
+    # Header/footer detection is per source file, so one file per task loses nothing
+    return preprocess_documents(docs) if preprocess else docs
+
+
+def _iter_loaded(tasks: List[Tuple[str, str]], preprocess: bool, workers: int) -> Iterator[List[Document]]:
+    """Yield each task's documents in task order, loading ahead a bounded amount.
+
+    On the process pool at most ``LOAD_AHEAD_PER_WORKER`` files per worker
+    are queued or held; the next file is submitted only when the consumer
+    takes one, so a slow downstream stage stops the loaders.
     """
-    if semantic and SEMANTIC_CHUNKER_AVAILABLE:
-        embeddings = OpenAIEmbeddings(model="text-embedding-3-small")
-        print("Using semantic chunker...")
-        semantic_splitter = SemanticChunker(
-            embeddings,
-            breakpoint_threshold_type="percentile",
-            breakpoint_threshold_amount=90,
+    workers = min(workers, os.cpu_count() or 1, len(tasks))
+    if workers <= 1 or len(tasks) < PARALLEL_LOAD_MIN_TASKS:
+        for typ, path in tasks:
+            yield _load_task(typ, path, preprocess)
+        return
+
+    # spawn: the API process runs an event loop and client threads, unsafe to fork
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+        remaining = iter(tasks)
+        pending: Deque[Future] = deque(
+            pool.submit(_load_task, typ, path, preprocess)
+            for typ, path in islice(remaining, workers * LOAD_AHEAD_PER_WORKER)
         )
-        return semantic_splitter.split_documents(documents)
+        try:
+            while pending:
+                docs = pending.popleft().result()
+                task = next(remaining, None)
+                if task is not None:
+                    pending.append(pool.submit(_load_task, task[0], task[1], preprocess))
+                yield docs
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def load_source_groups(
+    sources: List[str],
+    *,
+    preprocess: bool = False,
+    workers: int = 4,
+) -> List[List[Document]]:
+    """Load (and optionally preprocess) each source, returning one list per source.
+
+    Every file is a separate task, including each PDF in a directory source.
+    With ``workers > 1`` (capped at the CPU count) and at least
+    ``PARALLEL_LOAD_MIN_TASKS`` files the tasks run across a process pool.
+    Results keep the order of ``sources`` and, within a directory, sorted
+    file order either way.
+    """
+    tasks = [_load_tasks(src) for src in sources]
+    loaded = _iter_loaded([task for group in tasks for task in group], preprocess, workers)
+    return [[doc for docs in islice(loaded, len(group)) for doc in docs] for group in tasks]
+
+
+def load_documents(sources: List[str], *, preprocess: bool = False, workers: int = 4) -> List[Document]:
+    """Load every source into one list; see :func:`load_source_groups`."""
+    return [doc for group in load_source_groups(sources, preprocess=preprocess, workers=workers) for doc in group]
+
+
+def make_splitter(
+    chunk_size: int = 800,
+    chunk_overlap: int = 150,
+    semantic: bool = True,
+    store: Optional[PineconeStore] = None,
+) -> Any:
+    """Semantic splitter embedding through ``store``; else recursive chars.
+
+    Pass the store the chunks will be upserted to so it can reuse the chunk
+    vectors the semantic splitter derives.
+    """
+    if semantic:
+        return SemanticSplitter(store or PineconeStore(settings.pinecone_index))
 
     # Fall back to recursive character splitter
-    splitter = RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
-    return splitter.split_documents(documents)
+    return RecursiveCharacterTextSplitter(chunk_size=chunk_size, chunk_overlap=chunk_overlap)
 
 
-def ingest_sources(sources: List[str], namespace: str | None = None, preprocess: bool = False) -> int:
-    """Load, split, and upsert chunks into Pinecone. Returns vectors indexed."""
-    docs = load_documents(sources)
-    
-    # Apply preprocessing if requested
-    if preprocess:
-        print("Applying preprocessing to documents...")
-        docs = preprocess_documents(docs)
-        print(f"Preprocessing complete. Documents ready for chunking.")
-    
-    chunks = split_documents(docs)
-    store = PineconeStore(settings.pinecone_index)
-    n = store.upsert(chunks, namespace=namespace)
-    return n
+def split_documents(documents: List[Document], chunk_size: int = 800, chunk_overlap: int = 150, semantic: bool = True) -> List[Document]:
+    """Split documents using semantic chunking; or recursive chars with ``semantic=False``.
+
+    The semantic splitter embeds sentences to find natural breakpoints.
+    """
+    return make_splitter(chunk_size, chunk_overlap, semantic).split_documents(documents)
+
+
+def _source_hash(src: str) -> Optional[str]:
+    """Content hash computable without loading; None for URLs."""
+    typ = infer_source_type(src)
+    if typ == "url":
+        return None
+    if typ == "pdf_dir":
+        return hash_directory(src)
+    return hash_file(src)
+
+
+def _changed_chunks(
+    files: Iterable[List[Document]],
+    splitter: Any,
+    previous_ids: Set[str],
+    chunk_ids: Set[str],
+    progress: Optional[IngestionProgress] = None,
+    duplicates: Optional[NearDuplicateIndex] = None,
+    fingerprints: Optional[Dict[str, int]] = None,
+    shared_ids: Optional[Set[str]] = None,
+    stats: Optional[Dict[str, int]] = None,
+) -> Iterator[Document]:
+    """Split one file at a time and yield chunks not indexed before.
+
+    Every chunk id kept is added to ``chunk_ids``; only the ids outlive the
+    file they came from. With a ``duplicates`` index, chunks near-identical
+    to one already kept are dropped before embedding: kept chunks go into
+    ``fingerprints``, canonical chunks of other sources into ``shared_ids``,
+    and ``stats`` counts what was collapsed.
+    """
+    for docs in files:
+        if progress is not None:
+            progress.check()
+            progress.add("docs_processed", len(docs))
+            progress.advance()
+        for chunk in splitter.split_documents(docs):
+            cid = chunk_id(chunk)
+            if cid in chunk_ids:
+                continue
+            if duplicates is not None:
+                canonical, fingerprint = duplicates.match(cid, chunk.page_content)
+                if canonical is not None:
+                    if canonical not in chunk_ids:
+                        shared_ids.add(canonical)
+                    stats["duplicates_collapsed"] += 1
+                    stats["embedding_tokens_saved"] += estimate_tokens(chunk.page_content)
+                    continue
+                fingerprints[cid] = fingerprint
+            chunk_ids.add(cid)
+            if cid not in previous_ids:
+                yield chunk
+
 
+def _release(manifest: IngestionManifest, scope: str, source: str, chunk_ids: Iterable[str]) -> Tuple[List[str], Set[str]]:
+    """Split chunks ``source`` drops into ids to delete and ids handed to a sharing source."""
+    heirs = manifest.chunk_sources(scope, chunk_ids)
+    stale: List[str] = []
+    handed_over: Set[str] = set()
+    for cid in sorted(chunk_ids):
+        others = [src for src in heirs.get(cid, []) if src != source]
+        if others:
+            manifest.adopt(scope, others[0], cid, source)
+            handed_over.add(cid)
+        else:
+            stale.append(cid)
+    return stale, handed_over
 
-def ingest_files_with_preprocessing(file_sources: List[str], namespace: str | None = None, semantic: bool = True) -> int:
+
+def _sync_sources_metadata(
+    store: PineconeStore,
+    manifest: IngestionManifest,
+    scope: str,
+    chunk_ids: Iterable[str],
+    namespace: Optional[str],
+) -> None:
+    """Rewrite the source fields of canonical chunks whose sharing sources changed."""
+    metadata = {
+        cid: {"source": sources[0], "sources": sources, "documents": document_names(sources)}
+        for cid, sources in manifest.chunk_sources(scope, chunk_ids).items()
+    }
+    store.update_metadata(metadata, namespace=namespace)
+
+
+def sync_sources(
+    sources: List[str],
+    namespace: str | None = None,
+    *,
+    preprocess: bool = False,
+    semantic: bool = True,
+    store: Optional[PineconeStore] = None,
+    manifest: Optional[IngestionManifest] = None,
+    prune: bool = False,
+    load_workers: int = 4,
+    batch_size: int = 128,
+    progress: Optional[IngestionProgress] = None,
+    dedupe: bool = True,
+) -> Dict[str, int]:
+    """Bring the index in line with ``sources`` using the ingestion manifest.
+
+    Unchanged sources (same content hash and pipeline settings) are not
+    loaded, chunked or embedded at all. For changed sources only chunks whose
+    ids are new get embedded and upserted, and ids the source no longer
+    produces are deleted. With ``prune=True`` sources recorded in the
+    manifest but missing from ``sources`` have their vectors removed too.
+
+    Changed sources stream through the stages: files are loaded (with up to
+    ``load_workers`` processes, a bounded number ahead), split one file at a
+    time, and fed to ``store.upsert``, whose embedding window pulls
+    ``batch_size`` chunks at a time only as batches complete. Memory is bounded by those windows and one
+    file's pages rather than by corpus size.
+
+    ``progress`` receives the stage, per-file and per-batch counts, and
+    cancels the run between files or batches; sources finished by then stay
+    recorded in the manifest.
+
+    With ``dedupe`` (the default) chunks whose SimHash is within
+    ``INGEST_DEDUPE_MAX_DISTANCE`` bits of a chunk already indexed in the
+    scope (repeated contact blocks, legal boilerplate) are not embedded or
+    stored; the canonical vector's ``sources`` metadata lists every source
+    it stands in for. ``duplicates_collapsed`` and ``embedding_tokens_saved``
+    report what that skipped.
+    """
+    store = store or PineconeStore(settings.pinecone_index)
+    manifest = manifest or IngestionManifest(settings.ingest_manifest_path)
+    scope = manifest.scope(store.index_name, namespace)
+    splitter = make_splitter(semantic=semantic, store=store)
+    pipeline = f"preprocess={int(preprocess)};semantic={int(semantic)};model={store.embedding_signature}"
+    if semantic:
+        pipeline += f";splitter={splitter.fingerprint}"
+    if dedupe:
+        pipeline += f";dedupe=simhash{settings.ingest_dedupe_max_distance}"
+    stats = {
+        "sources_skipped": 0,
+        "sources_indexed": 0,
+        "chunks_upserted": 0,
+        "chunks_deleted": 0,
+        "duplicates_collapsed": 0,
+        "embedding_tokens_saved": 0,
+    }
+
+    if progress is not None:
+        progress.set_stage("scanning")
+    pending: List[Tuple[str, Optional[str]]] = []
+    for src in sources:
+        content_hash = _source_hash(src)
+        if manifest.is_current(scope, src, content_hash, pipeline):
+            stats["sources_skipped"] += 1
+        else:
+            pending.append((src, content_hash))
+
+    duplicates: Optional[NearDuplicateIndex] = None
+    if dedupe:
+        # Sources being re-indexed re-add the chunks they still produce
+        duplicates = NearDuplicateIndex(settings.ingest_dedupe_max_distance)
+        for cid, fingerprint in manifest.fingerprints(scope, exclude=[src for src, _ in pending]):
+            duplicates.add(cid, fingerprint)
+
+    tasks = [_load_tasks(src) for src, _ in pending]
+    if progress is not None:
+        progress.add_total(sum(len(source_tasks) for source_tasks in tasks))
+        progress.set_stage("indexing")
+    # One stream for every changed file so loaders run ahead across sources
+    loaded = _iter_loaded([task for group in tasks for task in group], preprocess, load_workers)
+    try:
+        for (src, content_hash), source_tasks in zip(pending, tasks):
+            files: Iterator[List[Document]] = islice(loaded, len(source_tasks))
+            if content_hash is None:
+                # URLs: one page set, hashed once loaded
+                docs = [doc for file_docs in files for doc in file_docs]
+                content_hash = hash_documents(docs)
+                if manifest.is_current(scope, src, content_hash, pipeline):
+                    stats["sources_skipped"] += 1
+                    if progress is not None:
+                        progress.advance(len(source_tasks))
+                    continue
+                files = iter([docs])
+
+            previous = manifest.get(scope, src)
+            previous_ids = set(previous["chunk_ids"]) if previous else set()
+            previous_shared = set(previous.get("shared_ids", [])) if previous else set()
+            chunk_ids: Set[str] = set()
+            fingerprints: Dict[str, int] = {}
+            shared_ids: Set[str] = set()
+            collapsed = stats["duplicates_collapsed"]
+            upserted = store.upsert(
+                _changed_chunks(
+                    files, splitter, previous_ids, chunk_ids, progress, duplicates, fingerprints, shared_ids, stats
+                ),
+                namespace=namespace,
+                batch_size=batch_size,
+                on_progress=progress.report if progress is not None else None,
+            )
+            # Dropped chunks other sources still share move to one of them instead
+            stale_ids, handed_over = _release(manifest, scope, src, previous_ids - chunk_ids)
+            stats["chunks_upserted"] += upserted
+            stats["chunks_deleted"] += store.delete(stale_ids, namespace=namespace)
+            stats["sources_indexed"] += 1
+            print(
+                f"{src}: {upserted} new chunks, {len(stale_ids)} stale chunks removed, "
+                f"{stats['duplicates_collapsed'] - collapsed} near-duplicates collapsed"
+            )
+
+            # Saved per source so an interrupted run keeps the work already done
+            manifest.record(
+                scope,
+                src,
+                content_hash=content_hash,
+                pipeline=pipeline,
+                chunk_ids=chunk_ids,
+                fingerprints=fingerprints,
+                shared_ids=shared_ids,
+            )
+            _sync_sources_metadata(store, manifest, scope, (shared_ids ^ previous_shared) | handed_over, namespace)
+            manifest.save()
+    finally:
+        # Stops queued loads on the process pool if the run fails or is cancelled
+        loaded.close()
+
+    if prune:
+        if progress is not None:
+            progress.set_stage("pruning")
+        for src in sorted(set(manifest.sources(scope)) - set(sources)):
+            entry = manifest.get(scope, src) or {}
+            stale_ids, handed_over = _release(manifest, scope, src, entry.get("chunk_ids", []))
+            stats["chunks_deleted"] += store.delete(stale_ids, namespace=namespace)
+            manifest.forget(scope, src)
+            _sync_sources_metadata(store, manifest, scope, set(entry.get("shared_ids", [])) | handed_over, namespace)
+            print(f"{src}: removed from index")
+        manifest.save()
+
+    return stats
+
+
+def ingest_sources(
+    sources: List[str],
+    namespace: str | None = None,
+    preprocess: bool = False,
+    *,
+    store: Optional[PineconeStore] = None,
+    manifest: Optional[IngestionManifest] = None,
+    prune: bool = False,
+) -> int:
+    """Load, split, and upsert new or changed chunks into Pinecone. Returns vectors indexed.
+
+    Sources already indexed with the same content are skipped; see :func:`sync_sources`.
+    """
+    stats = sync_sources(
+        sources,
+        namespace,
+        preprocess=preprocess,
+        store=store,
+        manifest=manifest,
+        prune=prune,
+    )
+    return stats["chunks_upserted"]
+
+
+def ingest_files_with_preprocessing(
+    file_sources: List[str],
+    namespace: str | None = None,
+    semantic: bool = True,
+    *,
+    store: Optional[PineconeStore] = None,
+    manifest: Optional[IngestionManifest] = None,
+    prune: bool = False,
+    progress: Optional[IngestionProgress] = None,
+) -> int:
     """Complete pipeline: Load files -> Preprocess -> Semantic Chunk -> Store in Pinecone.
     
+    Only files that changed since the last run are re-chunked, and only their
+    new chunks are embedded; see :func:`sync_sources`.
+    
     Args:
         file_sources: List of file paths or directories
         namespace: Pinecone namespace (defaults to 'processed-docs')
         semantic: Whether to use semantic chunking
+        store: Vector store override (defaults to the configured index)
+        manifest: Ingestion manifest override (defaults to INGEST_MANIFEST_PATH)
+        prune: Remove vectors of previously indexed files not listed now
+        progress: Receives stage and counts; cancelling it stops the run
     
     Returns:
         Number of vectors upserted to Pinecone
@@ -115,55 +453,23 @@ def ingest_files_with_preprocessing(file_sources: List[str], namespace: str | No
     print(f"Semantic chunking: {semantic}")
     print("=" * 60)
     
-    # Step 1: Load documents from file sources
-    print("Step 1: Loading documents...")
-    docs = load_documents(file_sources)
-    print(f"Loaded {len(docs)} documents from {len(file_sources)} sources")
-    
-    # Show original content stats
-    original_chars = sum(len(doc.page_content) for doc in docs)
-    print(f"Original content: {original_chars:,} characters")
-    
-    # Step 2: Apply preprocessing
-    print("\nStep 2: Applying preprocessing...")
-    print("  - Removing headers/footers")
-    print("  - Normalizing whitespace")
-    print("  - Replacing newlines with spaces")
-    print("  - Cleaning up multiple spaces")
-    
-    processed_docs = preprocess_documents(docs)
-    processed_chars = sum(len(doc.page_content) for doc in processed_docs)
-    reduction = original_chars - processed_chars
-    reduction_pct = (reduction / original_chars * 100) if original_chars > 0 else 0
-    
-    print(f"Processed content: {processed_chars:,} characters")
-    print(f"Reduction: {reduction:,} characters ({reduction_pct:.1f}%)")
-    
-    # Step 3: Apply semantic chunking
-    print(f"\nStep 3: Applying semantic chunking...")
-    chunks = split_documents(processed_docs, semantic=semantic)
-    print(f"Generated {len(chunks)} semantic chunks")
-    
-    # Show chunk statistics
-    chunk_sizes = [len(chunk.page_content) for chunk in chunks]
-    avg_chunk_size = sum(chunk_sizes) / len(chunk_sizes) if chunk_sizes else 0
-    min_chunk_size = min(chunk_sizes) if chunk_sizes else 0
-    max_chunk_size = max(chunk_sizes) if chunk_sizes else 0
-    
-    print(f"Chunk statistics:")
-    print(f"  Average size: {avg_chunk_size:.0f} characters")
-    print(f"  Min size: {min_chunk_size} characters")
-    print(f"  Max size: {max_chunk_size} characters")
-    
-    # Step 4: Store in Pinecone
-    print(f"\nStep 4: Storing in Pinecone...")
-    print(f"Index: {settings.pinecone_index}")
-    print(f"Namespace: {namespace}")
-    
-    store = PineconeStore(settings.pinecone_index)
-    n = store.upsert(chunks, namespace=namespace)
+    stats = sync_sources(
+        file_sources,
+        namespace,
+        preprocess=True,
+        semantic=semantic,
+        store=store,
+        manifest=manifest,
+        prune=prune,
+        progress=progress,
+    )
     
     print(f"\n✅ Pipeline completed successfully!")
-    print(f"Total vectors upserted: {n}")
+    print(f"Unchanged sources skipped: {stats['sources_skipped']}")
+    print(f"Sources re-indexed: {stats['sources_indexed']}")
+    print(f"Total vectors upserted: {stats['chunks_upserted']}")
+    print(f"Stale vectors deleted: {stats['chunks_deleted']}")
+    print(f"Near-duplicate chunks collapsed: {stats['duplicates_collapsed']}")
+    print(f"Embedding tokens saved (est.): {stats['embedding_tokens_saved']}")
     
-    return n
+    return stats["chunks_upserted"]
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
 import re
+from itertools import islice
 from typing import List, Iterable
 
 from langchain.schema import Document
@@ -9,49 +10,47 @@ from langchain.schema import Document
 HEADER_FOOTER_MAX_LINES = 2
 
 
+# Hyphenation at line breaks: "exam-\nple" -> "example"
+_LINE_BREAK_HYPHEN = re.compile(r"(\w)-\n(\w)")
+# Any whitespace run, newlines included, becomes one space
+_WHITESPACE_RUN = re.compile(r"[ \t\n\x0b\x0c\r]+")
+
+
 def _normalize_whitespace(text: str) -> str:
-    text = text.replace("\u00AD", "")  # soft hyphen
-    # fix hyphenation at line breaks: "exam-\nple" -> "example"
-    text = re.sub(r"(\w)-\n(\w)", r"\1\2", text)
-    # collapse multiple newlines but preserve paragraph breaks
-    text = re.sub(r"\n{3,}", "\n\n", text)
-    # collapse internal whitespace sequences
-    text = re.sub(r"[ \t\x0b\x0c\r]+", " ", text)
-    # trim spaces around newlines
-    text = re.sub(r" *\n *", "\n", text)
-    # replace remaining newlines with spaces
-    text = text.replace("\n", " ")
-    # clean up multiple spaces that may result from newline replacement
-    text = re.sub(r" +", " ", text)
-    return text.strip()
-
-
-def _detect_repeated_lines(pages: List[str]) -> set[str]:
+    if "\u00AD" in text:
+        text = text.replace("\u00AD", "")  # soft hyphen
+    # Most pages have no broken words; skip that pass for them
+    if "-\n" in text:
+        text = _LINE_BREAK_HYPHEN.sub(r"\1\2", text)
+    return _WHITESPACE_RUN.sub(" ", text).strip()
+
+
+def _detect_repeated_lines(page_lines: List[List[str]]) -> set[str]:
     """Find header/footer lines that repeat across many pages."""
     counts: dict[str, int] = {}
-    for page in pages:
-        lines = [l.strip() for l in page.splitlines() if l.strip()]
-        if not lines:
+    for lines in page_lines:
+        # Only the first and last non-blank lines matter; the body is never stripped
+        head = list(islice(filter(None, map(str.strip, lines)), HEADER_FOOTER_MAX_LINES))
+        if not head:
             continue
-        head = lines[:HEADER_FOOTER_MAX_LINES]
-        foot = lines[-HEADER_FOOTER_MAX_LINES:]
+        foot = list(islice(filter(None, map(str.strip, reversed(lines))), HEADER_FOOTER_MAX_LINES))
         for l in head + foot:
             counts[l] = counts.get(l, 0) + 1
 
-    repeated = {l for l, c in counts.items() if c >= max(2, len(pages) // 3)}
+    repeated = {l for l, c in counts.items() if c >= max(2, len(page_lines) // 3)}
     return repeated
 
 
-def _remove_headers_footers(page_text: str, repeated_lines: set[str]) -> str:
-    lines = [l for l in page_text.splitlines()]
+def _remove_headers_footers(lines: List[str], repeated_lines: set[str]) -> str:
     # remove matching lines at page edges only
-    for i in range(min(HEADER_FOOTER_MAX_LINES, len(lines))):
-        if lines and lines[0].strip() in repeated_lines:
-            lines.pop(0)
-    for i in range(min(HEADER_FOOTER_MAX_LINES, len(lines))):
-        if lines and lines[-1].strip() in repeated_lines:
-            lines.pop()
-    return "\n".join(lines)
+    start, end = 0, len(lines)
+    if repeated_lines:
+        while start < min(HEADER_FOOTER_MAX_LINES, end) and lines[start].strip() in repeated_lines:
+            start += 1
+        kept = end - start
+        while end > start and len(lines) - end < min(HEADER_FOOTER_MAX_LINES, kept) and lines[end - 1].strip() in repeated_lines:
+            end -= 1
+    return "\n".join(lines[start:end])
 
 
 def preprocess_documents(documents: Iterable[Document]) -> List[Document]:
@@ -74,10 +73,11 @@ def preprocess_documents(documents: Iterable[Document]) -> List[Document]:
 
     cleaned: List[Document] = []
     for src, group in by_source.items():
-        pages = [g.page_content for g in group]
-        repeated = _detect_repeated_lines(pages)
-        for g in group:
-            text = _remove_headers_footers(g.page_content, repeated)
+        # Split each page once; detection and removal share the lines
+        page_lines = [g.page_content.splitlines() for g in group]
+        repeated = _detect_repeated_lines(page_lines)
+        for g, lines in zip(group, page_lines):
+            text = _remove_headers_footers(lines, repeated)
             text = _normalize_whitespace(text)
             cleaned.append(Document(page_content=text, metadata=g.metadata))
 
@@ -0,0 +1,97 @@
+"""Semantic chunking on sentence embeddings that are reused for indexing.
+
+LangChain's ``SemanticChunker`` embeds a window of three sentences around
+every sentence to find topic shifts, and the vector store then embeds each
+resulting chunk again, so every token is paid for about four times.
+:class:`SemanticSplitter` embeds each sentence once. Window and chunk vectors
+are derived from those embeddings with NumPy: a length-weighted mean of
+unit sentence vectors, renormalised. That is an approximation of embedding
+the joined text, so ``derive_chunk_embeddings=False`` is available for
+indexes where it matters; sentence embeddings are still computed once.
+"""
+
+from __future__ import annotations
+
+import copy
+import re
+from typing import Iterable, List, Optional, Tuple
+
+import numpy as np
+from langchain.schema import Document
+
+from src.vectorstores.pinecone_store import PineconeStore
+
+# Same boundaries as SemanticChunker's default sentence_split_regex
+SENTENCE_SPLIT = re.compile(r"(?<=[.?!])\s+")
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+class SemanticSplitter:
+    """Split documents where adjacent sentence windows drift apart.
+
+    Sentences are embedded through ``store.embed`` (batched, rate limited).
+    The distance between the windows around neighbouring sentences is one
+    minus their cosine similarity, and a chunk ends wherever it exceeds the
+    ``breakpoint_percentile`` of a text's distances, as with
+    ``SemanticChunker(breakpoint_threshold_type="percentile")``. Chunk
+    vectors go into ``store.embedding_cache`` so ``store.upsert`` skips the
+    embeddings API for them.
+    """
+
+    def __init__(
+        self,
+        store: PineconeStore,
+        *,
+        buffer_size: int = 1,
+        breakpoint_percentile: float = 90.0,
+        derive_chunk_embeddings: bool = True,
+    ) -> None:
+        self.store = store
+        self.buffer_size = buffer_size
+        self.breakpoint_percentile = breakpoint_percentile
+        self.derive_chunk_embeddings = derive_chunk_embeddings
+
+    @property
+    def fingerprint(self) -> str:
+        """Settings that change the chunks or vectors, for the ingestion manifest."""
+        vectors = "derived" if self.derive_chunk_embeddings else "exact"
+        return f"numpy-semantic:b{self.buffer_size}:p{self.breakpoint_percentile:g}:{vectors}"
+
+    def split_with_embeddings(self, text: str) -> List[Tuple[str, Optional[np.ndarray]]]:
+        """Return ``(chunk_text, unit_vector)`` pairs; single-sentence texts get no vector."""
+        sentences = [sentence for sentence in SENTENCE_SPLIT.split(text) if sentence.strip()]
+        if len(sentences) <= 1:
+            return [(sentence, None) for sentence in sentences]
+
+        units = _unit_rows(self.store.embed(sentences))
+        weighted = units * np.array([len(sentence) for sentence in sentences], dtype=np.float32)[:, None]
+        # Prefix sums make every window and chunk sum a single subtraction
+        totals = np.vstack([np.zeros((1, units.shape[1]), dtype=np.float32), np.cumsum(weighted, axis=0)])
+
+        positions = np.arange(len(sentences))
+        lower = np.maximum(positions - self.buffer_size, 0)
+        upper = np.minimum(positions + self.buffer_size + 1, len(sentences))
+        windows = _unit_rows(totals[upper] - totals[lower])
+        distances = 1.0 - np.einsum("ij,ij->i", windows[:-1], windows[1:])
+
+        threshold = np.percentile(distances, self.breakpoint_percentile)
+        ends = np.append(np.flatnonzero(distances > threshold) + 1, len(sentences))
+        starts = np.concatenate([[0], ends[:-1]])
+        vectors = _unit_rows(totals[ends] - totals[starts])
+        return [
+            (" ".join(sentences[start:end]), vector)
+            for start, end, vector in zip(starts.tolist(), ends.tolist(), vectors)
+        ]
+
+    def split_documents(self, documents: Iterable[Document]) -> List[Document]:
+        chunks: List[Document] = []
+        for doc in documents:
+            for text, vector in self.split_with_embeddings(doc.page_content):
+                if vector is not None and self.derive_chunk_embeddings:
+                    self.store.embedding_cache.put(self.store.embedding_signature, text, vector)
+                chunks.append(Document(page_content=text, metadata=copy.deepcopy(doc.metadata)))
+        return chunks
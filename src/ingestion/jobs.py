@@ -0,0 +1,140 @@
+"""In-process ingestion jobs: run pipelines off the API event loop and track them."""
+
+from __future__ import annotations
+
+import logging
+import threading
+import uuid
+from collections import OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, List, Optional
+
+from .progress import IngestionCancelled, IngestionProgress
+
+logger = logging.getLogger(__name__)
+
+JOB_STATUSES = ("queued", "running", "succeeded", "failed", "cancelled")
+
+JobRunner = Callable[[IngestionProgress], Any]
+
+
+def _utc_now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+class IngestionJob:
+    """One submitted ingestion run and its progress."""
+
+    def __init__(self, kind: str, params: Dict[str, Any]) -> None:
+        self.id = uuid.uuid4().hex
+        self.kind = kind
+        self.params = params
+        self.status = "queued"
+        self.progress = IngestionProgress()
+        self.result: Any = None
+        self.error: Optional[str] = None
+        self.created_at = _utc_now()
+        self.started_at: Optional[datetime] = None
+        self.finished_at: Optional[datetime] = None
+        self.future: Optional[Future] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in ("succeeded", "failed", "cancelled")
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {
+            "job_id": self.id,
+            "kind": self.kind,
+            "status": self.status,
+            "params": self.params,
+            "progress": self.progress.snapshot(),
+            "result": self.result,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+
+class IngestionJobManager:
+    """Queue of ingestion jobs executed on a small thread pool.
+
+    Pipelines are blocking (document loading, embedding, process pools) or
+    run their own event loop (``load_csvs``), so each job gets a worker
+    thread and the API loop only reads progress. ``max_workers`` bounds how
+    many jobs run at once; the rest wait queued. The registry keeps the
+    latest ``max_jobs`` jobs and lives in this process, so with several API
+    workers a job is only visible from the worker that accepted it.
+    """
+
+    def __init__(self, max_workers: int = 1, max_jobs: int = 100) -> None:
+        self.max_jobs = max_jobs
+        self._executor = ThreadPoolExecutor(max_workers=max(1, max_workers), thread_name_prefix="ingest-job")
+        self._jobs: "OrderedDict[str, IngestionJob]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, kind: str, runner: JobRunner, params: Optional[Dict[str, Any]] = None) -> IngestionJob:
+        job = IngestionJob(kind, params or {})
+        with self._lock:
+            self._jobs[job.id] = job
+            self._evict_finished()
+        job.future = self._executor.submit(self._run, job, runner)
+        logger.info("ingest_job.queued job_id=%s kind=%s", job.id, kind)
+        return job
+
+    def _evict_finished(self) -> None:
+        excess = len(self._jobs) - self.max_jobs
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished][:max(excess, 0)]:
+            del self._jobs[job_id]
+
+    def _run(self, job: IngestionJob, runner: JobRunner) -> None:
+        if job.progress.cancelled:
+            job.status = "cancelled"
+            job.finished_at = _utc_now()
+            job.progress.set_stage("cancelled")
+            return
+        job.status = "running"
+        job.started_at = _utc_now()
+        job.progress.set_stage("starting")
+        try:
+            job.result = runner(job.progress)
+            job.status = "succeeded"
+        except IngestionCancelled:
+            job.status = "cancelled"
+        except Exception as exc:
+            logger.exception("ingest_job.failed job_id=%s kind=%s", job.id, job.kind)
+            job.error = f"{exc.__class__.__name__}: {exc}"
+            job.status = "failed"
+        finally:
+            job.finished_at = _utc_now()
+            job.progress.set_stage(job.status)
+        logger.info("ingest_job.finished job_id=%s status=%s", job.id, job.status)
+
+    def get(self, job_id: str) -> Optional[IngestionJob]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def list(self) -> List[IngestionJob]:
+        with self._lock:
+            return list(reversed(self._jobs.values()))
+
+    def cancel(self, job_id: str) -> Optional[IngestionJob]:
+        """Cancel a queued job outright, or ask a running one to stop at its next checkpoint."""
+        job = self.get(job_id)
+        if job is None or job.finished:
+            return job
+        job.progress.cancel()
+        if job.future is not None and job.future.cancel():
+            job.status = "cancelled"
+            job.finished_at = _utc_now()
+            job.progress.set_stage("cancelled")
+        return job
+
+    def shutdown(self) -> None:
+        """Cancel everything and return without waiting for running jobs to unwind."""
+        for job in self.list():
+            if not job.finished:
+                job.progress.cancel()
+        self._executor.shutdown(wait=False, cancel_futures=True)
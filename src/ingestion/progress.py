@@ -0,0 +1,83 @@
+"""Progress reporting and cooperative cancellation for ingestion runs."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+PROGRESS_COUNTERS = ("docs_processed", "chunks_embedded", "vectors_upserted", "rows_loaded")
+
+
+class IngestionCancelled(Exception):
+    """Raised inside a pipeline once its run has been cancelled."""
+
+
+class IngestionProgress:
+    """Counters a running ingestion reports into, readable from other threads.
+
+    Pipelines set a ``stage``, bump the counters in ``PROGRESS_COUNTERS`` and
+    advance ``done`` towards ``total`` work units (files for documents, CSV
+    bytes for tables), which is what the ETA is extrapolated from. They call
+    :meth:`check` between units of work, so :meth:`cancel` stops a run at the
+    next file or batch boundary.
+    """
+
+    def __init__(self, clock: Callable[[], float] = time.monotonic) -> None:
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._cancelled = threading.Event()
+        self._started: Optional[float] = None
+        self.stage = "queued"
+        self.total = 0
+        self.done = 0
+        self.counters: Dict[str, int] = dict.fromkeys(PROGRESS_COUNTERS, 0)
+
+    def set_stage(self, stage: str) -> None:
+        with self._lock:
+            if self._started is None:
+                self._started = self._clock()
+            self.stage = stage
+
+    def add_total(self, units: int) -> None:
+        with self._lock:
+            self.total += units
+
+    def advance(self, units: int = 1) -> None:
+        with self._lock:
+            self.done += units
+
+    def add(self, counter: str, amount: int = 1) -> None:
+        with self._lock:
+            self.counters[counter] += amount
+
+    def cancel(self) -> None:
+        self._cancelled.set()
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancelled.is_set()
+
+    def check(self) -> None:
+        if self._cancelled.is_set():
+            raise IngestionCancelled()
+
+    def report(self, counter: str, amount: int) -> None:
+        """``add`` then ``check``; the callback shape ``PineconeStore.upsert`` takes."""
+        self.add(counter, amount)
+        self.check()
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            elapsed = self._clock() - self._started if self._started is not None else 0.0
+            eta = None
+            if 0 < self.done < self.total:
+                eta = round(elapsed * (self.total - self.done) / self.done, 1)
+            return {
+                "stage": self.stage,
+                **self.counters,
+                "units_done": self.done,
+                "units_total": self.total,
+                "elapsed_seconds": round(elapsed, 1),
+                "eta_seconds": eta,
+            }
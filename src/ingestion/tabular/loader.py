@@ -2,14 +2,27 @@ from __future__ import annotations
 
 import asyncio
 import csv
+import logging
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Iterable, List, Optional
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
 
 from datetime import date
 
+import numpy as np
+
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncConnection, create_async_engine
 
+from src.cache.order_cache import OrderLookupCache
+from src.ingestion.progress import IngestionProgress
+from .columnar import ColumnBatch, iter_column_batches, parse_csv
+
+logger = logging.getLogger(__name__)
+
+LOAD_MODES = ("insert", "copy", "upsert")
 
 CUSTOMER_COLUMNS = ["customer_id", "first_name", "last_name", "email", "gender", "user_id", "passcode"]
 ORDER_COLUMNS = ["order_id", "customer_id", "product_id", "quantity", "order_date", "delivery_date"]
@@ -38,6 +51,53 @@ PRODUCT_COERCIONS = {
     "unit_price": float,
 }
 
+# Column kinds for the columnar parser used by the copy and upsert modes
+CUSTOMER_COLUMN_TYPES = {
+    "customer_id": "int",
+    "first_name": "text",
+    "last_name": "text",
+    "email": "text",
+    "gender": "text",
+    "user_id": "text",
+    "passcode": "text",
+}
+ORDER_COLUMN_TYPES = {
+    "order_id": "int",
+    "customer_id": "int",
+    "product_id": "int",
+    "quantity": "int",
+    "order_date": "date",
+    "delivery_date": "date",
+}
+PRODUCT_COLUMN_TYPES = {
+    "product_id": "int",
+    "product_name": "text",
+    "product_category": "text",
+    "unit_price": "decimal",
+}
+
+# Spawned workers re-import the ingestion package, which takes seconds; below
+# this many bytes of customer + product CSV parsing inline is faster.
+PARALLEL_PARSE_MIN_BYTES = 256 * 1024 * 1024
+
+# get_order_for_user and verify_user_credentials both filter on customers.user_id,
+# and orders are joined to their customer by customer_id.
+# Columns added after the tables were first created: user_id and passcode
+# came with login support, row_hash is what upsert mode compares to skip
+# unchanged rows
+ADDED_COLUMNS = (
+    ("customers", "user_id"),
+    ("customers", "passcode"),
+    ("customers", "row_hash"),
+    ("products", "row_hash"),
+    ("orders", "row_hash"),
+)
+
+SCHEMA_INDEXES = {
+    "customers_user_id_idx": "CREATE INDEX IF NOT EXISTS customers_user_id_idx ON customers (user_id)",
+    "orders_customer_id_idx": "CREATE INDEX IF NOT EXISTS orders_customer_id_idx ON orders (customer_id)",
+}
+
 
 def create_engine_from_dsn(dsn: str) -> AsyncEngine:
     if not dsn:
@@ -57,16 +117,82 @@ async def load_csvs(
     customers_path: Optional[str] = None,
     orders_path: Optional[str] = None,
     products_path: Optional[str] = None,
+    *,
+    mode: str = "insert",
+    order_cache: Optional[OrderLookupCache] = None,
+    parse_workers: int = 2,
+    chunk_rows: int = 50_000,
+    progress: Optional[IngestionProgress] = None,
 ) -> int:
-    total_rows = 0
+    """Reload the given CSVs in one transaction and return the rows written.
+
+    ``mode="insert"`` parses each file into memory and runs batched INSERTs;
+    ``mode="copy"`` streams rows through ``COPY ... FROM STDIN`` in constant
+    memory, which is the one to use for large order files. Both replace the
+    table contents, and truncating customers cascades to orders.
+
+    The copy and upsert modes parse files into typed NumPy batches of
+    ``chunk_rows`` rows. Customers and products do not depend on each other,
+    so large ones are parsed side by side in up to ``parse_workers``
+    processes while orders stream from the main process.
+
+    ``mode="upsert"`` is for refreshing a live database: rows are streamed
+    into temp staging tables and merged with ``INSERT ... ON CONFLICT``,
+    touching only rows whose hash changed and returning that count. Rows
+    missing from a file are kept. Readers see the previous data until the
+    transaction commits. Missing columns and indexes are added in a short
+    transaction before the load, so the merge itself only takes row locks.
+
+    Cached order lookups join all three tables, so ``order_cache`` is
+    invalidated once the reload has committed.
+
+    ``progress`` gets the table being loaded, rows per batch and CSV bytes
+    done. Cancelling it raises between tables or batches, which rolls the
+    whole load back.
+    """
+    if mode not in LOAD_MODES:
+        raise ValueError(f"Unknown load mode {mode!r}; expected one of {', '.join(LOAD_MODES)}")
+    load_customers, load_products, load_orders = _TABLE_LOADERS[mode]
+    sources: Dict[str, Any] = {"customers": customers_path, "products": products_path, "orders": orders_path}
+    if mode != "insert":
+        sources = await _column_sources(sources, parse_workers, chunk_rows)
+
+    steps = [
+        ("customers", customers_path, load_customers),
+        ("products", products_path, load_products),
+        ("orders", orders_path, load_orders),
+    ]
+    if progress is not None:
+        progress.add_total(sum(_file_size(path) for _, path, _ in steps if path))
+
+    # Schema changes commit on their own first: ALTER TABLE takes ACCESS
+    # EXCLUSIVE even when the column exists, and inside the load transaction
+    # that lock would block readers until the merge commits
     async with engine.begin() as conn:
         await _ensure_schema(conn)
-        if customers_path:
-            total_rows += await _load_customers(conn, customers_path)
-        if products_path:
-            total_rows += await _load_products(conn, products_path)
-        if orders_path:
-            total_rows += await _load_orders(conn, orders_path)
+
+    total_rows = 0
+    async with engine.begin() as conn:
+        for table, path, load in steps:
+            if not path:
+                continue
+            source = sources[table]
+            if progress is not None:
+                progress.check()
+                progress.set_stage(f"loading {table}")
+                if mode != "insert":
+                    source = _tracked_batches(source, progress)
+            rows = await load(conn, source)
+            total_rows += rows
+            if progress is not None:
+                if mode == "insert":
+                    progress.add("rows_loaded", rows)
+                progress.advance(_file_size(path))
+        if total_rows:
+            # Refresh planner statistics so the lookups use the indexes right away
+            await conn.execute(text("ANALYZE customers, products, orders"))
+    if order_cache is not None and total_rows:
+        order_cache.invalidate()
     return total_rows
 
 
@@ -112,6 +238,36 @@ async def _ensure_schema(conn: AsyncConnection) -> None:
             """
         )
     )
+    # Only ALTER tables that lack a column: the statement locks the table
+    # exclusively even when IF NOT EXISTS turns it into a no-op
+    existing = await conn.execute(
+        text(
+            """
+            SELECT table_name, column_name FROM information_schema.columns
+            WHERE table_schema = current_schema() AND table_name IN ('customers', 'products', 'orders')
+            """
+        )
+    )
+    present = {(str(table), str(column)) for table, column in existing}
+    for table, column in ADDED_COLUMNS:
+        if (table, column) not in present:
+            await conn.execute(text(f"ALTER TABLE {table} ADD COLUMN IF NOT EXISTS {column} TEXT"))
+    await _ensure_indexes(conn)
+
+
+async def _ensure_indexes(conn: AsyncConnection) -> None:
+    existing = await conn.execute(text("SELECT indexname FROM pg_indexes WHERE schemaname = current_schema()"))
+    present = {str(name) for (name,) in existing}
+    for name, statement in SCHEMA_INDEXES.items():
+        if name not in present:
+            await conn.execute(text(statement))
+
+
+def _apply_customer_defaults(row: Dict[str, Any]) -> None:
+    row.setdefault("user_id", row.get("email"))
+    if not row.get("user_id"):
+        row["user_id"] = row.get("email") or f"customer-{row.get('customer_id')}"
+    row.setdefault("passcode", "12345")
 
 
 async def _load_customers(conn: AsyncConnection, path: str) -> int:
@@ -120,13 +276,8 @@ async def _load_customers(conn: AsyncConnection, path: str) -> int:
         return 0
 
     for row in rows:
-        row.setdefault("user_id", row.get("email"))
-        if not row.get("user_id"):
-            row["user_id"] = row.get("email") or f"customer-{row.get('customer_id')}"
-        row.setdefault("passcode", "12345")
+        _apply_customer_defaults(row)
 
-    await conn.execute(text("ALTER TABLE customers ADD COLUMN IF NOT EXISTS user_id TEXT"))
-    await conn.execute(text("ALTER TABLE customers ADD COLUMN IF NOT EXISTS passcode TEXT"))
     await conn.execute(text("TRUNCATE TABLE customers RESTART IDENTITY CASCADE"))
 
     insert = text(
@@ -171,6 +322,180 @@ async def _load_products(conn: AsyncConnection, path: str) -> int:
     return len(rows)
 
 
+async def _copy_customers(conn: AsyncConnection, batches: Iterable[ColumnBatch]) -> int:
+    await conn.execute(text("TRUNCATE TABLE customers RESTART IDENTITY CASCADE"))
+    records = _batch_records(batches, CUSTOMER_COLUMNS, _apply_customer_batch_defaults)
+    return await _copy_records(conn, "customers", CUSTOMER_COLUMNS, records)
+
+
+async def _copy_orders(conn: AsyncConnection, batches: Iterable[ColumnBatch]) -> int:
+    await conn.execute(text("TRUNCATE TABLE orders RESTART IDENTITY CASCADE"))
+    return await _copy_records(conn, "orders", ORDER_COLUMNS, _batch_records(batches, ORDER_COLUMNS))
+
+
+async def _copy_products(conn: AsyncConnection, batches: Iterable[ColumnBatch]) -> int:
+    await conn.execute(text("TRUNCATE TABLE products RESTART IDENTITY CASCADE"))
+    return await _copy_records(conn, "products", PRODUCT_COLUMNS, _batch_records(batches, PRODUCT_COLUMNS))
+
+
+async def _upsert_customers(conn: AsyncConnection, batches: Iterable[ColumnBatch]) -> int:
+    records = _batch_records(batches, CUSTOMER_COLUMNS, _apply_customer_batch_defaults)
+    return await _merge_records(conn, "customers", "customer_id", CUSTOMER_COLUMNS, records)
+
+
+async def _upsert_orders(conn: AsyncConnection, batches: Iterable[ColumnBatch]) -> int:
+    records = _batch_records(batches, ORDER_COLUMNS)
+    return await _merge_records(conn, "orders", "order_id", ORDER_COLUMNS, records)
+
+
+async def _upsert_products(conn: AsyncConnection, batches: Iterable[ColumnBatch]) -> int:
+    records = _batch_records(batches, PRODUCT_COLUMNS)
+    return await _merge_records(conn, "products", "product_id", PRODUCT_COLUMNS, records)
+
+
+async def _merge_records(
+    conn: AsyncConnection,
+    table: str,
+    key: str,
+    columns: Sequence[str],
+    records: Iterable[Tuple[Any, ...]],
+) -> int:
+    """COPY ``records`` into a temp table and merge the changed ones into ``table``."""
+    stage = f"{table}_stage"
+    await conn.execute(text(f"CREATE TEMP TABLE {stage} (LIKE {table} INCLUDING DEFAULTS) ON COMMIT DROP"))
+    staged = await _copy_records(conn, stage, columns, records)
+
+    column_list = ", ".join(columns)
+    updates = ", ".join(f"{column} = EXCLUDED.{column}" for column in [*columns, "row_hash"] if column != key)
+    # DISTINCT ON keeps the last occurrence of a key in the file: ON CONFLICT
+    # cannot update the same row twice in one statement.
+    result = await conn.execute(
+        text(
+            f"""
+            INSERT INTO {table} ({column_list}, row_hash)
+            SELECT DISTINCT ON ({key}) {column_list}, md5(ROW({column_list})::text)
+            FROM {stage}
+            ORDER BY {key}, ctid DESC
+            ON CONFLICT ({key}) DO UPDATE SET {updates}
+            WHERE {table}.row_hash IS DISTINCT FROM EXCLUDED.row_hash
+            """
+        )
+    )
+    changed = result.rowcount
+    logger.info("ingest.upsert table=%s staged=%d changed=%d", table, staged, changed)
+    return changed
+
+
+async def _copy_records(
+    conn: AsyncConnection,
+    table: str,
+    columns: Sequence[str],
+    records: Iterable[Tuple[Any, ...]],
+) -> int:
+    """Stream ``records`` into ``table`` with COPY on the transaction's connection."""
+    raw = await conn.get_raw_connection()
+    driver_conn = raw.driver_connection
+    started = time.perf_counter()
+    if conn.dialect.driver == "asyncpg":
+        status = await driver_conn.copy_records_to_table(table, records=records, columns=list(columns))
+        count = int(status.split()[-1])
+    else:
+        count = 0
+        async with driver_conn.cursor() as cur:
+            async with cur.copy(f"COPY {table} ({', '.join(columns)}) FROM STDIN") as copy:
+                for record in records:
+                    await copy.write_row(record)
+                    count += 1
+    elapsed = time.perf_counter() - started
+    logger.info(
+        "ingest.copy table=%s rows=%d seconds=%.2f rows_per_second=%.0f",
+        table,
+        count,
+        elapsed,
+        count / elapsed if elapsed else 0.0,
+    )
+    return count
+
+
+_COLUMN_TYPES = {
+    "customers": CUSTOMER_COLUMN_TYPES,
+    "products": PRODUCT_COLUMN_TYPES,
+    "orders": ORDER_COLUMN_TYPES,
+}
+
+
+async def _column_sources(
+    paths: Dict[str, Optional[str]],
+    parse_workers: int,
+    chunk_rows: int,
+) -> Dict[str, Iterable[ColumnBatch]]:
+    """Turn CSV paths into batch sources, parsing independent files in parallel.
+
+    Every path is opened (or parsed) here, before the load transaction
+    starts, so a missing file fails before any table is truncated.
+    """
+    sources: Dict[str, Iterable[ColumnBatch]] = {}
+    independent = {table: paths[table] for table in ("customers", "products") if paths.get(table)}
+    total_bytes = sum(Path(path).stat().st_size for path in independent.values() if Path(path).exists())
+    if parse_workers > 1 and len(independent) > 1 and total_bytes >= PARALLEL_PARSE_MIN_BYTES:
+        loop = asyncio.get_running_loop()
+        # spawn: forking a process that runs an event loop and client threads is unsafe
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=min(parse_workers, len(independent)), mp_context=context) as pool:
+            parsed = await asyncio.gather(
+                *(
+                    loop.run_in_executor(pool, parse_csv, path, _COLUMN_TYPES[table], chunk_rows)
+                    for table, path in independent.items()
+                )
+            )
+        sources.update(zip(independent, parsed))
+
+    for table, path in paths.items():
+        if path and table not in sources:
+            sources[table] = iter_column_batches(path, _COLUMN_TYPES[table], chunk_rows=chunk_rows)
+    return sources
+
+
+def _file_size(path: str) -> int:
+    file_path = Path(path)
+    return file_path.stat().st_size if file_path.exists() else 0
+
+
+def _tracked_batches(batches: Iterable[ColumnBatch], progress: IngestionProgress) -> Iterator[ColumnBatch]:
+    for batch in batches:
+        progress.check()
+        yield batch
+        progress.add("rows_loaded", len(batch))
+
+
+def _apply_customer_batch_defaults(batch: ColumnBatch) -> None:
+    """Columnar twin of :func:`_apply_customer_defaults`."""
+    size = len(batch)
+    customer_ids = batch.columns["customer_id"].tolist() if "customer_id" in batch.columns else [None] * size
+    emails = batch.columns["email"].tolist() if "email" in batch.columns else [None] * size
+    user_ids = batch.columns["user_id"].tolist() if "user_id" in batch.columns else emails
+    batch.columns["user_id"] = np.array(
+        [
+            user_id or email or f"customer-{customer_id}"
+            for user_id, email, customer_id in zip(user_ids, emails, customer_ids)
+        ],
+        dtype=object,
+    )
+    if "passcode" not in batch.columns:
+        batch.columns["passcode"] = np.full(size, "12345", dtype=object)
+
+
+def _batch_records(
+    batches: Iterable[ColumnBatch],
+    columns: Sequence[str],
+    prepare: Optional[Callable[[ColumnBatch], None]] = None,
+) -> Iterator[Tuple[Any, ...]]:
+    for batch in batches:
+        if prepare:
+            prepare(batch)
+        yield from batch.records(columns)
+
+
 def _read_csv(path: str, coercions: Optional[dict[str, callable]] = None) -> List[dict]:
     file_path = Path(path)
     if not file_path.exists():
@@ -190,3 +515,10 @@ def _read_csv(path: str, coercions: Optional[dict[str, callable]] = None) -> Lis
 
 async def close_engine(engine: AsyncEngine) -> None:
     await engine.dispose()
+
+
+_TABLE_LOADERS = {
+    "insert": (_load_customers, _load_products, _load_orders),
+    "copy": (_copy_customers, _copy_products, _copy_orders),
+    "upsert": (_upsert_customers, _upsert_products, _upsert_orders),
+}
@@ -1,5 +1,6 @@
 """Mongo persistence layer for sessions and message history."""
 
-from .store import Mongo, ObjectId, ReturnDocument
+from .async_store import AsyncMongo
+from .store import BulkWriteError, Mongo, ObjectId, ReturnDocument
 
-__all__ = ["Mongo", "ObjectId", "ReturnDocument"]
+__all__ = ["AsyncMongo", "BulkWriteError", "Mongo", "ObjectId", "ReturnDocument"]
@@ -0,0 +1,196 @@
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from .store import BulkWriteError, OperationFailure, ReturnDocument, _MESSAGE_PROJECTION, _MESSAGE_SORT, _MongoBase
+
+try:  # pragma: no cover - runtime dependency
+    from pymongo import AsyncMongoClient
+except ImportError:  # pragma: no cover - lightweight fallback for tests
+    class AsyncMongoClient:  # type: ignore[no-redef]
+        def __init__(self, *args: Any, **kwargs: Any) -> None:
+            raise RuntimeError("pymongo>=4.13 is required unless a custom client is provided")
+
+
+class AsyncMongo(_MongoBase):
+    """asyncio counterpart of :class:`Mongo` built on pymongo's AsyncMongoClient.
+
+    Method names and return values match the sync store. Indexes are created
+    by awaiting :meth:`ensure_indexes` once at startup.
+    """
+
+    def __init__(
+        self,
+        uri: str,
+        db_name: str = "ecomm",
+        *,
+        client: Optional[AsyncMongoClient] = None,
+        **client_options: Any,
+    ):
+        self.client = client or AsyncMongoClient(uri, **client_options)
+        self._bind(db_name)
+
+    async def ensure_indexes(self) -> None:
+        for collection, indexes in self._index_plan():
+            await collection.create_indexes(indexes)
+        for collection, name in self._retired_indexes():
+            try:
+                await collection.drop_index(name)
+            except OperationFailure as exc:
+                if exc.code != 27:  # IndexNotFound: already dropped
+                    raise
+
+    async def ping(self) -> None:
+        await self.client.admin.command("ping")
+
+    async def close(self) -> None:
+        await self.client.close()
+
+    async def create_session(
+        self, session_id: str, user_id: str, metadata: Optional[Dict[str, Any]] = None
+    ) -> Dict[str, Any]:
+        await self._sessions.update_one(
+            {"session_id": session_id},
+            self._session_upsert(user_id, metadata),
+            upsert=True,
+        )
+
+        doc = await self._sessions.find_one({"session_id": session_id})
+        if doc is None:
+            raise RuntimeError(f"Failed to upsert session {session_id}")
+        return doc
+
+    async def append_message(
+        self,
+        session_id: str,
+        role: str,
+        content: str,
+        *,
+        user_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        created_at: Optional[datetime] = None,
+    ) -> str:
+        ts = created_at or self._utc_now()
+        doc = self._message_doc(session_id, role, content, ts, user_id=user_id, metadata=metadata)
+        result = await self._messages.insert_one(doc)
+        await self._sessions.update_one({"session_id": session_id}, self._touch_update(ts))
+        return str(result.inserted_id)
+
+    async def archive_messages(
+        self,
+        session_id: str,
+        messages: Sequence[Dict[str, Any]],
+        *,
+        user_id: Optional[str] = None,
+    ) -> int:
+        """Bulk-archive a session history; see :meth:`Mongo.archive_messages`."""
+
+        if not messages:
+            return 0
+
+        docs = self._archive_docs(session_id, messages, user_id)
+        latest = await self._messages.find_one(
+            self._latest_seq_query(session_id),
+            projection={"seq": 1},
+            sort=[("seq", -1)],
+        )
+        archived_seq = int(latest["seq"]) if latest else 0
+        pending = [doc for doc in docs if doc["seq"] > archived_seq]
+
+        inserted = 0
+        while pending:
+            try:
+                result = await self._messages.insert_many(pending, ordered=True)
+                inserted += len(result.inserted_ids)
+                break
+            except BulkWriteError as exc:
+                skipped_inserted, pending = self._skip_duplicates(exc, pending)
+                inserted += skipped_inserted
+
+        await self._sessions.update_one({"session_id": session_id}, self._touch_update(docs[-1]["created_at"]))
+        return inserted
+
+    async def list_sessions(self, user_id: str, limit: int = 20, include_closed: bool = False) -> List[Dict[str, Any]]:
+        query = self._sessions_query(user_id, include_closed)
+        cursor = self._sessions.find(query).sort("updated_at", -1).limit(limit)
+        return await cursor.to_list(length=None)
+
+    async def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return await self._sessions.find_one({"session_id": session_id})
+
+    async def count_messages(self, session_id: str) -> int:
+        return int(await self._messages.count_documents({"session_id": session_id}))
+
+    async def get_messages(
+        self,
+        session_id: str,
+        *,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        docs, _ = await self.get_messages_page(session_id, limit=limit, cursor=cursor)
+        return docs
+
+    async def get_messages_page(
+        self,
+        session_id: str,
+        *,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        before_seq: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Keyset page of history; see :meth:`Mongo.get_messages_page`."""
+
+        query = self._messages_query(session_id, cursor, before_seq)
+        cursor_docs = self._messages.find(query, _MESSAGE_PROJECTION).sort(_MESSAGE_SORT).limit(limit + 1)
+        return self._page(await cursor_docs.to_list(length=None), limit)
+
+    async def close_session(
+        self,
+        session_id: str,
+        *,
+        summary: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        session_doc = await self._sessions.find_one_and_update(
+            {"session_id": session_id},
+            self._close_update(metadata),
+            return_document=ReturnDocument.AFTER,
+        )
+
+        if summary is not None:
+            session_user = session_doc.get("user_id") if session_doc else None
+            await self.upsert_session_summary(
+                session_id,
+                summary,
+                user_id=session_user,
+                message_count=None,
+                extra_metadata=metadata or {},
+            )
+
+    async def get_session_summary_doc(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return await self._summaries.find_one({"session_id": session_id})
+
+    async def get_session_summary(self, session_id: str) -> Optional[str]:
+        doc = await self.get_session_summary_doc(session_id)
+        if not doc:
+            return None
+        return doc.get("summary")
+
+    async def upsert_session_summary(
+        self,
+        session_id: str,
+        summary: str,
+        *,
+        user_id: Optional[str] = None,
+        message_count: Optional[int] = None,
+        extra_metadata: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        summary_update, session_update = self._summary_updates(
+            session_id,
+            summary,
+            user_id=user_id,
+            message_count=message_count,
+            extra_metadata=extra_metadata,
+        )
+        await self._summaries.update_one({"session_id": session_id}, summary_update, upsert=True)
+        await self._sessions.update_one({"session_id": session_id}, session_update)
@@ -1,6 +1,8 @@
+import base64
+import json
 from datetime import datetime, timezone
 from enum import Enum
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
 try:  # pragma: no cover - runtime dependency
     from bson import ObjectId
@@ -22,9 +24,20 @@ except ImportError:  # pragma: no cover - fallback for tests when bson isn't ins
 try:  # pragma: no cover - runtime dependency
     from pymongo import IndexModel, MongoClient, ReturnDocument
     from pymongo.collection import Collection
+    from pymongo.errors import BulkWriteError, OperationFailure
 except ImportError:  # pragma: no cover - lightweight fallbacks for tests
     Collection = Any  # type: ignore[misc]
 
+    class OperationFailure(Exception):  # type: ignore[misc]
+        def __init__(self, message: str = "", code: Optional[int] = None) -> None:
+            super().__init__(message)
+            self.code = code
+
+    class BulkWriteError(Exception):  # type: ignore[misc]
+        def __init__(self, details: Dict[str, Any]) -> None:
+            super().__init__("batch op errors occurred")
+            self.details = details
+
     class IndexModel:  # type: ignore[misc]
         def __init__(self, *args: Any, **kwargs: Any) -> None:
             self.args = args
@@ -39,17 +52,28 @@ except ImportError:  # pragma: no cover - lightweight fallbacks for tests
             raise RuntimeError("pymongo is required unless a custom client is provided")
 
 
-class Mongo:
-    def __init__(self, uri: str, db_name: str = "ecomm", *, client: Optional[MongoClient] = None):
-        self.client = client or MongoClient(uri)
-        self.db = self.client[db_name]
+_MESSAGE_SORT = [("created_at", -1), ("_id", -1)]
+# Fields the history endpoints read; everything else stays on the server.
+_MESSAGE_PROJECTION = {
+    "session_id": 1,
+    "seq": 1,
+    "role": 1,
+    "content": 1,
+    "created_at": 1,
+    "user_id": 1,
+    "metadata": 1,
+}
 
+
+class _MongoBase:
+    """Collections, indexes and document builders shared by the sync and async stores."""
+
+    def _bind(self, db_name: str) -> None:
+        self.db = self.client[db_name]
         self._sessions = self.db["sessions"]
         self._messages = self.db["messages"]
         self._summaries = self.db["session_summaries"]
 
-        self._ensure_indexes()
-
     def conversations(self) -> Collection:
         return self.db["conversations"]
 
@@ -65,33 +89,54 @@ class Mongo:
     def session_summaries(self) -> Collection:
         return self._summaries
 
-    def _ensure_indexes(self) -> None:
+    def _index_plan(self) -> List[Tuple[Collection, List[IndexModel]]]:
         session_indexes = [
             IndexModel("session_id", unique=True),
             IndexModel([("user_id", 1), ("created_at", -1)]),
         ]
         message_indexes = [
-            IndexModel([("session_id", 1), ("created_at", 1)]),
+            # Serves the (created_at, _id) keyset sort without an in-memory sort,
+            # and every query a (session_id, created_at) prefix index would
+            IndexModel([("session_id", 1), ("created_at", 1), ("_id", 1)]),
+            # Archived messages carry their position in the session; messages
+            # written before seq existed are left out of the constraint.
+            IndexModel(
+                [("session_id", 1), ("seq", 1)],
+                unique=True,
+                partialFilterExpression={"seq": {"$exists": True}},
+            ),
         ]
         summary_indexes = [
             IndexModel("session_id", unique=True),
             IndexModel([("user_id", 1), ("updated_at", -1)]),
         ]
+        return [
+            (self._sessions, session_indexes),
+            (self._messages, message_indexes),
+            (self._summaries, summary_indexes),
+        ]
 
-        self._sessions.create_indexes(session_indexes)
-        self._messages.create_indexes(message_indexes)
-        self._summaries.create_indexes(summary_indexes)
+    def _retired_indexes(self) -> List[Tuple[Collection, str]]:
+        """Indexes earlier versions created that the plan has superseded."""
+        return [(self._messages, "session_id_1_created_at_1")]
 
     @staticmethod
     def _utc_now() -> datetime:
         return datetime.now(timezone.utc)
 
-    def create_session(self, session_id: str, user_id: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
-        now = self._utc_now()
-        insert_doc: Dict[str, Any] = {
-            "created_at": now,
-        }
+    @staticmethod
+    def _coerce_datetime(value: Any) -> Optional[datetime]:
+        if isinstance(value, datetime):
+            return value
+        if isinstance(value, str):
+            try:
+                return datetime.fromisoformat(value)
+            except ValueError:
+                return None
+        return None
 
+    def _session_upsert(self, user_id: str, metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        now = self._utc_now()
         update_set: Dict[str, Any] = {
             "user_id": user_id,
             "updated_at": now,
@@ -99,29 +144,18 @@ class Mongo:
         }
         if metadata:
             update_set.update(metadata)
+        return {"$setOnInsert": {"created_at": now}, "$set": update_set}
 
-        self._sessions.update_one(
-            {"session_id": session_id},
-            {"$setOnInsert": insert_doc, "$set": update_set},
-            upsert=True,
-        )
-
-        doc = self._sessions.find_one({"session_id": session_id})
-        if doc is None:
-            raise RuntimeError(f"Failed to upsert session {session_id}")
-        return doc
-
-    def append_message(
-        self,
+    @staticmethod
+    def _message_doc(
         session_id: str,
         role: str,
         content: str,
+        ts: datetime,
         *,
         user_id: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
-        created_at: Optional[datetime] = None,
-    ) -> str:
-        ts = created_at or self._utc_now()
+    ) -> Dict[str, Any]:
         doc: Dict[str, Any] = {
             "session_id": session_id,
             "role": role,
@@ -132,37 +166,102 @@ class Mongo:
             doc["user_id"] = user_id
         if metadata:
             doc["metadata"] = metadata
+        return doc
 
-        result = self._messages.insert_one(doc)
-        self._sessions.update_one(
-            {"session_id": session_id},
-            {"$set": {"updated_at": ts, "last_message_at": ts}},
-        )
-        return str(result.inserted_id)
+    @staticmethod
+    def _touch_update(ts: datetime) -> Dict[str, Any]:
+        return {"$set": {"updated_at": ts, "last_message_at": ts}}
 
-    def list_sessions(self, user_id: str, limit: int = 20, include_closed: bool = False) -> List[Dict[str, Any]]:
+    def _archive_docs(
+        self,
+        session_id: str,
+        messages: Sequence[Dict[str, Any]],
+        user_id: Optional[str],
+    ) -> List[Dict[str, Any]]:
+        now = self._utc_now()
+        docs: List[Dict[str, Any]] = []
+        for position, message in enumerate(messages, start=1):
+            seq = message.get("seq")
+            doc = self._message_doc(
+                session_id,
+                message.get("role", "user"),
+                message.get("content", ""),
+                self._coerce_datetime(message.get("created_at")) or now,
+                user_id=user_id,
+            )
+            doc["seq"] = seq if isinstance(seq, int) else position
+            docs.append(doc)
+        return docs
+
+    @staticmethod
+    def _latest_seq_query(session_id: str) -> Dict[str, Any]:
+        return {"session_id": session_id, "seq": {"$exists": True}}
+
+    @staticmethod
+    def _skip_duplicates(exc: BulkWriteError, pending: List[Dict[str, Any]]) -> Tuple[int, List[Dict[str, Any]]]:
+        """Return (inserted, remaining) after an ordered insert hit a duplicate seq.
+
+        Another close archived part of this history concurrently; anything but
+        duplicate-key errors is re-raised.
+        """
+
+        errors = exc.details.get("writeErrors") or []
+        if not errors or any(error.get("code") != 11000 for error in errors):
+            raise exc
+        return int(exc.details.get("nInserted", 0)), pending[errors[0]["index"] + 1 :]
+
+    @classmethod
+    def _page(cls, docs: List[Dict[str, Any]], limit: int) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Split a newest-first ``limit + 1`` read into a chronological page and cursor."""
+
+        page = docs[:limit]
+        next_cursor = cls.encode_message_cursor(page[-1]) if len(docs) > limit else None
+        page.reverse()
+        return page, next_cursor
+
+    @staticmethod
+    def _sessions_query(user_id: str, include_closed: bool) -> Dict[str, Any]:
         query: Dict[str, Any] = {"user_id": user_id}
         if not include_closed:
             query["status"] = {"$ne": "closed"}
+        return query
 
-        cursor = self._sessions.find(query).sort("updated_at", -1).limit(limit)
-        return list(cursor)
+    @staticmethod
+    def encode_message_cursor(doc: Dict[str, Any]) -> Optional[str]:
+        """Opaque keyset cursor pointing just before ``doc`` in history order."""
 
-    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
-        return self._sessions.find_one({"session_id": session_id})
+        created_at = doc.get("created_at")
+        if not isinstance(created_at, datetime) or doc.get("_id") is None:
+            return None
+        raw = json.dumps({"t": created_at.isoformat(), "i": str(doc["_id"])})
+        return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
 
-    def count_messages(self, session_id: str) -> int:
-        return int(self._messages.count_documents({"session_id": session_id}))
+    @staticmethod
+    def _decode_message_cursor(cursor: str) -> Optional[Tuple[datetime, Any]]:
+        try:
+            padded = cursor + "=" * (-len(cursor) % 4)
+            data = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            return datetime.fromisoformat(data["t"]), ObjectId(data["i"])
+        except (ValueError, TypeError, KeyError, InvalidId):
+            return None
 
-    def get_messages(
-        self,
-        session_id: str,
-        *,
-        limit: int = 50,
-        cursor: Optional[str] = None,
-    ) -> List[Dict[str, Any]]:
+    @classmethod
+    def _messages_query(
+        cls, session_id: str, cursor: Optional[str], before_seq: Optional[int] = None
+    ) -> Dict[str, Any]:
         query: Dict[str, Any] = {"session_id": session_id}
-        if cursor:
+        if before_seq is not None:
+            # A Redis seq cursor handed out before the session was archived
+            query["seq"] = {"$lt": before_seq}
+        keyset = cls._decode_message_cursor(cursor) if cursor else None
+        if keyset is not None:
+            ts, oid = keyset
+            query["$or"] = [
+                {"created_at": {"$lt": ts}},
+                {"created_at": ts, "_id": {"$lt": oid}},
+            ]
+        elif cursor:
+            # Legacy cursors: a bare ISO timestamp or ObjectId
             cursor_applied = False
             try:
                 ts = datetime.fromisoformat(cursor)
@@ -177,16 +276,182 @@ class Mongo:
                     query["_id"] = {"$lt": oid}
                 except (InvalidId, TypeError):
                     pass
+        return query
+
+    def _close_update(self, metadata: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+        now = self._utc_now()
+        update: Dict[str, Any] = {"status": "closed", "closed_at": now, "updated_at": now}
+        if metadata:
+            update.update(metadata)
+        return {"$set": update}
 
-        cursor_docs = (
-            self._messages.find(query)
-            .sort([("created_at", -1), ("_id", -1)])
-            .limit(limit)
+    def _summary_updates(
+        self,
+        session_id: str,
+        summary: str,
+        *,
+        user_id: Optional[str],
+        message_count: Optional[int],
+        extra_metadata: Optional[Dict[str, Any]],
+    ) -> Tuple[Dict[str, Any], Dict[str, Any]]:
+        """Return the summary-collection upsert and the matching session update."""
+
+        now = self._utc_now()
+        update_doc: Dict[str, Any] = {
+            "summary": summary,
+            "updated_at": now,
+        }
+        if message_count is not None:
+            update_doc["message_count"] = message_count
+        if user_id is not None:
+            update_doc["user_id"] = user_id
+        if extra_metadata:
+            update_doc["metadata"] = extra_metadata
+
+        summary_update = {
+            "$set": update_doc,
+            "$setOnInsert": {"session_id": session_id, "created_at": now},
+        }
+        session_update: Dict[str, Any] = {"session_summary": summary, "summary_updated_at": now}
+        if user_id is not None:
+            session_update.setdefault("user_id", user_id)
+        return summary_update, {"$set": session_update}
+
+
+class Mongo(_MongoBase):
+    def __init__(
+        self,
+        uri: str,
+        db_name: str = "ecomm",
+        *,
+        client: Optional[MongoClient] = None,
+        **client_options: Any,
+    ):
+        self.client = client or MongoClient(uri, **client_options)
+        self._bind(db_name)
+        self._ensure_indexes()
+
+    def _ensure_indexes(self) -> None:
+        for collection, indexes in self._index_plan():
+            collection.create_indexes(indexes)
+        for collection, name in self._retired_indexes():
+            try:
+                collection.drop_index(name)
+            except OperationFailure as exc:
+                if exc.code != 27:  # IndexNotFound: already dropped
+                    raise
+
+    def create_session(self, session_id: str, user_id: str, metadata: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        self._sessions.update_one(
+            {"session_id": session_id},
+            self._session_upsert(user_id, metadata),
+            upsert=True,
         )
-        docs = list(cursor_docs)
-        docs.reverse()
+
+        doc = self._sessions.find_one({"session_id": session_id})
+        if doc is None:
+            raise RuntimeError(f"Failed to upsert session {session_id}")
+        return doc
+
+    def append_message(
+        self,
+        session_id: str,
+        role: str,
+        content: str,
+        *,
+        user_id: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+        created_at: Optional[datetime] = None,
+    ) -> str:
+        ts = created_at or self._utc_now()
+        doc = self._message_doc(session_id, role, content, ts, user_id=user_id, metadata=metadata)
+        result = self._messages.insert_one(doc)
+        self._sessions.update_one({"session_id": session_id}, self._touch_update(ts))
+        return str(result.inserted_id)
+
+    def archive_messages(
+        self,
+        session_id: str,
+        messages: Sequence[Dict[str, Any]],
+        *,
+        user_id: Optional[str] = None,
+    ) -> int:
+        """Bulk-archive a session history and return how many messages were new.
+
+        Messages are keyed by ``seq`` (their 1-based position in the session,
+        falling back to list position), so a retried close only inserts the
+        suffix that is not archived yet: one ordered ``insert_many`` plus a
+        single session update.
+        """
+
+        if not messages:
+            return 0
+
+        docs = self._archive_docs(session_id, messages, user_id)
+        latest = self._messages.find_one(
+            self._latest_seq_query(session_id),
+            projection={"seq": 1},
+            sort=[("seq", -1)],
+        )
+        archived_seq = int(latest["seq"]) if latest else 0
+        pending = [doc for doc in docs if doc["seq"] > archived_seq]
+
+        inserted = 0
+        while pending:
+            try:
+                result = self._messages.insert_many(pending, ordered=True)
+                inserted += len(result.inserted_ids)
+                break
+            except BulkWriteError as exc:
+                skipped_inserted, pending = self._skip_duplicates(exc, pending)
+                inserted += skipped_inserted
+
+        self._sessions.update_one({"session_id": session_id}, self._touch_update(docs[-1]["created_at"]))
+        return inserted
+
+    def list_sessions(self, user_id: str, limit: int = 20, include_closed: bool = False) -> List[Dict[str, Any]]:
+        query = self._sessions_query(user_id, include_closed)
+        cursor = self._sessions.find(query).sort("updated_at", -1).limit(limit)
+        return list(cursor)
+
+    def get_session(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self._sessions.find_one({"session_id": session_id})
+
+    def count_messages(self, session_id: str) -> int:
+        return int(self._messages.count_documents({"session_id": session_id}))
+
+    def get_messages(
+        self,
+        session_id: str,
+        *,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+    ) -> List[Dict[str, Any]]:
+        docs, _ = self.get_messages_page(session_id, limit=limit, cursor=cursor)
         return docs
 
+    def get_messages_page(
+        self,
+        session_id: str,
+        *,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        before_seq: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+        """Return up to ``limit`` messages older than ``cursor`` and the next cursor.
+
+        Pages seek on the (created_at, _id) index, so cost stays O(limit) at
+        any depth; the next cursor is None once the oldest message is reached.
+        ``before_seq`` instead starts below a message ``seq``, for callers
+        resuming a page that was read from Redis before the archive.
+        """
+
+        query = self._messages_query(session_id, cursor, before_seq)
+        docs = list(
+            self._messages.find(query, _MESSAGE_PROJECTION).sort(_MESSAGE_SORT).limit(limit + 1)
+        )
+        return self._page(docs, limit)
+
     def close_session(
         self,
         session_id: str,
@@ -194,26 +459,20 @@ class Mongo:
         summary: Optional[str] = None,
         metadata: Optional[Dict[str, Any]] = None,
     ) -> None:
-        now = self._utc_now()
-        update: Dict[str, Any] = {"status": "closed", "closed_at": now, "updated_at": now}
-        if metadata:
-            update.update(metadata)
-
         session_doc = self._sessions.find_one_and_update(
             {"session_id": session_id},
-            {"$set": update},
+            self._close_update(metadata),
             return_document=ReturnDocument.AFTER,
         )
 
         if summary is not None:
-            extra_meta = metadata or {}
             session_user = session_doc.get("user_id") if session_doc else None
             self.upsert_session_summary(
                 session_id,
                 summary,
                 user_id=session_user,
                 message_count=None,
-                extra_metadata=extra_meta,
+                extra_metadata=metadata or {},
             )
 
     def get_session_summary_doc(self, session_id: str) -> Optional[Dict[str, Any]]:
@@ -235,27 +494,12 @@ class Mongo:
         message_count: Optional[int] = None,
         extra_metadata: Optional[Dict[str, Any]] = None,
     ) -> None:
-        now = self._utc_now()
-        update_doc: Dict[str, Any] = {
-            "summary": summary,
-            "updated_at": now,
-        }
-        if message_count is not None:
-            update_doc["message_count"] = message_count
-        if user_id is not None:
-            update_doc["user_id"] = user_id
-        if extra_metadata:
-            update_doc["metadata"] = extra_metadata
-
-        self._summaries.update_one(
-            {"session_id": session_id},
-            {
-                "$set": update_doc,
-                "$setOnInsert": {"session_id": session_id, "created_at": now},
-            },
-            upsert=True,
+        summary_update, session_update = self._summary_updates(
+            session_id,
+            summary,
+            user_id=user_id,
+            message_count=message_count,
+            extra_metadata=extra_metadata,
         )
-        session_update: Dict[str, Any] = {"session_summary": summary, "summary_updated_at": now}
-        if user_id is not None:
-            session_update.setdefault("user_id", user_id)
-        self._sessions.update_one({"session_id": session_id}, {"$set": session_update})
+        self._summaries.update_one({"session_id": session_id}, summary_update, upsert=True)
+        self._sessions.update_one({"session_id": session_id}, session_update)
@@ -1,9 +1,11 @@
 """PostgreSQL database utilities and queries."""
 
 from .client import create_async_engine, create_sync_engine
-from .queries import get_order_for_user
+from .queries import aget_order_for_user, averify_user_credentials, get_order_for_user
 
 __all__ = [
+    "aget_order_for_user",
+    "averify_user_credentials",
     "create_async_engine",
     "create_sync_engine", 
     "get_order_for_user",
@@ -5,24 +5,77 @@ Provides both async and sync engine creation for different use cases:
 - Sync engines for synchronous operations like SQL retrieval nodes
 """
 
+from typing import Any, Dict, Optional
+
 from sqlalchemy import create_engine
-from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
-from sqlalchemy.engine import Engine
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.ext.asyncio import create_async_engine as _sa_create_async_engine
+
+
+def _statement_timeout_args(dsn: str, statement_timeout_ms: Optional[int]) -> Dict[str, Any]:
+    """Driver-specific connect args that set ``statement_timeout`` per connection."""
+    if not statement_timeout_ms:
+        return {}
+    if make_url(dsn).get_driver_name() == "asyncpg":
+        return {"server_settings": {"statement_timeout": str(statement_timeout_ms)}}
+    return {"options": f"-c statement_timeout={statement_timeout_ms}"}
+
 
+def _prepared_statement_args(dsn: str, prepare_threshold: Optional[int]) -> Dict[str, Any]:
+    """Connect args that make psycopg prepare statements server-side.
 
-def create_async_engine_from_dsn(dsn: str) -> AsyncEngine:
+    psycopg only prepares a statement after ``prepare_threshold`` executions
+    on a connection (5 by default); 0 prepares the hot lookups on first use.
+    asyncpg always prepares and caches statements per connection, and
+    psycopg2 cannot prepare, so both are left alone.
+    """
+    if prepare_threshold is None or make_url(dsn).get_driver_name() != "psycopg":
+        return {}
+    return {"prepare_threshold": prepare_threshold}
+
+
+def create_async_engine_from_dsn(
+    dsn: str,
+    *,
+    pool_size: int = 5,
+    max_overflow: int = 10,
+    pool_timeout: float = 30.0,
+    pool_recycle: int = 1800,
+    statement_timeout_ms: Optional[int] = None,
+    prepare_threshold: Optional[int] = None,
+) -> AsyncEngine:
     """Create an async SQLAlchemy engine from a DSN.
     
     Args:
-        dsn: Database connection string
+        dsn: Database connection string (postgresql+psycopg or postgresql+asyncpg)
+        pool_size: Connections kept open in the pool
+        max_overflow: Extra connections allowed under burst load
+        pool_timeout: Seconds to wait for a free connection before failing
+        pool_recycle: Seconds after which connections are replaced
+        statement_timeout_ms: Server-side statement timeout, disabled when falsy
+        prepare_threshold: psycopg executions before a statement is prepared
+            server-side; None keeps the driver default
         
     Returns:
         Configured async SQLAlchemy engine
     """
-    return create_async_engine(dsn, pool_pre_ping=True, future=True)
+    # The module re-binds create_async_engine below for backward compatibility
+    return _sa_create_async_engine(
+        dsn,
+        pool_pre_ping=True,
+        pool_size=pool_size,
+        max_overflow=max_overflow,
+        pool_timeout=pool_timeout,
+        pool_recycle=pool_recycle,
+        connect_args={
+            **_statement_timeout_args(dsn, statement_timeout_ms),
+            **_prepared_statement_args(dsn, prepare_threshold),
+        },
+    )
 
 
-def create_sync_engine_from_dsn(dsn: str) -> Engine:
+def create_sync_engine_from_dsn(dsn: str, *, prepare_threshold: Optional[int] = None) -> Engine:
     """Create a sync SQLAlchemy engine from a DSN.
     
     Uses psycopg driver. DSN should be in format:
@@ -30,11 +83,18 @@ def create_sync_engine_from_dsn(dsn: str) -> Engine:
     
     Args:
         dsn: Database connection string
+        prepare_threshold: psycopg executions before a statement is prepared
+            server-side; None keeps the driver default
         
     Returns:
         Configured sync SQLAlchemy engine
     """
-    return create_engine(dsn, pool_pre_ping=True, future=True)
+    return create_engine(
+        dsn,
+        pool_pre_ping=True,
+        future=True,
+        connect_args=_prepared_statement_args(dsn, prepare_threshold),
+    )
 
 
 # Backward compatibility aliases
@@ -6,6 +6,30 @@ from typing import Any, Dict, Optional
 
 from sqlalchemy import text
 from sqlalchemy.engine import Engine
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+
+_ORDER_FOR_USER_SQL = text(
+    """
+    SELECT
+        o.*, p.product_name, p.product_category, p.unit_price, 
+        c.customer_id, c.email AS customer_email, c.first_name, c.last_name
+    FROM orders o
+    JOIN customers c ON o.customer_id = c.customer_id
+    JOIN products p ON o.product_id = p.product_id
+    WHERE c.user_id = :user_id AND o.order_id = :order_id
+    LIMIT 1
+    """
+)
+
+_VERIFY_CREDENTIALS_SQL = text(
+    """
+    SELECT customer_id, first_name, last_name, email, user_id
+    FROM customers
+    WHERE user_id = :user_id AND passcode = :passcode
+    LIMIT 1
+    """
+)
 
 
 def get_order_for_user(engine: Engine, user_id: str, order_id: int) -> Optional[Dict[str, Any]]:
@@ -19,22 +43,9 @@ def get_order_for_user(engine: Engine, user_id: str, order_id: int) -> Optional[
     Returns:
         Order details with customer and product info, or None if not found
     """
-    statement = text(
-        """
-        SELECT
-            o.*, p.product_name, p.product_category, p.unit_price, 
-            c.customer_id, c.email AS customer_email, c.first_name, c.last_name
-        FROM orders o
-        JOIN customers c ON o.customer_id = c.customer_id
-        JOIN products p ON o.product_id = p.product_id
-        WHERE c.user_id = :user_id AND o.order_id = :order_id
-        LIMIT 1
-        """
-    )
-
     with engine.connect() as conn:
         row = conn.execute(
-            statement,
+            _ORDER_FOR_USER_SQL,
             {"user_id": user_id, "order_id": order_id},
         ).mappings().first()
 
@@ -52,19 +63,34 @@ def verify_user_credentials(engine: Engine, user_id: str, passcode: str) -> Opti
     Returns:
         Customer details if credentials are valid, else None
     """
-    statement = text(
-        """
-        SELECT customer_id, first_name, last_name, email, user_id
-        FROM customers
-        WHERE user_id = :user_id AND passcode = :passcode
-        LIMIT 1
-        """
-    )
-
     with engine.connect() as conn:
         row = conn.execute(
-            statement,
+            _VERIFY_CREDENTIALS_SQL,
             {"user_id": user_id, "passcode": passcode},
         ).mappings().first()
 
     return dict(row) if row else None
+
+
+async def aget_order_for_user(engine: AsyncEngine, user_id: str, order_id: int) -> Optional[Dict[str, Any]]:
+    """Async variant of :func:`get_order_for_user` on the shared async pool."""
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            _ORDER_FOR_USER_SQL,
+            {"user_id": user_id, "order_id": order_id},
+        )
+        row = result.mappings().first()
+
+    return dict(row) if row else None
+
+
+async def averify_user_credentials(engine: AsyncEngine, user_id: str, passcode: str) -> Optional[Dict[str, Any]]:
+    """Async variant of :func:`verify_user_credentials` on the shared async pool."""
+    async with engine.connect() as conn:
+        result = await conn.execute(
+            _VERIFY_CREDENTIALS_SQL,
+            {"user_id": user_id, "passcode": passcode},
+        )
+        row = result.mappings().first()
+
+    return dict(row) if row else None
@@ -1,5 +1,6 @@
 """Redis persistence helpers for sessions and recent messages."""
 
+from .events import SessionEventBus
 from .store import RedisKV, RedisSessionStore
 
-__all__ = ["RedisKV", "RedisSessionStore"]
+__all__ = ["RedisKV", "RedisSessionStore", "SessionEventBus"]
@@ -0,0 +1,105 @@
+import asyncio
+import json
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, Optional, Set
+
+try:  # pragma: no cover - runtime dependency
+    import redis.asyncio as aioredis
+except ImportError:  # pragma: no cover - lightweight fallback for tests
+    aioredis = None  # type: ignore[assignment]
+
+
+logger = logging.getLogger(__name__)
+
+
+class SessionEventBus:
+    """Fan Redis pub/sub session events out to in-process subscribers.
+
+    Each API worker keeps a single pub/sub connection and subscribes to a
+    session channel only while at least one local websocket is listening on
+    it. Every subscriber gets its own bounded queue; when a slow consumer
+    falls behind the oldest events are dropped and the client resyncs by seq.
+    """
+
+    def __init__(
+        self,
+        url: Optional[str] = None,
+        *,
+        client: Any = None,
+        queue_size: int = 100,
+        poll_timeout: float = 1.0,
+    ) -> None:
+        if client is None:
+            if aioredis is None:
+                raise RuntimeError("redis-py is required unless a client override is supplied")
+            client = aioredis.from_url(url, decode_responses=True)
+        self.client = client
+        self.queue_size = queue_size
+        self.poll_timeout = poll_timeout
+        self._pubsub: Any = None
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+        self._reader: Optional[asyncio.Task] = None
+        self._lock = asyncio.Lock()
+
+    @asynccontextmanager
+    async def subscribe(self, channel: str) -> AsyncIterator[asyncio.Queue]:
+        """Yield a queue receiving decoded events published on ``channel``."""
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        async with self._lock:
+            if self._pubsub is None:
+                self._pubsub = self.client.pubsub()
+            listeners = self._subscribers.setdefault(channel, set())
+            if not listeners:
+                await self._pubsub.subscribe(channel)
+            listeners.add(queue)
+            if self._reader is None or self._reader.done():
+                self._reader = asyncio.create_task(self._read_loop())
+        try:
+            yield queue
+        finally:
+            async with self._lock:
+                listeners = self._subscribers.get(channel, set())
+                listeners.discard(queue)
+                if not listeners:
+                    self._subscribers.pop(channel, None)
+                    await self._pubsub.unsubscribe(channel)
+
+    async def _read_loop(self) -> None:
+        while self._subscribers:
+            try:
+                message = await self._pubsub.get_message(
+                    ignore_subscribe_messages=True, timeout=self.poll_timeout
+                )
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("session_events.read_failed")
+                await asyncio.sleep(self.poll_timeout)
+                continue
+            if not message or message.get("type") != "message":
+                continue
+            try:
+                event = json.loads(message["data"])
+            except (TypeError, ValueError):
+                continue
+            for queue in list(self._subscribers.get(message["channel"], ())):
+                self._deliver(queue, event)
+
+    @staticmethod
+    def _deliver(queue: asyncio.Queue, event: Dict[str, Any]) -> None:
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(event)
+
+    async def close(self) -> None:
+        if self._reader is not None:
+            self._reader.cancel()
+            try:
+                await self._reader
+            except (asyncio.CancelledError, Exception):
+                pass
+        if self._pubsub is not None:
+            await self._pubsub.aclose()
+        await self.client.aclose()
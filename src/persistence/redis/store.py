@@ -1,7 +1,8 @@
 import json
+import time
 from datetime import datetime, timezone
 from types import SimpleNamespace
-from typing import Any, Dict, List, Optional, Set
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
 
 try:  # pragma: no cover - runtime dependency
     import redis
@@ -20,6 +21,105 @@ except ImportError:  # pragma: no cover - lightweight fallback for tests
     redis = SimpleNamespace(Redis=_MissingRedis, client=SimpleNamespace(Pipeline=_MissingPipeline))  # type: ignore[attr-defined]
 
 
+# Appends messages to the hot list and spills everything past the window into
+# the archive stream in one atomic step. Each message gets a 1-based ``seq``
+# (its position in the session history), which is also its stream entry id.
+# Every stored message is also published on the session's events channel so
+# websocket subscribers receive the delta without re-reading the history.
+# KEYS: hot list, archive stream. ARGV: window, ttl seconds, channel, messages...
+_APPEND_MESSAGES_LUA = """
+local hot_key = KEYS[1]
+local archive_key = KEYS[2]
+local window = tonumber(ARGV[1])
+local ttl = tonumber(ARGV[2])
+local channel = ARGV[3]
+local total = redis.call('LLEN', hot_key) + redis.call('XLEN', archive_key)
+for i = 4, #ARGV do
+    total = total + 1
+    local payload = ARGV[i]
+    local sep = ', '
+    if payload == '{}' then
+        sep = ''
+    end
+    local stored = '{"seq": ' .. total .. sep .. string.sub(payload, 2)
+    redis.call('LPUSH', hot_key, stored)
+    redis.call('PUBLISH', channel, '{"type": "message", "message": ' .. stored .. '}')
+end
+if window > 0 then
+    local overflow = redis.call('LRANGE', hot_key, window, -1)
+    for i = #overflow, 1, -1 do
+        redis.call('XADD', archive_key, '0-' .. (total - window - i + 1), 'message', overflow[i])
+    end
+    if #overflow > 0 then
+        redis.call('LTRIM', hot_key, 0, window - 1)
+    end
+end
+if ttl > 0 then
+    redis.call('EXPIRE', hot_key, ttl)
+    redis.call('EXPIRE', archive_key, ttl)
+end
+return total
+"""
+
+
+# Queues a session on the escalation sorted set. The score is the enqueue time
+# shifted earlier by ``priority * step`` seconds, so ZPOPMIN serves high
+# priority first and FIFO within a priority. Customers who escalated within the
+# repeat window get a boost tracked in a per-user counter that expires with it.
+# KEYS: queue zset, enqueued-at zset, [user count key].
+# ARGV: session id, now, base priority, step seconds, max repeat boost, repeat window seconds.
+_ENQUEUE_ESCALATION_LUA = """
+local priority = tonumber(ARGV[3])
+if KEYS[3] then
+    local count = redis.call('INCR', KEYS[3])
+    redis.call('EXPIRE', KEYS[3], ARGV[6])
+    priority = priority + math.min(count - 1, tonumber(ARGV[5]))
+end
+local now = tonumber(ARGV[2])
+redis.call('ZADD', KEYS[1], now - priority * tonumber(ARGV[4]), ARGV[1])
+redis.call('ZADD', KEYS[2], 'NX', now, ARGV[1])
+return priority
+"""
+
+# Atomically pops the highest-priority escalation. KEYS: queue, enqueued-at.
+_POP_ESCALATION_LUA = """
+local popped = redis.call('ZPOPMIN', KEYS[1])
+if #popped == 0 then
+    return false
+end
+redis.call('ZREM', KEYS[2], popped[1])
+return popped[1]
+"""
+
+# Moves sessions left in the pre-priority ``escalations:pending`` set onto the
+# queue at base priority, and drops the old never-expiring user count hash.
+# KEYS: legacy set, queue zset, enqueued-at zset, legacy counts hash. ARGV: now.
+_DRAIN_LEGACY_ESCALATIONS_LUA = """
+local members = redis.call('SMEMBERS', KEYS[1])
+for _, session_id in ipairs(members) do
+    redis.call('ZADD', KEYS[2], 'NX', ARGV[1], session_id)
+    redis.call('ZADD', KEYS[3], 'NX', ARGV[1], session_id)
+end
+redis.call('DEL', KEYS[1], KEYS[4])
+return #members
+"""
+
+# Close and expiry requests consumed by the archiver worker (src/workers).
+SESSION_ARCHIVE_STREAM = "sessions:archive"
+SESSION_EXPIRY_SUFFIX = ":expiry"
+
+ESCALATION_PRIORITY_STEP_SECONDS = 900
+ESCALATION_MAX_REPEAT_BOOST = 2
+ESCALATION_REPEAT_WINDOW_SECONDS = 7 * 86400
+ESCALATION_WAIT_THRESHOLDS = (300, 900, 1800)
+
+
+def escalation_priority(meta: Dict[str, Any]) -> int:
+    """Base queue priority for a session; billing problems jump the queue."""
+
+    return 1 if meta.get("billing_issue") else 0
+
+
 def _json_default(obj: Any) -> str:
     """Serialize datetimes to ISO strings for Redis payloads."""
 
@@ -40,6 +140,9 @@ class RedisKV:
     def set(self, key: str, value: str, ex: int | None = None) -> None:
         self.client.set(key, value, ex=ex)
 
+    def incr(self, key: str) -> int:
+        return int(self.client.incr(key))
+
     def lpush(self, key: str, *values: str) -> int:
         return self.client.lpush(key, *values)
 
@@ -49,6 +152,11 @@ class RedisKV:
     def lrange(self, key: str, start: int, end: int) -> List[str]:
         return list(self.client.lrange(key, start, end))
 
+    def mget(self, keys: Sequence[str]) -> List[Optional[str]]:
+        if not keys:
+            return []
+        return list(self.client.mget(list(keys)))
+
     def expire(self, key: str, ttl_seconds: int) -> None:
         self.client.expire(key, ttl_seconds)
 
@@ -59,6 +167,27 @@ class RedisKV:
     def pipeline(self) -> redis.client.Pipeline:
         return self.client.pipeline()
 
+    def xadd(self, key: str, fields: Dict[str, str]) -> str:
+        return self.client.xadd(key, fields)
+
+    def register_script(self, script: str) -> Any:
+        return self.client.register_script(script)
+
+    def zrange(self, key: str, start: int, end: int, withscores: bool = False) -> List[Any]:
+        return list(self.client.zrange(key, start, end, withscores=withscores))
+
+    def zrangebyscore(
+        self,
+        key: str,
+        min_score: float | str,
+        max_score: float | str,
+        *,
+        start: Optional[int] = None,
+        num: Optional[int] = None,
+        withscores: bool = False,
+    ) -> List[Any]:
+        return list(self.client.zrangebyscore(key, min_score, max_score, start=start, num=num, withscores=withscores))
+
     def sadd(self, key: str, *values: str) -> int:
         return self.client.sadd(key, *values)
 
@@ -69,8 +198,13 @@ class RedisKV:
             return {str(m) for m in members}
         return set()
 
-    def srem(self, key: str, value: str) -> None:
-        self.client.srem(key, value)
+    def srem(self, key: str, *values: str) -> None:
+        if values:
+            self.client.srem(key, *values)
+
+    def sscan(self, key: str, cursor: int = 0, count: Optional[int] = None) -> Tuple[int, List[str]]:
+        next_cursor, members = self.client.sscan(key, cursor=cursor, count=count)
+        return int(next_cursor), [str(m) for m in members]
 
 
 class RedisSessionStore:
@@ -82,12 +216,22 @@ class RedisSessionStore:
         *,
         recent_window: int,
         ttl_days: int,
+        archive_grace_seconds: int = 0,
         kv_client: Optional[RedisKV] = None,
     ) -> None:
         self.kv = kv_client or RedisKV(url)
         self.recent_window = max(recent_window, 0)
         ttl_seconds = int(ttl_days * 86400)
         self.ttl_seconds = ttl_seconds if ttl_seconds > 0 else 0
+        # A sentinel key expiring ``archive_grace_seconds`` before the session
+        # data lets the archiver catch idle sessions while they can still be read.
+        grace = max(int(archive_grace_seconds), 0)
+        self.expiry_sentinel_ttl = self.ttl_seconds - grace if grace and self.ttl_seconds > grace else 0
+        self._append_script = self.kv.register_script(_APPEND_MESSAGES_LUA)
+        self._enqueue_escalation_script = self.kv.register_script(_ENQUEUE_ESCALATION_LUA)
+        self._pop_escalation_script = self.kv.register_script(_POP_ESCALATION_LUA)
+        self._drain_legacy_escalations_script = self.kv.register_script(_DRAIN_LEGACY_ESCALATIONS_LUA)
+        self._legacy_escalations_drained = False
 
     @staticmethod
     def _meta_key(session_id: str) -> str:
@@ -97,25 +241,54 @@ class RedisSessionStore:
     def _messages_key(cls, session_id: str) -> str:
         return f"{cls._meta_key(session_id)}:messages"
 
+    @classmethod
+    def _archive_key(cls, session_id: str) -> str:
+        return f"{cls._meta_key(session_id)}:archive"
+
+    @classmethod
+    def _expiry_key(cls, session_id: str) -> str:
+        return f"{cls._meta_key(session_id)}{SESSION_EXPIRY_SUFFIX}"
+
+    @staticmethod
+    def session_id_from_expiry_key(key: str) -> Optional[str]:
+        """Map an expired sentinel key back to its session id."""
+
+        if key.startswith("session:") and key.endswith(SESSION_EXPIRY_SUFFIX):
+            return key[len("session:") : -len(SESSION_EXPIRY_SUFFIX)] or None
+        return None
+
+    @classmethod
+    def events_channel(cls, session_id: str) -> str:
+        return f"{cls._meta_key(session_id)}:events"
+
     @staticmethod
     def _escalations_key() -> str:
-        return "escalations:pending"
+        return "escalations:queue"
+
+    @staticmethod
+    def _escalation_times_key() -> str:
+        return "escalations:enqueued_at"
+
+    @staticmethod
+    def _escalation_count_key(user_id: str) -> str:
+        return f"escalations:user_count:{user_id}"
+
+    @staticmethod
+    def _legacy_escalation_keys() -> Tuple[str, str]:
+        """Pending set and user count hash used before the priority queue."""
+        return "escalations:pending", "escalations:user_counts"
 
     @staticmethod
     def _agent_sessions_key(agent_id: str) -> str:
         return f"agent_sessions:{agent_id}"
 
-    def write_session_meta(self, session_id: str, data: Dict[str, Any]) -> None:
+    def _encode_meta(self, session_id: str, data: Dict[str, Any]) -> str:
         meta = {**data, "session_id": session_id}
         meta.setdefault("updated_at", datetime.now(timezone.utc).isoformat())
-        payload = json.dumps(meta, default=_json_default)
-        if self.ttl_seconds:
-            self.kv.set(self._meta_key(session_id), payload, ex=self.ttl_seconds)
-        else:
-            self.kv.set(self._meta_key(session_id), payload)
+        return json.dumps(meta, default=_json_default)
 
-    def read_session_meta(self, session_id: str) -> Optional[Dict[str, Any]]:
-        raw = self.kv.get(self._meta_key(session_id))
+    @staticmethod
+    def _decode_meta(raw: Optional[str]) -> Optional[Dict[str, Any]]:
         if raw is None:
             return None
         try:
@@ -124,20 +297,8 @@ class RedisSessionStore:
             return None
         return data
 
-    def append_message(self, session_id: str, message: Dict[str, Any]) -> None:
-        serialized = json.dumps(message, default=_json_default)
-        messages_key = self._messages_key(session_id)
-        meta_key = self._meta_key(session_id)
-        with self.kv.pipeline() as pipe:
-            pipe.lpush(messages_key, serialized)
-            if self.ttl_seconds:
-                pipe.expire(messages_key, self.ttl_seconds)
-                pipe.expire(meta_key, self.ttl_seconds)
-            pipe.execute()
-
-    def get_recent_messages(self, session_id: str) -> List[Dict[str, Any]]:
-        end = self.recent_window - 1 if self.recent_window else -1
-        raw_items = self.kv.lrange(self._messages_key(session_id), 0, end)
+    @staticmethod
+    def _decode_messages(raw_items: Sequence[str]) -> List[Dict[str, Any]]:
         messages: List[Dict[str, Any]] = []
         for item in raw_items:
             try:
@@ -147,18 +308,185 @@ class RedisSessionStore:
         # Redis LPUSH stores newest first; reverse to chronological order
         return list(reversed(messages))
 
-    def get_all_messages(self, session_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        if limit is not None and limit <= 0:
-            return []
-        end = -1 if limit is None else limit - 1
-        raw_items = self.kv.lrange(self._messages_key(session_id), 0, end)
+    @staticmethod
+    def _decode_archive(entries: Sequence[Any]) -> List[Dict[str, Any]]:
+        """Decode stream entries, keeping the order they were returned in."""
+
         messages: List[Dict[str, Any]] = []
-        for item in raw_items:
+        for entry_id, fields in entries or []:
             try:
-                messages.append(json.loads(item))
+                message = json.loads((fields or {}).get("message", ""))
             except json.JSONDecodeError:
                 continue
-        return list(reversed(messages))
+            message.setdefault("seq", int(str(entry_id).split("-", 1)[1]))
+            messages.append(message)
+        return messages
+
+    def _recent_end(self) -> int:
+        return self.recent_window - 1 if self.recent_window else -1
+
+    def _queue_expiry_sentinel(self, pipe: Any, session_id: str) -> None:
+        if self.expiry_sentinel_ttl:
+            pipe.set(self._expiry_key(session_id), "1", ex=self.expiry_sentinel_ttl)
+
+    def has_expiry_sentinel(self, session_id: str) -> bool:
+        return self.kv.get(self._expiry_key(session_id)) is not None
+
+    def write_session_meta(self, session_id: str, data: Dict[str, Any]) -> None:
+        payload = self._encode_meta(session_id, data)
+        with self.kv.pipeline() as pipe:
+            pipe.set(self._meta_key(session_id), payload, ex=self.ttl_seconds or None)
+            self._queue_expiry_sentinel(pipe, session_id)
+            pipe.execute()
+
+    def read_session_meta(self, session_id: str) -> Optional[Dict[str, Any]]:
+        return self._decode_meta(self.kv.get(self._meta_key(session_id)))
+
+    def _queue_append(self, pipe: Any, session_id: str, messages: Sequence[Dict[str, Any]]) -> None:
+        self._append_script(
+            keys=[self._messages_key(session_id), self._archive_key(session_id)],
+            args=[
+                self.recent_window,
+                self.ttl_seconds,
+                self.events_channel(session_id),
+                *(json.dumps(m, default=_json_default) for m in messages),
+            ],
+            client=pipe,
+        )
+
+    def append_message(self, session_id: str, message: Dict[str, Any]) -> None:
+        with self.kv.pipeline() as pipe:
+            self._queue_append(pipe, session_id, [message])
+            if self.ttl_seconds:
+                pipe.expire(self._meta_key(session_id), self.ttl_seconds)
+            self._queue_expiry_sentinel(pipe, session_id)
+            pipe.execute()
+
+    def get_recent_messages(self, session_id: str) -> List[Dict[str, Any]]:
+        raw_items = self.kv.lrange(self._messages_key(session_id), 0, self._recent_end())
+        return self._decode_messages(raw_items)
+
+    # Batched per-turn helpers -----------------------------------------------
+
+    def load_turn_context(self, session_id: str) -> Tuple[Optional[Dict[str, Any]], List[Dict[str, Any]]]:
+        """Fetch session meta and the recent message window in one round trip."""
+
+        with self.kv.pipeline() as pipe:
+            pipe.get(self._meta_key(session_id))
+            pipe.lrange(self._messages_key(session_id), 0, self._recent_end())
+            raw_meta, raw_items = pipe.execute()
+        return self._decode_meta(raw_meta), self._decode_messages(raw_items or [])
+
+    def commit_turn(
+        self,
+        session_id: str,
+        meta: Dict[str, Any],
+        messages: Sequence[Dict[str, Any]] = (),
+        *,
+        user_id: Optional[str] = None,
+        escalate: bool = False,
+    ) -> None:
+        """Persist a chat turn atomically in a single MULTI/EXEC round trip.
+
+        ``messages`` are appended in chronological order, the meta document is
+        rewritten and TTLs refreshed. When ``user_id`` is given the session is
+        registered for that user, and ``escalate`` queues it for a human agent.
+        """
+
+        meta_key = self._meta_key(session_id)
+        with self.kv.pipeline() as pipe:
+            if messages:
+                self._queue_append(pipe, session_id, messages)
+            elif self.ttl_seconds:
+                pipe.expire(self._messages_key(session_id), self.ttl_seconds)
+                pipe.expire(self._archive_key(session_id), self.ttl_seconds)
+            pipe.set(meta_key, self._encode_meta(session_id, meta), ex=self.ttl_seconds or None)
+            self._queue_expiry_sentinel(pipe, session_id)
+            if user_id:
+                pipe.sadd(self._user_sessions_key(user_id), session_id)
+            if escalate:
+                self._queue_escalation(
+                    pipe,
+                    session_id,
+                    user_id=meta.get("user_id"),
+                    priority=escalation_priority(meta),
+                )
+                self._queue_status_event(pipe, session_id, meta)
+            pipe.execute()
+
+    def _queue_status_event(self, client: Any, session_id: str, meta: Dict[str, Any]) -> None:
+        event = {"type": "status", "status": meta.get("status"), "agent_id": meta.get("agent_id")}
+        client.publish(self.events_channel(session_id), json.dumps(event))
+
+    def publish_status(self, session_id: str, meta: Dict[str, Any]) -> None:
+        """Tell websocket subscribers that the session status changed."""
+
+        self._queue_status_event(self.kv.client, session_id, meta)
+
+    def messages_since(self, session_id: str, seq: int) -> List[Dict[str, Any]]:
+        """Return messages with a ``seq`` greater than ``seq`` in chronological order."""
+
+        with self.kv.pipeline() as pipe:
+            pipe.lrange(self._messages_key(session_id), 0, -1)
+            pipe.xrange(self._archive_key(session_id), min=f"(0-{seq}", max="+")
+            raw_items, entries = pipe.execute()
+        hot = [
+            m
+            for m in self._decode_messages(raw_items or [])
+            if isinstance(m.get("seq"), int) and m["seq"] > seq
+        ]
+        return self._decode_archive(entries) + hot
+
+    def get_all_messages(self, session_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Return the newest ``limit`` messages (or all) across the hot list and archive."""
+
+        if limit is not None and limit <= 0:
+            return []
+        with self.kv.pipeline() as pipe:
+            pipe.lrange(self._messages_key(session_id), 0, -1 if limit is None else limit - 1)
+            if limit is None:
+                pipe.xrange(self._archive_key(session_id))
+            else:
+                pipe.xrevrange(self._archive_key(session_id), count=limit)
+            raw_items, entries = pipe.execute()
+        archived = self._decode_archive(entries)
+        if limit is not None:
+            archived.reverse()
+        messages = archived + self._decode_messages(raw_items or [])
+        return messages if limit is None else messages[-limit:]
+
+    def page_messages(
+        self,
+        session_id: str,
+        *,
+        limit: int = 50,
+        before: Optional[int] = None,
+    ) -> Tuple[List[Dict[str, Any]], Optional[int]]:
+        """Page backwards through history across the hot list and archive stream.
+
+        Returns up to ``limit`` messages older than the ``before`` seq in
+        chronological order, plus the cursor for the next (older) page or None.
+        """
+
+        if limit <= 0:
+            return [], None
+        max_id = f"(0-{before}" if before is not None else "+"
+        with self.kv.pipeline() as pipe:
+            # The hot list is bounded by the window, so it is always read whole.
+            pipe.lrange(self._messages_key(session_id), 0, -1)
+            pipe.xrevrange(self._archive_key(session_id), max=max_id, min="-", count=limit + 1)
+            raw_items, entries = pipe.execute()
+        hot = self._decode_messages(raw_items or [])
+        if before is not None:
+            hot = [m for m in hot if isinstance(m.get("seq"), int) and m["seq"] < before]
+        archived = self._decode_archive(entries)
+        archived.reverse()
+        candidates = archived + hot
+        page = candidates[-limit:]
+        next_cursor = None
+        if len(candidates) > limit and isinstance(page[0].get("seq"), int):
+            next_cursor = page[0]["seq"]
+        return page, next_cursor
 
     @staticmethod
     def _user_sessions_key(user_id: str) -> str:
@@ -175,43 +503,180 @@ class RedisSessionStore:
         self.kv.srem(self._user_sessions_key(user_id), session_id)
 
     def list_sessions(self, user_id: str) -> List[Dict[str, Any]]:
-        session_ids = sorted(self.kv.smembers(self._user_sessions_key(user_id)))
-        metas: List[Dict[str, Any]] = []
-        for sid in session_ids:
-            meta = self.read_session_meta(sid)
-            if meta:
-                metas.append(meta)
-        return metas
+        return self._list_metas(self._user_sessions_key(user_id))
+
+    def scan_sessions(self, user_id: str, *, cursor: int = 0, count: int = 50) -> Tuple[int, List[Dict[str, Any]]]:
+        return self._scan_metas(self._user_sessions_key(user_id), cursor=cursor, count=count)
 
     def touch_session(self, session_id: str) -> None:
         if not self.ttl_seconds:
             return
-        messages_key = self._messages_key(session_id)
-        meta_key = self._meta_key(session_id)
         with self.kv.pipeline() as pipe:
-            pipe.expire(messages_key, self.ttl_seconds)
-            pipe.expire(meta_key, self.ttl_seconds)
+            pipe.expire(self._messages_key(session_id), self.ttl_seconds)
+            pipe.expire(self._archive_key(session_id), self.ttl_seconds)
+            pipe.expire(self._meta_key(session_id), self.ttl_seconds)
+            self._queue_expiry_sentinel(pipe, session_id)
             pipe.execute()
 
     def delete_session(self, session_id: str) -> None:
-        self.kv.delete(self._meta_key(session_id), self._messages_key(session_id))
+        self.kv.delete(
+            self._meta_key(session_id),
+            self._messages_key(session_id),
+            self._archive_key(session_id),
+            self._expiry_key(session_id),
+        )
+
+    def request_archive(
+        self,
+        session_id: str,
+        *,
+        reason: str,
+        summary: Optional[str] = None,
+        metadata: Optional[Dict[str, Any]] = None,
+    ) -> str:
+        """Queue a session for the archiver worker and return the stream entry id."""
+
+        fields = {"session_id": session_id, "reason": reason}
+        if summary:
+            fields["summary"] = summary
+        if metadata:
+            fields["metadata"] = json.dumps(metadata, default=_json_default)
+        return self.kv.xadd(SESSION_ARCHIVE_STREAM, fields)
 
     # Escalation queue helpers -----------------------------------------------
 
-    def enqueue_escalation(self, session_id: str) -> None:
-        self.kv.sadd(self._escalations_key(), session_id)
+    def _queue_escalation(
+        self,
+        client: Any,
+        session_id: str,
+        *,
+        user_id: Optional[str] = None,
+        priority: int = 0,
+    ) -> Any:
+        keys = [self._escalations_key(), self._escalation_times_key()]
+        if user_id:
+            keys.append(self._escalation_count_key(user_id))
+        return self._enqueue_escalation_script(
+            keys=keys,
+            args=[
+                session_id,
+                time.time(),
+                priority,
+                ESCALATION_PRIORITY_STEP_SECONDS,
+                ESCALATION_MAX_REPEAT_BOOST,
+                ESCALATION_REPEAT_WINDOW_SECONDS,
+            ],
+            client=client,
+        )
+
+    def _drain_legacy_escalations(self) -> None:
+        """Queue escalations left in the legacy set, once per store, before reading the queue."""
+
+        if self._legacy_escalations_drained:
+            return
+        legacy_set, legacy_counts = self._legacy_escalation_keys()
+        self._drain_legacy_escalations_script(
+            keys=[legacy_set, self._escalations_key(), self._escalation_times_key(), legacy_counts],
+            args=[time.time()],
+        )
+        self._legacy_escalations_drained = True
+
+    def enqueue_escalation(self, session_id: str, *, user_id: Optional[str] = None, priority: int = 0) -> None:
+        self._queue_escalation(None, session_id, user_id=user_id, priority=priority)
 
     def dequeue_escalation(self, session_id: str) -> None:
-        self.kv.srem(self._escalations_key(), session_id)
+        with self.kv.pipeline() as pipe:
+            pipe.zrem(self._escalations_key(), session_id)
+            pipe.zrem(self._escalation_times_key(), session_id)
+            pipe.execute()
 
-    def list_escalations(self) -> List[Dict[str, Any]]:
-        session_ids = sorted(self.kv.smembers(self._escalations_key()))
-        metas: List[Dict[str, Any]] = []
-        for sid in session_ids:
-            meta = self.read_session_meta(sid)
-            if meta:
-                metas.append(meta)
-        return metas
+    def pop_next_escalation(self) -> Optional[str]:
+        """Atomically remove and return the session id at the head of the queue."""
+
+        self._drain_legacy_escalations()
+        popped = self._pop_escalation_script(
+            keys=[self._escalations_key(), self._escalation_times_key()],
+        )
+        return str(popped) if popped else None
+
+    def list_escalations(self, *, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        end = -1 if limit is None else limit - 1
+        if end < -1:
+            return []
+        self._drain_legacy_escalations()
+        session_ids = [str(sid) for sid in self.kv.zrange(self._escalations_key(), 0, end)]
+        return self._read_metas(session_ids, self.dequeue_escalations)
+
+    def scan_escalations(
+        self, *, cursor: Optional[str] = None, count: int = 50
+    ) -> Tuple[Optional[str], List[Dict[str, Any]]]:
+        """Page through pending escalations in priority order.
+
+        The cursor names the last ``(score, session id)`` served rather than an
+        offset, so escalations claimed or pruned between polls don't shift the
+        next page. A returned cursor of ``None`` means done.
+        """
+
+        self._drain_legacy_escalations()
+        key = self._escalations_key()
+        position = self._decode_escalation_cursor(cursor) if cursor else None
+        if position is None:
+            entries = self.kv.zrange(key, 0, count, withscores=True)
+        else:
+            score, last_id = position
+            # Members sharing the cursor's score sort by id, so resume after it.
+            with self.kv.pipeline() as pipe:
+                pipe.zrangebyscore(key, score, score, withscores=True)
+                pipe.zrangebyscore(key, f"({score!r}", "+inf", start=0, num=count + 1, withscores=True)
+                ties, later = pipe.execute()
+            entries = [(sid, sc) for sid, sc in ties if str(sid) > last_id] + list(later)
+        page = entries[:count]
+        next_cursor = self._encode_escalation_cursor(*page[-1]) if len(entries) > count else None
+        return next_cursor, self._read_metas([str(sid) for sid, _ in page], self.dequeue_escalations)
+
+    @staticmethod
+    def _encode_escalation_cursor(session_id: str, score: float) -> str:
+        return f"{float(score)!r}:{session_id}"
+
+    @staticmethod
+    def _decode_escalation_cursor(cursor: str) -> Optional[Tuple[float, str]]:
+        raw_score, sep, session_id = cursor.partition(":")
+        if not sep or not session_id:
+            return None
+        try:
+            return float(raw_score), session_id
+        except ValueError:
+            return None
+
+    def dequeue_escalations(self, session_ids: Sequence[str]) -> None:
+        if not session_ids:
+            return
+        with self.kv.pipeline() as pipe:
+            pipe.zrem(self._escalations_key(), *session_ids)
+            pipe.zrem(self._escalation_times_key(), *session_ids)
+            pipe.execute()
+
+    def escalation_queue_stats(self, *, now: Optional[float] = None) -> Dict[str, Any]:
+        """Queue depth and wait-time metrics for the agent dashboard."""
+
+        self._drain_legacy_escalations()
+        now = time.time() if now is None else now
+        times_key = self._escalation_times_key()
+        with self.kv.pipeline() as pipe:
+            pipe.zcard(self._escalations_key())
+            pipe.zrange(times_key, 0, 0, withscores=True)
+            for threshold in ESCALATION_WAIT_THRESHOLDS:
+                pipe.zcount(times_key, "-inf", now - threshold)
+            depth, oldest, *over = pipe.execute()
+        oldest_wait = max(now - float(oldest[0][1]), 0.0) if oldest else 0.0
+        return {
+            "depth": int(depth or 0),
+            "oldest_wait_seconds": round(oldest_wait, 3),
+            "waiting_over_seconds": {
+                str(threshold): int(count or 0)
+                for threshold, count in zip(ESCALATION_WAIT_THRESHOLDS, over)
+            },
+        }
 
     def assign_agent_session(self, session_id: str, agent_id: str) -> None:
         if not agent_id:
@@ -226,10 +691,63 @@ class RedisSessionStore:
     def list_agent_sessions(self, agent_id: str) -> List[Dict[str, Any]]:
         if not agent_id:
             return []
-        session_ids = sorted(self.kv.smembers(self._agent_sessions_key(agent_id)))
+        return self._list_metas(self._agent_sessions_key(agent_id))
+
+    def scan_agent_sessions(
+        self, agent_id: str, *, cursor: int = 0, count: int = 50
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        if not agent_id:
+            return 0, []
+        return self._scan_metas(self._agent_sessions_key(agent_id), cursor=cursor, count=count)
+
+    # Bulk meta reads ---------------------------------------------------------
+
+    def _read_metas(
+        self,
+        session_ids: Sequence[str],
+        prune: Callable[[Sequence[str]], None],
+    ) -> List[Dict[str, Any]]:
+        """Load metas for ``session_ids`` with one MGET, pruning ids whose meta expired."""
+
+        if not session_ids:
+            return []
+        raw_metas = self.kv.mget([self._meta_key(sid) for sid in session_ids])
         metas: List[Dict[str, Any]] = []
-        for sid in session_ids:
-            meta = self.read_session_meta(sid)
+        stale: List[str] = []
+        for sid, raw in zip(session_ids, raw_metas):
+            if raw is None:
+                stale.append(sid)
+                continue
+            meta = self._decode_meta(raw)
             if meta:
                 metas.append(meta)
+        if stale:
+            prune(stale)
         return metas
+
+    def _prune_set(self, index_key: str) -> Callable[[Sequence[str]], None]:
+        return lambda stale: self.kv.srem(index_key, *stale)
+
+    def _list_metas(self, index_key: str) -> List[Dict[str, Any]]:
+        metas: List[Dict[str, Any]] = []
+        cursor = 0
+        while True:
+            cursor, page = self._scan_metas(index_key, cursor=cursor)
+            metas.extend(page)
+            if cursor == 0:
+                return metas
+
+    def _scan_metas(self, index_key: str, *, cursor: int = 0, count: int = 50) -> Tuple[int, List[Dict[str, Any]]]:
+        """One SSCAN page of live metas; a returned cursor of 0 means done.
+
+        Expired ids are pruned as they're read and the page keeps scanning to
+        refill, so it is only short once the set is exhausted. SSCAN's COUNT is
+        a hint, so a page may hold slightly more than ``count`` metas.
+        """
+
+        metas: List[Dict[str, Any]] = []
+        while True:
+            cursor, batch = self.kv.sscan(index_key, cursor=cursor, count=count - len(metas))
+            metas.extend(self._read_metas(sorted(batch), self._prune_set(index_key)))
+            if cursor == 0 or len(metas) >= count:
+                return cursor, metas
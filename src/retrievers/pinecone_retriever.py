@@ -7,6 +7,7 @@ from openai import OpenAI
 from pinecone import Pinecone
 
 from src.config.settings import settings
+from src.vectorstores.quantized import local_vector_client
 
 
 EMBEDDING_MODEL = "text-embedding-3-small"
@@ -15,25 +16,40 @@ EMBEDDING_MODEL = "text-embedding-3-small"
 class PineconeRetriever:
     """Pinecone retriever using OpenAI embeddings."""
 
-    def __init__(self, index_name: str, namespace: Optional[str] = None, embedding_model: str = EMBEDDING_MODEL):
+    def __init__(
+        self,
+        index_name: str,
+        namespace: Optional[str] = None,
+        embedding_model: str = EMBEDDING_MODEL,
+        dimensions: Optional[int] = None,
+    ):
         self.index_name = index_name
         self.namespace = namespace
         self.embedding_model = embedding_model
+        # Must match the dimension the index was built with
+        self.dimensions = dimensions or settings.embedding_dimensions or None
 
+        local = settings.vector_backend == "local"
         pinecone_key = settings.pinecone_api_key or os.getenv("PINECONE_API_KEY", "")
         openai_key = settings.openai_api_key or os.getenv("OPENAI_API_KEY", "")
 
-        if not pinecone_key or not openai_key:
+        if (not pinecone_key and not local) or not openai_key:
             raise ValueError("Missing Pinecone or OpenAI API key")
 
-        self._pc = Pinecone(api_key=pinecone_key)
+        self._pc = local_vector_client() if local else Pinecone(api_key=pinecone_key)
         self._index = self._pc.Index(index_name)
         self._openai = OpenAI(api_key=openai_key)
 
-    async def aretrieve(self, query: str, k: int = 10, filter: Optional[Dict[str, Any]] = None) -> List[Document]:
-        emb = self._openai.embeddings.create(model=self.embedding_model, input=[query]).data[0].embedding
+    def embed_query(self, query: str) -> List[float]:
+        extra = {"dimensions": self.dimensions} if self.dimensions else {}
+        return self._openai.embeddings.create(model=self.embedding_model, input=[query], **extra).data[0].embedding
+
+    def retrieve_by_vector(
+        self, vector: List[float], k: int = 10, filter: Optional[Dict[str, Any]] = None
+    ) -> List[Document]:
+        """Query with an already embedded query, so one embedding can serve several searches."""
         res = self._index.query(
-            vector=emb,
+            vector=vector,
             top_k=k,
             include_metadata=True,
             namespace=self.namespace,
@@ -52,26 +68,9 @@ class PineconeRetriever:
             docs.append(Document(page_content=text, metadata=md))
         return docs
 
+    async def aretrieve(self, query: str, k: int = 10, filter: Optional[Dict[str, Any]] = None) -> List[Document]:
+        return self.retrieve_by_vector(self.embed_query(query), k=k, filter=filter)
+
     def retrieve(self, query: str, k: int = 10, filter: Optional[Dict[str, Any]] = None) -> List[Document]:
         """Synchronous variant of retrieval to simplify use in sync graphs/nodes."""
-        emb = self._openai.embeddings.create(model=self.embedding_model, input=[query]).data[0].embedding
-        res = self._index.query(
-            vector=emb,
-            top_k=k,
-            include_metadata=True,
-            namespace=self.namespace,
-            filter=filter,
-        )
-
-        docs: List[Document] = []
-        for m in getattr(res, "matches", []) or []:
-            md = m.metadata or {}
-            try:
-                md["score"] = float(getattr(m, "score", 0.0) or 0.0)
-            except Exception:
-                md["score"] = 0.0
-            text = md.get("text") or ""
-            docs.append(Document(page_content=text, metadata=md))
-        return docs
-
-
+        return self.retrieve_by_vector(self.embed_query(query), k=k, filter=filter)
@@ -0,0 +1,81 @@
+"""Scope policy retrieval to the documents a query is likely answered by.
+
+Chunks carry a ``documents`` metadata field (file names of every source
+they appeared in), so a Pinecone ``$in`` filter can restrict a query to a
+few of the policy PDFs. The router's query type and keywords in the query
+pick the candidates; callers widen to the whole namespace when a scoped
+query comes back short.
+"""
+
+from __future__ import annotations
+
+import re
+from typing import Dict, List, Optional, Pattern, Tuple
+
+# File name -> (what it covers, keywords that point at it)
+POLICY_DOCUMENTS: Dict[str, Tuple[str, Tuple[str, ...]]] = {
+    "Customer_Account_Management_Policy.pdf": (
+        "account access and profile updates",
+        ("account", "password", "login", "log in", "sign in", "profile", "username", "email address", "two-factor"),
+    ),
+    "Returns_and_Exchanges_Policy.pdf": (
+        "return windows and processes",
+        ("return", "exchange", "send back", "restocking", "damaged", "defective", "wrong item"),
+    ),
+    "Shipping_and_Delivery_Policy.pdf": (
+        "shipping methods and delays",
+        ("shipping", "ship", "delivery", "deliver", "courier", "tracking", "track", "shipment", "package", "late", "delay"),
+    ),
+    "Order_Management_Guide.pdf": (
+        "order status, cancellations",
+        ("order status", "cancel", "cancellation", "modify my order", "change my order", "order history", "backorder"),
+    ),
+    "Payment_and_Billing_Policy.pdf": (
+        "charges, refunds, invoices",
+        ("payment", "pay", "charge", "charged", "billing", "invoice", "refund", "credit card", "paypal", "receipt"),
+    ),
+    "Product_Information_Guide.pdf": (
+        "product specs and availability",
+        ("product", "spec", "specification", "size", "warranty", "availability", "in stock", "stock", "material"),
+    ),
+}
+
+# Documents the router's query types always point at, whatever the wording
+QUERY_TYPE_DOCUMENTS: Dict[str, Tuple[str, ...]] = {
+    "billing_issue": ("Payment_and_Billing_Policy.pdf", "Returns_and_Exchanges_Policy.pdf"),
+    "order_lookup": (
+        "Order_Management_Guide.pdf",
+        "Shipping_and_Delivery_Policy.pdf",
+        "Returns_and_Exchanges_Policy.pdf",
+    ),
+    "needs_identifier": ("Order_Management_Guide.pdf", "Shipping_and_Delivery_Policy.pdf"),
+}
+
+# Scoping to more than this many of the six documents saves too little to filter
+MAX_SCOPED_DOCUMENTS = 3
+
+_KEYWORDS: Dict[str, Pattern[str]] = {
+    name: re.compile(r"\b(?:" + "|".join(re.escape(k) for k in keywords) + r")(?:s|es|d|ed|ing)?\b")
+    for name, (_, keywords) in POLICY_DOCUMENTS.items()
+}
+
+
+def policy_summary() -> str:
+    """One-line catalogue of the policy documents, for prompts."""
+    listed = ", ".join(f"{name} ({description})" for name, (description, _) in POLICY_DOCUMENTS.items())
+    return f"Policies available for reference: {listed}."
+
+
+def scope_documents(query: str, query_type: Optional[str] = None) -> Optional[List[str]]:
+    """Documents to restrict retrieval to, or None to search everything."""
+    text = (query or "").lower()
+    names = {name for name, pattern in _KEYWORDS.items() if pattern.search(text)}
+    names.update(QUERY_TYPE_DOCUMENTS.get(query_type or "", ()))
+    if not names or len(names) > MAX_SCOPED_DOCUMENTS:
+        return None
+    return sorted(names)
+
+
+def document_filter(names: List[str]) -> Dict[str, Dict[str, List[str]]]:
+    """Pinecone metadata filter matching chunks from any of ``names``."""
+    return {"documents": {"$in": list(names)}}
@@ -0,0 +1,122 @@
+"""Client-side rate limiting and 429 retries for outbound API calls."""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from typing import Callable, Optional, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+class TokenBucket:
+    """Thread-safe token bucket refilled at ``rate_per_minute``.
+
+    :meth:`reserve` takes tokens immediately and returns how long the caller
+    must wait before using them; the balance may go negative, so a request
+    larger than ``capacity`` is still admitted once the debt is paid off and
+    callers are served in the order they reserved.
+    """
+
+    def __init__(
+        self,
+        rate_per_minute: float,
+        *,
+        capacity: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if rate_per_minute <= 0:
+            raise ValueError("rate_per_minute must be positive")
+        self.rate_per_second = rate_per_minute / 60.0
+        self.capacity = float(capacity if capacity is not None else rate_per_minute)
+        self._clock = clock
+        self._tokens = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float = 1.0) -> float:
+        with self._lock:
+            now = self._clock()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_second)
+            self._updated = now
+            self._tokens -= amount
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate_per_second
+
+
+class RateLimiter:
+    """Requests-per-minute and tokens-per-minute budgets for one API."""
+
+    def __init__(
+        self,
+        requests_per_minute: float,
+        tokens_per_minute: Optional[float] = None,
+        *,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ) -> None:
+        self.requests = TokenBucket(requests_per_minute, clock=clock)
+        self.tokens = TokenBucket(tokens_per_minute, clock=clock) if tokens_per_minute else None
+        self._sleep = sleep
+
+    def acquire(self, tokens: int = 0) -> float:
+        """Block until one request of ``tokens`` tokens fits; return the wait."""
+        wait = self.requests.reserve(1)
+        if self.tokens is not None and tokens:
+            wait = max(wait, self.tokens.reserve(tokens))
+        if wait > 0:
+            self._sleep(wait)
+        return wait
+
+
+def is_rate_limited(exc: BaseException) -> bool:
+    """True for HTTP 429 errors from the OpenAI or Pinecone clients."""
+    status = getattr(exc, "status_code", None) or getattr(exc, "status", None)
+    return status == 429
+
+
+def _retry_after(exc: BaseException) -> Optional[float]:
+    response = getattr(exc, "response", None)
+    headers = getattr(response, "headers", None) or {}
+    try:
+        value = headers.get("retry-after")
+        return float(value) if value is not None else None
+    except (TypeError, ValueError):
+        return None
+
+
+def call_with_backoff(
+    fn: Callable[[], T],
+    *,
+    max_retries: int = 5,
+    base_delay: float = 1.0,
+    max_delay: float = 30.0,
+    sleep: Callable[[float], None] = time.sleep,
+    retry_if: Callable[[BaseException], bool] = is_rate_limited,
+) -> T:
+    """Call ``fn``, retrying rate-limit errors with jittered exponential backoff.
+
+    A ``Retry-After`` header on the error takes precedence over the computed
+    delay. Other errors, and the last rate-limit error, propagate.
+    """
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as exc:
+            if attempt >= max_retries or not retry_if(exc):
+                raise
+            delay = _retry_after(exc)
+            if delay is None:
+                delay = min(max_delay, base_delay * (2**attempt)) * random.uniform(0.5, 1.0)
+            attempt += 1
+            logger.warning("rate_limit.retry attempt=%d delay=%.2fs error=%s", attempt, delay, exc)
+            sleep(delay)
+
+
+__all__ = ["RateLimiter", "TokenBucket", "call_with_backoff", "is_rate_limited"]
@@ -1,44 +1,133 @@
 from __future__ import annotations
-from typing import Any, Dict, List, Optional, Sequence
+from collections import deque
+from itertools import chain, islice
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, List, Optional, Sequence, Tuple
 import os
 import hashlib
+import logging
+import time
 
+import numpy as np
 from langchain.schema import Document
 from openai import OpenAI
 from pinecone import Pinecone, ServerlessSpec
 
+from src.cache.embedding_cache import EmbeddingCache
 from src.config.settings import settings
+from src.utils.rate_limit import RateLimiter, call_with_backoff
+from src.vectorstores.quantized import local_vector_client
 
+logger = logging.getLogger(__name__)
 
 EMBEDDING_MODEL = "text-embedding-3-small"  # 1536 dims
 EMBEDDING_DIM = 1536
 
+# Pinecone accepts at most 1000 ids per delete request
+DELETE_BATCH_SIZE = 1000
+
+
+def chunk_id(doc: Document) -> str:
+    """Stable vector id for a chunk: a hash of its source, page and text."""
+    meta = doc.metadata or {}
+    source = str(meta.get("source", ""))
+    page = str(meta.get("page", ""))
+    return hashlib.sha256((source + "|" + page + "|" + doc.page_content).encode("utf-8")).hexdigest()
+
+
+def document_names(sources: Sequence[str]) -> List[str]:
+    """File names of ``sources``, deduplicated; what retrieval scoping filters on."""
+    return list(dict.fromkeys(os.path.basename(str(source).rstrip("/")) for source in sources))
+
+
+def _index_dimension(description: Any) -> Optional[int]:
+    """Dimension from a ``list_indexes`` entry, if it reports one."""
+    try:
+        return int(description["dimension"])
+    except (KeyError, TypeError, ValueError):
+        return None
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) for rate-limit budgeting."""
+    return len(text) // 4 + 1
+
 
 class PineconeStore:
-    """Vector store wrapper for Pinecone using OpenAI embeddings."""
+    """Vector store wrapper for Pinecone using OpenAI embeddings.
+
+    ``upsert`` keeps up to ``max_concurrency`` embedding requests in flight
+    on a thread pool while the calling thread upserts finished batches, so
+    the embedding call for the next batch overlaps the Pinecone write for
+    the current one. Embedding requests draw from ``rate_limiter`` (requests
+    and estimated tokens per minute) and 429 responses from either service
+    are retried with backoff. Texts whose vectors are already in
+    ``embedding_cache`` (see :class:`SemanticSplitter`) are not sent at all.
 
-    def __init__(self, index_name: str, embedding_model: str = EMBEDDING_MODEL):
+    ``dimensions`` (default ``EMBEDDING_DIMENSIONS``) asks text-embedding-3
+    models for shorter vectors, which the index is created with; an existing
+    index of another dimension is rejected. With ``VECTOR_BACKEND=local``
+    vectors go to the in-process quantized index (development and tests).
+    """
+
+    def __init__(
+        self,
+        index_name: str,
+        embedding_model: str = EMBEDDING_MODEL,
+        *,
+        pinecone_client: Optional[Any] = None,
+        openai_client: Optional[Any] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        max_concurrency: Optional[int] = None,
+        embedding_cache: Optional[EmbeddingCache] = None,
+        dimensions: Optional[int] = None,
+    ):
         self.index_name = index_name
         self.embedding_model = embedding_model
-        self._pc: Optional[Pinecone] = None
+        self.dimensions = dimensions or settings.embedding_dimensions or None
+        self.rate_limiter = rate_limiter or RateLimiter(
+            settings.embedding_requests_per_minute,
+            settings.embedding_tokens_per_minute,
+        )
+        self.max_concurrency = max(1, max_concurrency or settings.embedding_max_concurrency)
+        self.embedding_cache = embedding_cache or EmbeddingCache(settings.embedding_cache_max_entries)
+        self.last_upsert_stats: Dict[str, float] = {}
+        self._pc: Optional[Pinecone] = pinecone_client
         self._index = None
-        self._openai = OpenAI(api_key=(settings.openai_api_key or os.getenv("OPENAI_API_KEY", "")))
+        self._openai = openai_client or OpenAI(api_key=(settings.openai_api_key or os.getenv("OPENAI_API_KEY", "")))
+
+    @property
+    def embedding_signature(self) -> str:
+        """Model and dimension; vectors are only interchangeable when these match."""
+        return f"{self.embedding_model}:{self.dimensions}d" if self.dimensions else self.embedding_model
 
     def _get_pc(self) -> Pinecone:
         if self._pc is None:
-            self._pc = Pinecone(api_key=(settings.pinecone_api_key or os.getenv("PINECONE_API_KEY", "")))
+            if settings.vector_backend == "local":
+                self._pc = local_vector_client()
+            else:
+                self._pc = Pinecone(api_key=(settings.pinecone_api_key or os.getenv("PINECONE_API_KEY", "")))
         return self._pc
 
     def _ensure_index(self) -> None:
         pc = self._get_pc()
-        existing = [i["name"] for i in pc.list_indexes()]
+        dimension = self.dimensions or EMBEDDING_DIM
+        existing = {i["name"]: i for i in pc.list_indexes()}
         if self.index_name not in existing:
             pc.create_index(
                 name=self.index_name,
-                dimension=EMBEDDING_DIM,
+                dimension=dimension,
                 metric="cosine",
                 spec=ServerlessSpec(cloud="aws", region="us-east-1"),
             )
+        else:
+            # Fail before embedding anything rather than on every upsert
+            found = _index_dimension(existing[self.index_name])
+            if found is not None and found != dimension:
+                raise ValueError(
+                    f"Index {self.index_name!r} has dimension {found}, but embeddings are {dimension}-d; "
+                    "set EMBEDDING_DIMENSIONS to match or point PINECONE_INDEX at a new index"
+                )
         self._index = pc.Index(self.index_name)
 
     def _get_index(self):
@@ -47,48 +136,150 @@ class PineconeStore:
         return self._index
 
     def _embed_texts(self, texts: Sequence[str]) -> List[List[float]]:
-        resp = self._openai.embeddings.create(model=self.embedding_model, input=list(texts))
+        extra = {"dimensions": self.dimensions} if self.dimensions else {}
+        resp = self._openai.embeddings.create(model=self.embedding_model, input=list(texts), **extra)
         return [d.embedding for d in resp.data]
 
-    def upsert(self, chunks: Sequence[Document], namespace: Optional[str] = None, batch_size: int = 128) -> int:
+    def _embed_batch(self, texts: Sequence[str]) -> List[List[float]]:
+        embeddings: List[Optional[List[float]]] = []
+        missing: List[int] = []
+        for position, text in enumerate(texts):
+            cached = self.embedding_cache.get(self.embedding_signature, text)
+            embeddings.append(cached.tolist() if cached is not None else None)
+            if cached is None:
+                missing.append(position)
+        if missing:
+            request = [texts[position] for position in missing]
+            self.rate_limiter.acquire(sum(estimate_tokens(text) for text in request))
+            fetched = call_with_backoff(lambda: self._embed_texts(request))
+            for position, embedding in zip(missing, fetched):
+                embeddings[position] = embedding
+        return embeddings
+
+    def embed(self, texts: Sequence[str], batch_size: int = 256) -> np.ndarray:
+        """Embed ``texts`` (rate limited, cache aware) into a float32 matrix."""
+        rows: List[List[float]] = []
+        for start in range(0, len(texts), batch_size):
+            rows.extend(self._embed_batch(texts[start:start + batch_size]))
+        return np.asarray(rows, dtype=np.float32).reshape(len(rows), -1)
+
+    @staticmethod
+    def _vectors(batch: Sequence[Document], embeddings: Sequence[List[float]]) -> List[Dict[str, Any]]:
+        vectors: List[Dict[str, Any]] = []
+        for doc, emb in zip(batch, embeddings):
+            meta = doc.metadata or {}
+            # Only store specific metadata fields: source(s), title, page, text
+            md: Dict[str, Any] = {
+                "source": str(meta.get("source", "")),
+                "text": doc.page_content,
+            }
+            # Every source the chunk appeared in, once near-duplicates are collapsed
+            md["sources"] = [str(s) for s in meta.get("sources") or [md["source"]]]
+            md["documents"] = document_names(md["sources"])
+
+            # Only add these specific fields if they exist and are not null
+            if meta.get("page") is not None:
+                md["page"] = meta.get("page")
+            if meta.get("title"):
+                md["title"] = str(meta.get("title"))
+            vectors.append({"id": chunk_id(doc), "values": emb, "metadata": md})
+        return vectors
+
+    def upsert(
+        self,
+        chunks: Iterable[Document],
+        namespace: Optional[str] = None,
+        batch_size: int = 128,
+        *,
+        on_progress: Optional[Callable[[str, int], None]] = None,
+    ) -> int:
         """Upsert chunk Documents into Pinecone.
 
-        Each vector stores embedding and metadata: {source, page, title, text}.
-        Returns number of vectors upserted.
+        Each vector stores embedding and metadata: {source, sources, documents, page, title, text}.
+        ``chunks`` may be a generator: it is read one batch at a time, only
+        as embedding slots free up, so at most ``max_concurrency + 1``
+        batches are held. Batches are written in order; throughput is logged
+        and kept in ``last_upsert_stats``. ``on_progress`` is called with
+        ``("chunks_embedded", n)`` and ``("vectors_upserted", n)`` per batch;
+        an exception it raises stops the upsert. Returns number of vectors
+        upserted.
         """
-        if not chunks:
+        chunk_iter = iter(chunks)
+        first = list(islice(chunk_iter, batch_size))
+        if not first:
             return 0
 
         index = self._get_index()
+        batches = chain([first], iter(lambda: list(islice(chunk_iter, batch_size)), []))
+        pending: Deque[Tuple[Sequence[Document], Future]] = deque()
         total = 0
+        batch_count = 0
+        started = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix="embed") as pool:
 
-        for start in range(0, len(chunks), batch_size):
-            batch = chunks[start:start + batch_size]
-            texts = [d.page_content for d in batch]
-            embeddings = self._embed_texts(texts)
-
-            vectors: List[Dict[str, Any]] = []
-            for doc, emb in zip(batch, embeddings):
-                meta = doc.metadata or {}
-                source = str(meta.get("source", ""))
-                page = str(meta.get("page", ""))
-                stable_id = hashlib.sha256((source + "|" + page + "|" + doc.page_content).encode("utf-8")).hexdigest()
-                # Only store specific metadata fields: source, title, page, text
-                md: Dict[str, Any] = {
-                    "source": source,
-                    "text": doc.page_content,
-                }
-                
-                # Only add these specific fields if they exist and are not null
-                if meta.get("page") is not None:
-                    md["page"] = meta.get("page")
-                if meta.get("title"):
-                    md["title"] = str(meta.get("title"))
-                vectors.append({"id": stable_id, "values": emb, "metadata": md})
-
-            index.upsert(vectors=vectors, namespace=namespace)
-            total += len(vectors)
+            def submit_next() -> None:
+                batch = next(batches, None)
+                if batch is not None:
+                    pending.append((batch, pool.submit(self._embed_batch, [d.page_content for d in batch])))
 
+            for _ in range(self.max_concurrency):
+                submit_next()
+            try:
+                while pending:
+                    batch, future = pending.popleft()
+                    embeddings = future.result()
+                    if on_progress is not None:
+                        on_progress("chunks_embedded", len(batch))
+                    # Start the next embedding before this batch's write
+                    submit_next()
+                    vectors = self._vectors(batch, embeddings)
+                    call_with_backoff(lambda: index.upsert(vectors=vectors, namespace=namespace))
+                    total += len(vectors)
+                    batch_count += 1
+                    if on_progress is not None:
+                        on_progress("vectors_upserted", len(vectors))
+            finally:
+                for _, future in pending:
+                    future.cancel()
+
+        elapsed = time.perf_counter() - started
+        self.last_upsert_stats = {
+            "chunks": total,
+            "batches": batch_count,
+            "seconds": elapsed,
+            "chunks_per_second": total / elapsed if elapsed > 0 else float(total),
+        }
+        logger.info(
+            "pinecone.upsert chunks=%d batches=%d seconds=%.2f chunks_per_second=%.1f",
+            total,
+            batch_count,
+            elapsed,
+            self.last_upsert_stats["chunks_per_second"],
+        )
         return total
 
+    def delete(self, ids: Sequence[str], namespace: Optional[str] = None) -> int:
+        """Delete vectors by id. Returns number of ids submitted for deletion.
 
+        Each request is retried on 429 like upserts, so a rate limit does not
+        abort an incremental re-ingest halfway through its deletions.
+        """
+        if not ids:
+            return 0
+
+        index = self._get_index()
+        for start in range(0, len(ids), DELETE_BATCH_SIZE):
+            batch = list(ids[start:start + DELETE_BATCH_SIZE])
+            call_with_backoff(lambda: index.delete(ids=batch, namespace=namespace))
+        return len(ids)
+
+    def update_metadata(self, metadata: Dict[str, Dict[str, Any]], namespace: Optional[str] = None) -> int:
+        """Overwrite the given metadata fields of existing vectors, keyed by id."""
+        if not metadata:
+            return 0
+
+        index = self._get_index()
+        for vector_id, fields in metadata.items():
+            call_with_backoff(lambda: index.update(id=vector_id, set_metadata=fields, namespace=namespace))
+        return len(metadata)
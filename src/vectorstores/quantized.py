@@ -0,0 +1,302 @@
+"""In-process vector index with int8 or binary quantized storage.
+
+:class:`QuantizedIndex` answers the subset of the Pinecone ``Index`` API the
+stores and retrievers here use (``upsert``, ``query``, ``update``,
+``delete``), so a :class:`LocalVectorClient` can stand in for the Pinecone
+client in development and tests (``VECTOR_BACKEND=local``). It is not a
+deployment option: the index lives in the memory of one process and is not
+persisted, so an ingest run in another process or worker is never seen by
+the API, and every restart empties it.
+
+Vectors are unit-normalised on write and scored by cosine. With ``int8``
+each row is stored as int8 codes plus one float scale (4x smaller than
+float32) and scored asymmetrically against the float query. ``binary``
+keeps one sign bit per dimension (32x smaller) and ranks by Hamming
+distance. Either way the best ``top_k * rescore_factor`` candidates are
+re-scored against float32 copies of just those rows, so the returned
+scores are exact cosines and recall stays close to the full-precision
+scan. The scan only reads the quantized matrix; the float copies are
+touched per shortlist row. ``keep_float=False`` drops them to cut memory
+too, and returns quantized scores.
+"""
+
+from __future__ import annotations
+
+import threading
+from functools import lru_cache
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from src.config.settings import settings
+
+QUANTIZATION_MODES = ("none", "int8", "binary")
+
+# int8 rows are widened to float32 this many at a time; converting the
+# whole matrix per query is slower than the float32 scan it replaces
+SCAN_BLOCK_ROWS = 2048
+
+# Bits of every byte value, for scoring packed sign bits against a float query
+_BYTE_BITS = np.unpackbits(np.arange(256, dtype=np.uint8)[:, None], axis=1).astype(np.float32)
+
+
+def _unit_rows(matrix: np.ndarray) -> np.ndarray:
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def quantize_int8(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Symmetric per-row int8 codes and scales, ``vectors ~= codes * scales[:, None]``."""
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.rint(vectors / scales[:, None]).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+def quantize_binary(vectors: np.ndarray) -> np.ndarray:
+    """One sign bit per dimension, packed eight to a byte."""
+    return np.packbits(vectors > 0, axis=1)
+
+
+def _matches_filter(metadata: Dict[str, Any], filter: Optional[Dict[str, Any]]) -> bool:
+    """Pinecone-style equality filters: ``{field: value}``, ``$eq``, ``$ne``, ``$in``."""
+    for field, condition in (filter or {}).items():
+        value = metadata.get(field)
+        values = value if isinstance(value, list) else [value]
+        if not isinstance(condition, dict):
+            condition = {"$eq": condition}
+        for op, expected in condition.items():
+            if op == "$eq" and expected not in values:
+                return False
+            if op == "$ne" and expected in values:
+                return False
+            if op == "$in" and not any(v in expected for v in values):
+                return False
+            if op not in ("$eq", "$ne", "$in"):
+                raise ValueError(f"Unsupported filter operator {op!r}")
+    return True
+
+
+class _Namespace:
+    """Rows of one namespace; the scan matrices are rebuilt after writes."""
+
+    def __init__(self) -> None:
+        # id -> stored row: int8 codes, packed bits or float32 per the index mode
+        self.rows: Dict[str, np.ndarray] = {}
+        self.scales: Dict[str, float] = {}
+        self.floats: Dict[str, np.ndarray] = {}
+        self.metadata: Dict[str, Dict[str, Any]] = {}
+        self.ids: List[str] = []
+        self.matrix: Optional[np.ndarray] = None
+        self.scale_vector: Optional[np.ndarray] = None
+        self.float_matrix: Optional[np.ndarray] = None
+
+
+class QuantizedIndex:
+    """Brute-force cosine index over quantized rows with float re-scoring."""
+
+    def __init__(
+        self,
+        dimension: int,
+        *,
+        quantization: str = "int8",
+        rescore_factor: int = 10,
+        keep_float: bool = True,
+    ) -> None:
+        if quantization not in QUANTIZATION_MODES:
+            raise ValueError(f"quantization must be one of {QUANTIZATION_MODES}")
+        self.dimension = dimension
+        self.quantization = quantization
+        self.rescore_factor = max(1, rescore_factor)
+        self.keep_float = keep_float
+        self._namespaces: Dict[str, _Namespace] = {}
+        self._lock = threading.Lock()
+
+    def _namespace(self, namespace: Optional[str]) -> _Namespace:
+        return self._namespaces.setdefault(namespace or "", _Namespace())
+
+    def upsert(self, *, vectors: Sequence[Dict[str, Any]], namespace: Optional[str] = None) -> Dict[str, int]:
+        if not vectors:
+            return {"upserted_count": 0}
+        values = np.asarray([v["values"] for v in vectors], dtype=np.float32)
+        if values.shape[1] != self.dimension:
+            raise ValueError(f"Vector dimension {values.shape[1]} does not match index dimension {self.dimension}")
+        floats = _unit_rows(values)
+        scales = np.ones(len(vectors), dtype=np.float32)
+        if self.quantization == "int8":
+            rows, scales = quantize_int8(floats)
+        elif self.quantization == "binary":
+            rows = quantize_binary(floats)
+        else:
+            rows = floats
+        with self._lock:
+            ns = self._namespace(namespace)
+            for position, vector in enumerate(vectors):
+                vector_id = vector["id"]
+                ns.rows[vector_id] = rows[position]
+                ns.scales[vector_id] = float(scales[position])
+                if self.keep_float and self.quantization != "none":
+                    ns.floats[vector_id] = floats[position]
+                ns.metadata[vector_id] = dict(vector.get("metadata") or {})
+            ns.matrix = None
+        return {"upserted_count": len(vectors)}
+
+    def update(self, *, id: str, set_metadata: Optional[Dict[str, Any]] = None, namespace: Optional[str] = None) -> None:
+        with self._lock:
+            metadata = self._namespace(namespace).metadata.get(id)
+            if metadata is not None:
+                metadata.update(set_metadata or {})
+
+    def delete(self, *, ids: Sequence[str], namespace: Optional[str] = None) -> None:
+        with self._lock:
+            ns = self._namespace(namespace)
+            for vector_id in ids:
+                for rows in (ns.rows, ns.scales, ns.floats, ns.metadata):
+                    rows.pop(vector_id, None)
+            ns.matrix = None
+
+    def _build(self, ns: _Namespace) -> None:
+        ns.ids = list(ns.rows)
+        width = (self.dimension + 7) // 8 if self.quantization == "binary" else self.dimension
+        dtype = {"int8": np.int8, "binary": np.uint8}.get(self.quantization, np.float32)
+        ns.matrix = np.stack([ns.rows[i] for i in ns.ids]) if ns.ids else np.zeros((0, width), dtype)
+        ns.scale_vector = np.fromiter((ns.scales[i] for i in ns.ids), np.float32, len(ns.ids))
+        if self.quantization == "none":
+            ns.float_matrix = ns.matrix
+        elif self.keep_float:
+            ns.float_matrix = np.stack([ns.floats[i] for i in ns.ids]) if ns.ids else np.zeros((0, self.dimension), np.float32)
+        else:
+            ns.float_matrix = None
+
+    def _coarse_scores(self, ns: _Namespace, query: np.ndarray) -> np.ndarray:
+        if self.quantization == "int8":
+            scores = np.empty(len(ns.ids), dtype=np.float32)
+            for start in range(0, len(ns.ids), SCAN_BLOCK_ROWS):
+                block = ns.matrix[start:start + SCAN_BLOCK_ROWS]
+                scores[start:start + SCAN_BLOCK_ROWS] = block.astype(np.float32) @ query
+            return scores * ns.scale_vector
+        if self.quantization == "binary":
+            if ns.float_matrix is not None:
+                hamming = np.bitwise_count(ns.matrix ^ quantize_binary(query[None, :])).sum(axis=1, dtype=np.int64)
+                return -hamming.astype(np.float32)
+            # Asymmetric estimate, float query against the +-1 sign vectors: a
+            # table of the query mass under each byte value at each position
+            width = ns.matrix.shape[1]
+            padded = np.zeros(width * 8, dtype=np.float32)
+            padded[:self.dimension] = query
+            table = padded.reshape(width, 8) @ _BYTE_BITS.T
+            ones = table[np.arange(width), ns.matrix].sum(axis=1)
+            return (2 * ones - query.sum()) / np.sqrt(self.dimension)
+        return ns.matrix @ query
+
+    def query(
+        self,
+        *,
+        vector: Sequence[float],
+        top_k: int = 10,
+        namespace: Optional[str] = None,
+        include_metadata: bool = True,
+        filter: Optional[Dict[str, Any]] = None,
+        **_: Any,
+    ) -> SimpleNamespace:
+        query = _unit_rows(np.asarray(vector, dtype=np.float32)[None, :])[0]
+        with self._lock:
+            ns = self._namespace(namespace)
+            if ns.matrix is None:
+                self._build(ns)
+            if not ns.ids:
+                return SimpleNamespace(matches=[])
+            scores = self._coarse_scores(ns, query)
+            if filter:
+                allowed = np.fromiter((_matches_filter(ns.metadata[i], filter) for i in ns.ids), bool, len(ns.ids))
+                scores = np.where(allowed, scores, -np.inf)
+            rescore = ns.float_matrix is not None and self.quantization != "none"
+            candidates = min(len(ns.ids), top_k * self.rescore_factor if rescore else top_k)
+            rows = np.argpartition(-scores, candidates - 1)[:candidates]
+            rows = rows[np.isfinite(scores[rows])]
+            if rescore:
+                # Exact cosine for the shortlist only
+                scores = np.full(len(ns.ids), -np.inf, dtype=np.float32)
+                scores[rows] = ns.float_matrix[rows] @ query
+            rows = rows[np.argsort(-scores[rows], kind="stable")][:top_k]
+            return SimpleNamespace(
+                matches=[
+                    SimpleNamespace(
+                        id=ns.ids[row],
+                        score=float(scores[row]),
+                        metadata=dict(ns.metadata[ns.ids[row]]) if include_metadata else None,
+                    )
+                    for row in rows
+                ]
+            )
+
+    def stats(self, namespace: Optional[str] = None) -> Dict[str, int]:
+        """Rows and bytes of the scan matrix, and of the float copies kept for re-scoring."""
+        with self._lock:
+            ns = self._namespace(namespace)
+            if ns.matrix is None:
+                self._build(ns)
+            scan = ns.matrix.nbytes + (ns.scale_vector.nbytes if self.quantization == "int8" else 0)
+            rescore = ns.float_matrix.nbytes if ns.float_matrix is not None and self.quantization != "none" else 0
+            return {"vectors": len(ns.ids), "scan_bytes": int(scan), "rescore_bytes": int(rescore)}
+
+
+class LocalVectorClient:
+    """Pinecone-client lookalike handing out :class:`QuantizedIndex` instances.
+
+    ``Index(name)`` creates a missing index with ``dimension``, so query-side
+    clients can open it before anything was ingested.
+    """
+
+    def __init__(
+        self,
+        dimension: int = 1536,
+        *,
+        quantization: str = "int8",
+        rescore_factor: int = 10,
+        keep_float: bool = True,
+    ) -> None:
+        self.dimension = dimension
+        self.quantization = quantization
+        self.rescore_factor = rescore_factor
+        self.keep_float = keep_float
+        self._indexes: Dict[str, QuantizedIndex] = {}
+        self._lock = threading.Lock()
+
+    def list_indexes(self) -> List[Dict[str, Any]]:
+        return [{"name": name, "dimension": index.dimension} for name, index in self._indexes.items()]
+
+    def create_index(self, name: str, dimension: int, **_: Any) -> None:
+        with self._lock:
+            self._indexes.setdefault(
+                name,
+                QuantizedIndex(
+                    dimension,
+                    quantization=self.quantization,
+                    rescore_factor=self.rescore_factor,
+                    keep_float=self.keep_float,
+                ),
+            )
+
+    def Index(self, name: str) -> QuantizedIndex:
+        if name not in self._indexes:
+            self.create_index(name, self.dimension)
+        return self._indexes[name]
+
+
+@lru_cache()
+def local_vector_client() -> LocalVectorClient:
+    """Process-wide local client, so ingestion, retrieval and the cache share indexes.
+
+    Only processes that ingest and serve in the same interpreter (a dev
+    server, a test run) see the same vectors.
+    """
+    if settings.environment == "prod":
+        raise ValueError("VECTOR_BACKEND=local is for development and tests; use Pinecone in prod")
+    return LocalVectorClient(
+        settings.embedding_dimensions or 1536,
+        quantization=settings.vector_quantization,
+        rescore_factor=settings.vector_rescore_factor,
+        keep_float=settings.vector_keep_float,
+    )
@@ -0,0 +1,5 @@
+"""Background workers that run as separate processes from the API."""
+
+from .archiver import SessionArchiver, aarchive_session, archive_session
+
+__all__ = ["SessionArchiver", "aarchive_session", "archive_session"]
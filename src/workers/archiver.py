@@ -0,0 +1,317 @@
+"""Background worker that archives closed and expiring sessions to Mongo.
+
+Run it next to the API with ``python -m src.workers.archiver``. Close requests
+arrive on the ``sessions:archive`` Redis stream (see
+``RedisSessionStore.request_archive``); idle sessions are picked up from
+keyspace notifications on their expiry sentinel key, which lapses shortly
+before the session data itself. Entries are read through a consumer group, so
+several archivers can share the load and unacknowledged work is retried.
+"""
+
+from __future__ import annotations
+
+import json
+import logging
+import os
+import socket
+import time
+from typing import Any, Dict, List, Optional
+
+from src.config.logging import configure_logging
+from src.config.settings import settings
+from src.persistence.mongo import AsyncMongo, Mongo
+from src.persistence.redis import RedisKV, RedisSessionStore
+from src.persistence.redis.store import SESSION_ARCHIVE_STREAM
+from src.utils.summarize import summarize_messages
+
+logger = logging.getLogger(__name__)
+
+ARCHIVER_GROUP = "archivers"
+EXPIRED_EVENTS_PATTERN = "__keyevent@*__:expired"
+
+# Meta fields that are session bookkeeping rather than archivable metadata.
+_RESERVED_META_KEYS = {
+    "session_id",
+    "user_id",
+    "status",
+    "created_at",
+    "last_updated",
+    "session_summary",
+    "summary_message_count",
+    "message_count",
+}
+
+
+def _prepare_archive(
+    session_store: RedisSessionStore,
+    session_id: str,
+    summary: Optional[str],
+    metadata: Optional[Dict[str, Any]],
+) -> Optional[Dict[str, Any]]:
+    """Collect what needs writing to Mongo, or None when the session is gone."""
+
+    meta = session_store.read_session_meta(session_id)
+    if not meta:
+        return None
+
+    history = session_store.get_all_messages(session_id)
+    summary_text = summary or meta.get("session_summary")
+    if not summary_text and history:
+        summary_payload = [
+            {"role": msg.get("role", "user"), "content": msg.get("content", "")}
+            for msg in history
+            if msg.get("content")
+        ]
+        if summary_payload:
+            summary_text = summarize_messages(
+                summary_payload,
+                max_length=settings.session_summary_max_chars,
+            )
+
+    meta_metadata = {k: v for k, v in meta.items() if k not in _RESERVED_META_KEYS}
+    combined_metadata = {**meta_metadata, **(metadata or {})}
+    return {
+        "user_id": meta.get("user_id"),
+        "agent_id": meta.get("agent_id"),
+        "history": history,
+        "summary": summary_text,
+        "metadata": combined_metadata or None,
+    }
+
+
+def _clear_session(session_store: RedisSessionStore, session_id: str, plan: Dict[str, Any]) -> None:
+    agent_id = plan["agent_id"]
+    session_store.dequeue_escalation(session_id)
+    if agent_id:
+        session_store.unassign_agent_session(session_id, agent_id)
+    session_store.publish_status(session_id, {"status": "closed", "agent_id": agent_id})
+    session_store.delete_session(session_id)
+    session_store.unregister_session(session_id, plan["user_id"])
+
+
+def archive_session(
+    session_store: RedisSessionStore,
+    mongo: Mongo,
+    session_id: str,
+    *,
+    summary: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> bool:
+    """Move a session from Redis into Mongo and clear it from Redis.
+
+    Returns False when the session no longer exists in Redis. Safe to retry:
+    message archival is idempotent and Redis is only cleaned up at the end.
+    """
+
+    plan = _prepare_archive(session_store, session_id, summary, metadata)
+    if plan is None:
+        return False
+    user_id = plan["user_id"]
+    mongo.create_session(session_id, user_id, metadata=plan["metadata"])
+    mongo.archive_messages(session_id, plan["history"], user_id=user_id)
+    if plan["summary"]:
+        mongo.upsert_session_summary(
+            session_id,
+            plan["summary"],
+            user_id=user_id,
+            message_count=len(plan["history"]),
+        )
+    mongo.close_session(session_id, summary=plan["summary"], metadata=plan["metadata"])
+    _clear_session(session_store, session_id, plan)
+    return True
+
+
+async def aarchive_session(
+    session_store: RedisSessionStore,
+    mongo: AsyncMongo,
+    session_id: str,
+    *,
+    summary: Optional[str] = None,
+    metadata: Optional[Dict[str, Any]] = None,
+) -> bool:
+    """Async counterpart of :func:`archive_session` for the API's inline close."""
+
+    plan = _prepare_archive(session_store, session_id, summary, metadata)
+    if plan is None:
+        return False
+    user_id = plan["user_id"]
+    await mongo.create_session(session_id, user_id, metadata=plan["metadata"])
+    await mongo.archive_messages(session_id, plan["history"], user_id=user_id)
+    if plan["summary"]:
+        await mongo.upsert_session_summary(
+            session_id,
+            plan["summary"],
+            user_id=user_id,
+            message_count=len(plan["history"]),
+        )
+    await mongo.close_session(session_id, summary=plan["summary"], metadata=plan["metadata"])
+    _clear_session(session_store, session_id, plan)
+    return True
+
+
+class SessionArchiver:
+    """Consume archive requests from Redis and write them to Mongo in batches."""
+
+    def __init__(
+        self,
+        session_store: RedisSessionStore,
+        mongo: Mongo,
+        *,
+        consumer: Optional[str] = None,
+        batch_size: int = 50,
+        max_attempts: int = 5,
+        block_ms: int = 5000,
+        retry_delay_seconds: float = 1.0,
+        claim_idle_ms: int = 60_000,
+    ) -> None:
+        self.session_store = session_store
+        self.mongo = mongo
+        self.client = session_store.kv.client
+        self.consumer = consumer or socket.gethostname()
+        self.batch_size = max(batch_size, 1)
+        self.max_attempts = max(max_attempts, 1)
+        self.block_ms = block_ms
+        self.retry_delay_seconds = retry_delay_seconds
+        self.claim_idle_ms = max(int(claim_idle_ms), 0)
+        self._attempts_key = f"{SESSION_ARCHIVE_STREAM}:attempts"
+        self._dead_letter_key = f"{SESSION_ARCHIVE_STREAM}:dead"
+
+    def ensure_group(self) -> None:
+        try:
+            self.client.xgroup_create(SESSION_ARCHIVE_STREAM, ARCHIVER_GROUP, id="0", mkstream=True)
+        except Exception as exc:
+            if "BUSYGROUP" not in str(exc):
+                raise
+
+    def handle_expired_key(self, key: str) -> Optional[str]:
+        """Turn an expired sentinel key into an archive request."""
+
+        session_id = self.session_store.session_id_from_expiry_key(key)
+        if session_id is None:
+            return None
+        return self.session_store.request_archive(session_id, reason="expired")
+
+    def _read(self, last_id: str, block_ms: Optional[int]) -> List[Any]:
+        response = self.client.xreadgroup(
+            ARCHIVER_GROUP,
+            self.consumer,
+            {SESSION_ARCHIVE_STREAM: last_id},
+            count=self.batch_size,
+            block=block_ms,
+        )
+        entries: List[Any] = []
+        for _, stream_entries in response or []:
+            entries.extend(stream_entries)
+        return entries
+
+    def _claim(self) -> List[Any]:
+        """Take over entries other consumers read but left unacknowledged for ``claim_idle_ms``."""
+
+        response = self.client.xautoclaim(
+            SESSION_ARCHIVE_STREAM,
+            ARCHIVER_GROUP,
+            self.consumer,
+            min_idle_time=self.claim_idle_ms,
+            start_id="0-0",
+            count=self.batch_size,
+        )
+        entries: List[Any] = []
+        for entry_id, fields in (response[1] if response else []):
+            if fields:
+                entries.append((entry_id, fields))
+            else:
+                # Deleted from the stream while pending (Redis 6.2 still returns it)
+                self.client.xack(SESSION_ARCHIVE_STREAM, ARCHIVER_GROUP, entry_id)
+        return entries
+
+    def _archive_entry(self, fields: Dict[str, str]) -> None:
+        session_id = fields["session_id"]
+        if fields.get("reason") == "expired" and self.session_store.has_expiry_sentinel(session_id):
+            # The session saw activity after the sentinel lapsed; leave it be.
+            return
+        metadata = json.loads(fields["metadata"]) if fields.get("metadata") else None
+        archive_session(
+            self.session_store,
+            self.mongo,
+            session_id,
+            summary=fields.get("summary"),
+            metadata=metadata,
+        )
+
+    def process_batch(self, block_ms: Optional[int] = None) -> int:
+        """Archive up to ``batch_size`` requests and return how many were handled.
+
+        Entries this consumer read earlier but never acknowledged (a crash or
+        a failed attempt) are retried first, then entries another consumer has
+        held unacknowledged for ``claim_idle_ms`` (it likely died mid-batch),
+        and only then are new ones read.
+        """
+
+        entries = self._read("0", None) or self._claim() or self._read(">", block_ms)
+        failed = 0
+        for entry_id, fields in entries:
+            try:
+                self._archive_entry(fields)
+            except Exception:
+                failed += 1
+                attempts = self.client.hincrby(self._attempts_key, entry_id, 1)
+                logger.exception("archiver.failed session=%s attempt=%s", fields.get("session_id"), attempts)
+                if attempts < self.max_attempts:
+                    continue
+                self.client.xadd(self._dead_letter_key, dict(fields))
+            self.client.xack(SESSION_ARCHIVE_STREAM, ARCHIVER_GROUP, entry_id)
+            self.client.xdel(SESSION_ARCHIVE_STREAM, entry_id)
+            self.client.hdel(self._attempts_key, entry_id)
+        if failed:
+            time.sleep(self.retry_delay_seconds)
+        return len(entries)
+
+    def watch_expirations(self) -> Any:
+        """Subscribe to key expiry events in a background thread."""
+
+        try:
+            self.client.config_set("notify-keyspace-events", "Ex")
+        except Exception:
+            logger.warning("archiver.keyspace_events_unconfigured; expiry archival needs notify-keyspace-events Ex")
+
+        def _on_expired(message: Dict[str, Any]) -> None:
+            self.handle_expired_key(str(message.get("data")))
+
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.psubscribe(**{EXPIRED_EVENTS_PATTERN: _on_expired})
+        return pubsub.run_in_thread(sleep_time=1.0, daemon=True)
+
+    def run_forever(self) -> None:
+        self.ensure_group()
+        watcher = self.watch_expirations()
+        logger.info("archiver.started consumer=%s", self.consumer)
+        try:
+            while True:
+                self.process_batch(block_ms=self.block_ms)
+        finally:
+            watcher.stop()
+
+
+def main() -> None:
+    configure_logging()
+    session_store = RedisSessionStore(
+        settings.redis_url,
+        recent_window=settings.recent_messages_window,
+        ttl_days=settings.session_redis_ttl_days,
+        archive_grace_seconds=settings.session_archive_grace_seconds,
+        kv_client=RedisKV(settings.redis_url),
+    )
+    mongo = Mongo(settings.mongodb_uri, db_name="ecomm", **settings.mongo_client_options())
+    archiver = SessionArchiver(
+        session_store,
+        mongo,
+        consumer=os.getenv("ARCHIVER_CONSUMER"),
+        batch_size=settings.archiver_batch_size,
+        max_attempts=settings.archiver_max_attempts,
+        claim_idle_ms=settings.archiver_claim_idle_ms,
+    )
+    archiver.run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+from fastapi.testclient import TestClient
+
+from app.api.main import create_app
+from app.api.deps import get_mongo, get_semantic_cache, get_session_store
+from src.config.settings import settings
+from src.persistence.redis import RedisKV, RedisSessionStore
+from src.workers.archiver import SessionArchiver
+from tests.test_chat_flow import _build_mongo, _build_semantic_cache
+from tests.test_session_memory import FakeRedis
+
+
+def _build_session_store() -> RedisSessionStore:
+    kv = RedisKV("redis://localhost:6379/0", client=FakeRedis())
+    return RedisSessionStore(
+        "redis://localhost:6379/0",
+        recent_window=5,
+        ttl_days=1,
+        archive_grace_seconds=3600,
+        kv_client=kv,
+    )
+
+
+def test_async_close_is_archived_by_worker(monkeypatch):
+    monkeypatch.setattr(settings, "session_archive_async", True)
+    app = create_app()
+    session_store = _build_session_store()
+    mongo = _build_mongo()
+    app.dependency_overrides[get_session_store] = lambda: session_store
+    app.dependency_overrides[get_mongo] = lambda: mongo
+    app.dependency_overrides[get_semantic_cache] = _build_semantic_cache
+
+    session_store.write_session_meta("sess-close", {"user_id": "alice", "status": "active", "channel": "web"})
+    session_store.register_session("sess-close", "alice")
+    session_store.append_message("sess-close", {"role": "user", "content": "Hi"})
+    session_store.append_message("sess-close", {"role": "assistant", "content": "Hello"})
+
+    client = TestClient(app)
+    close_resp = client.post("/v1/sessions/sess-close/close", params={"user_id": "alice"}, json={"summary": "resolved"})
+    assert close_resp.status_code == 200
+    assert close_resp.json()["status"] == "closed"
+    # The request only queues the work; nothing is in Mongo yet
+    assert mongo.get_session("sess-close") is None
+    assert session_store.read_session_meta("sess-close")["status"] == "closing"
+
+    chat_resp = client.post("/v1/chat", json={"user_id": "alice", "session_id": "sess-close", "query": "still there?"})
+    assert chat_resp.status_code == 409
+
+    archiver = SessionArchiver(session_store, mongo, consumer="test")
+    archiver.ensure_group()
+    assert archiver.process_batch() == 1
+    assert archiver.process_batch() == 0
+
+    archived = mongo.get_session("sess-close")
+    assert archived["status"] == "closed"
+    assert archived["session_summary"] == "resolved"
+    assert archived["channel"] == "web"
+    assert [m["content"] for m in mongo.get_messages("sess-close")] == ["Hi", "Hello"]
+    assert session_store.read_session_meta("sess-close") is None
+    assert session_store.list_sessions("alice") == []
+
+
+def test_expiry_sentinel_archives_idle_sessions_only():
+    session_store = _build_session_store()
+    mongo = _build_mongo()
+    redis_client: FakeRedis = session_store.kv.client  # type: ignore[assignment]
+
+    for sid in ("sess-idle", "sess-busy"):
+        session_store.write_session_meta(sid, {"user_id": "bob", "status": "active"})
+        session_store.append_message(sid, {"role": "user", "content": f"from {sid}"})
+    # The sentinel lapses an hour before the session data does
+    assert redis_client.ttl("session:sess-idle:expiry") == session_store.ttl_seconds - 3600
+
+    archiver = SessionArchiver(session_store, mongo, consumer="test")
+    archiver.ensure_group()
+    for sid in ("sess-idle", "sess-busy"):
+        redis_client.delete(f"session:{sid}:expiry")
+        archiver.handle_expired_key(f"session:{sid}:expiry")
+    assert archiver.handle_expired_key("session:sess-idle:messages") is None
+    # sess-busy gets a new message before the archiver catches up
+    session_store.append_message("sess-busy", {"role": "user", "content": "back again"})
+
+    assert archiver.process_batch() == 2
+    assert mongo.get_session("sess-idle")["status"] == "closed"
+    assert mongo.get_session("sess-busy") is None
+    assert session_store.read_session_meta("sess-busy") is not None
+
+
+def test_archiver_retries_then_dead_letters_failures(monkeypatch):
+    session_store = _build_session_store()
+    mongo = _build_mongo()
+    redis_client: FakeRedis = session_store.kv.client  # type: ignore[assignment]
+    session_store.write_session_meta("sess-err", {"user_id": "carol", "status": "active"})
+    session_store.request_archive("sess-err", reason="closed")
+
+    calls = []
+
+    def flaky_archive(*args, **kwargs):
+        calls.append(args)
+        raise RuntimeError("mongo unavailable")
+
+    monkeypatch.setattr(mongo, "archive_messages", flaky_archive)
+    archiver = SessionArchiver(session_store, mongo, consumer="test", max_attempts=2, retry_delay_seconds=0)
+    archiver.ensure_group()
+
+    assert archiver.process_batch() == 1
+    assert redis_client.xpending("sessions:archive", "archivers")["pending"] == 1
+    assert archiver.process_batch() == 1
+    assert len(calls) == 2
+    assert redis_client.xpending("sessions:archive", "archivers")["pending"] == 0
+    assert redis_client.xlen("sessions:archive:dead") == 1
+
+
+def test_archiver_reclaims_entries_left_by_a_dead_consumer():
+    session_store = _build_session_store()
+    mongo = _build_mongo()
+    redis_client: FakeRedis = session_store.kv.client  # type: ignore[assignment]
+    session_store.write_session_meta("sess-orphan", {"user_id": "dave", "status": "active"})
+    session_store.append_message("sess-orphan", {"role": "user", "content": "bye"})
+    session_store.request_archive("sess-orphan", reason="closed")
+
+    crashed = SessionArchiver(session_store, mongo, consumer="crashed")
+    crashed.ensure_group()
+    # Read but never acknowledged: the consumer died mid-batch
+    assert len(crashed._read(">", None)) == 1
+
+    archiver = SessionArchiver(session_store, mongo, consumer="live", claim_idle_ms=60_000)
+    assert archiver.process_batch() == 0
+    assert mongo.get_session("sess-orphan") is None
+
+    # Age the crashed consumer's claim past the idle threshold
+    (pending,) = redis_client.xpending_range("sessions:archive", "archivers", "-", "+", 10)
+    redis_client.xclaim(
+        "sessions:archive", "archivers", "crashed", 0, [pending["message_id"]], idle=120_000
+    )
+    assert archiver.process_batch() == 1
+    assert mongo.get_session("sess-orphan")["status"] == "closed"
+    assert redis_client.xpending("sessions:archive", "archivers")["pending"] == 0
@@ -19,6 +19,9 @@ class DummyGraph:
     def __init__(self) -> None:
         self.states = []
 
+    async def ainvoke(self, state):  # type: ignore[no-untyped-def]
+        return self.invoke(state)
+
     def invoke(self, state):  # type: ignore[no-untyped-def]
         # Simulate router decision: docs only
         state.query_type = "policy_only"
@@ -110,6 +113,9 @@ def test_chat_endpoint_creates_and_updates_session():
         assert payload["cache_hit"] is False
 
         session_id = payload["session_id"]
+        # One pipelined read and one MULTI/EXEC write per turn, plus the
+        # session creation committed before the graph on the first turn
+        assert session_store.kv.client.pipeline_executions == 3
         assert graph.states[0].user_id == "alice"
         assert graph.states[0].session_id == session_id
         assert len(graph.states[0].recent_messages) == 1
@@ -140,6 +146,7 @@ def test_chat_endpoint_creates_and_updates_session():
 
         history_after = mongo.get_messages(session_id)
         assert history_after == []
+        assert session_store.kv.client.pipeline_executions == 5
 
         # Session reuse by different user should be denied
         forbidden = client.post(
@@ -149,7 +156,34 @@ def test_chat_endpoint_creates_and_updates_session():
         assert forbidden.status_code == 403
 
 
+class FailingGraph:
+    async def ainvoke(self, state):  # type: ignore[no-untyped-def]
+        raise RuntimeError("graph failed")
+
+
+def test_new_session_survives_a_failed_graph_turn():
+    app = create_app()
+    chat_module._graph = FailingGraph()
+
+    session_store = _build_session_store()
+    app.dependency_overrides[get_session_store] = lambda: session_store
+    app.dependency_overrides[get_mongo] = lambda: _build_mongo()
+    app.dependency_overrides[get_semantic_cache] = lambda: _build_semantic_cache()
+
+    client = TestClient(app, raise_server_exceptions=False)
+    response = client.post("/v1/chat", json={"user_id": "alice", "query": "Hi", "session_id": "sess-failed"})
+    assert response.status_code == 500
+
+    meta = session_store.read_session_meta("sess-failed")
+    assert meta is not None and meta["greeting_sent"] is True
+    assert [m["session_id"] for m in session_store.list_sessions("alice")] == ["sess-failed"]
+    assert [m["role"] for m in session_store.get_recent_messages("sess-failed")] == ["assistant"]
+
+
 class EscalationGraph:
+    async def ainvoke(self, state):  # type: ignore[no-untyped-def]
+        return self.invoke(state)
+
     def invoke(self, state):  # type: ignore[no-untyped-def]
         return {
             "answer": "",
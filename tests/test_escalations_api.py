@@ -2,17 +2,29 @@ from __future__ import annotations
 
 from datetime import datetime, timezone
 
+import fakeredis
+import pytest
 from fastapi.testclient import TestClient
+from starlette.websockets import WebSocketDisconnect
 
 from app.api.main import create_app
-from app.api.deps import get_session_store, get_mongo, get_semantic_cache
-from tests.test_chat_flow import _build_session_store, _build_mongo, _build_semantic_cache
+from app.api.deps import (
+    get_mongo,
+    get_semantic_cache,
+    get_session_events,
+    get_session_store,
+    get_ws_session_store,
+)
+from src.persistence.mongo import AsyncMongo
+from src.persistence.redis import SessionEventBus
+from tests.test_chat_flow import _build_session_store, _build_semantic_cache
+from tests.test_session_memory import FakeAsyncMongoClient
 
 
 def test_escalation_claim_and_message_flow():
     app = create_app()
     session_store = _build_session_store()
-    mongo = _build_mongo()
+    mongo = AsyncMongo("mongodb://localhost:27017", client=FakeAsyncMongoClient())
     semantic_cache = _build_semantic_cache()
 
     app.dependency_overrides[get_session_store] = lambda: session_store
@@ -51,6 +63,10 @@ def test_escalation_claim_and_message_flow():
     assert claim_data["agent_id"] == "agent@example.com"
     assert session_store.list_escalations() == []
 
+    metrics = client.get("/v1/escalations/metrics")
+    assert metrics.status_code == 200
+    assert metrics.json()["depth"] == 0
+
     agent_queue = client.get("/v1/escalations", params={"agent_id": "agent@example.com"})
     assert agent_queue.status_code == 200
     agent_data = agent_queue.json()
@@ -86,3 +102,80 @@ def test_escalation_claim_and_message_flow():
     assert close_resp.status_code == 200
     assert session_store.list_escalations() == []
     assert session_store.list_agent_sessions("agent@example.com") == []
+
+
+def test_claim_next_escalation_pops_highest_priority():
+    app = create_app()
+    session_store = _build_session_store()
+    app.dependency_overrides[get_session_store] = lambda: session_store
+
+    now = datetime.now(timezone.utc).isoformat()
+    for session_id, priority in (("older", 0), ("billing", 1), ("closed", 2)):
+        status_value = "active" if session_id == "closed" else "pending_handoff"
+        session_store.write_session_meta(
+            session_id,
+            {"user_id": f"{session_id}@example.com", "status": status_value, "escalated_at": now},
+        )
+        session_store.enqueue_escalation(session_id, priority=priority)
+
+    client = TestClient(app)
+    assert client.get("/v1/escalations/metrics").json()["depth"] == 3
+
+    first = client.post("/v1/escalations/next", json={"agent_id": "agent@example.com"})
+    assert first.status_code == 200
+    assert first.json()["session_id"] == "billing"
+    assert first.json()["status"] == "live_agent"
+
+    second = client.post("/v1/escalations/next", json={"agent_id": "agent@example.com"})
+    assert second.json()["session_id"] == "older"
+
+    empty = client.post("/v1/escalations/next", json={"agent_id": "agent@example.com"})
+    assert empty.status_code == 404
+    assert [m["session_id"] for m in session_store.list_agent_sessions("agent@example.com")] == ["billing", "older"]
+
+
+def test_session_websocket_pushes_message_and_status_deltas():
+    app = create_app()
+    session_store = _build_session_store()
+    # Real pub/sub on the same in-memory server the store publishes to
+    events = SessionEventBus(
+        client=fakeredis.aioredis.FakeRedis(server=session_store.kv.client.server, decode_responses=True),
+        poll_timeout=0.05,
+    )
+    app.dependency_overrides[get_session_store] = lambda: session_store
+    app.dependency_overrides[get_ws_session_store] = lambda: session_store
+    app.dependency_overrides[get_session_events] = lambda: events
+
+    session_id = "session-live"
+    session_store.write_session_meta(
+        session_id, {"user_id": "customer@example.com", "status": "pending_handoff"}
+    )
+    session_store.append_message(session_id, {"role": "user", "content": "I need a human"})
+    session_store.enqueue_escalation(session_id)
+
+    client = TestClient(app)
+    with pytest.raises(WebSocketDisconnect):
+        with client.websocket_connect(f"/v1/sessions/{session_id}/ws?user_id=someone-else") as ws:
+            ws.receive_json()
+
+    with client.websocket_connect(f"/v1/sessions/{session_id}/ws?user_id=customer@example.com&since=0") as ws:
+        replayed = ws.receive_json()
+        assert replayed["type"] == "message"
+        assert replayed["message"]["seq"] == 1
+
+        claim = client.post(f"/v1/escalations/{session_id}/claim", json={"agent_id": "agent@example.com"})
+        assert claim.status_code == 200
+        status_event = ws.receive_json()
+        assert status_event == {"type": "status", "status": "live_agent", "agent_id": "agent@example.com"}
+
+        sent = client.post(
+            f"/v1/escalations/{session_id}/messages",
+            json={"agent_id": "agent@example.com", "content": "Hi, how can I help?"},
+        )
+        assert sent.status_code == 200
+        delta = ws.receive_json()
+        assert delta["message"]["seq"] == 2
+        assert delta["message"]["role"] == "agent"
+        assert delta["message"]["content"] == "Hi, how can I help?"
+
+    assert events._subscribers == {}
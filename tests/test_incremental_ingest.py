@@ -0,0 +1,117 @@
+from __future__ import annotations
+
+from pathlib import Path
+from types import SimpleNamespace
+from typing import List
+
+from langchain.schema import Document
+
+from src.ingestion.documents import pipeline
+from src.ingestion.documents.manifest import IngestionManifest
+from src.ingestion.documents.pipeline import sync_sources
+from src.vectorstores.pinecone_store import PineconeStore
+from tests.utils.pinecone_stubs import FakePineconeClient
+
+
+class CountingEmbeddings:
+    def __init__(self) -> None:
+        self.texts: List[str] = []
+
+    def create(self, model: str, input: List[str]):
+        self.texts.extend(input)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(text))]) for text in input])
+
+
+def _store():
+    embeddings = CountingEmbeddings()
+    pinecone = FakePineconeClient()
+    store = PineconeStore(
+        "test-index",
+        pinecone_client=pinecone,
+        openai_client=SimpleNamespace(embeddings=embeddings),
+    )
+    return store, embeddings, pinecone.index
+
+
+def _sync(paths: List[Path], store, manifest, **kwargs):
+    return sync_sources([str(p) for p in paths], "docs", semantic=False, store=store, manifest=manifest, **kwargs)
+
+
+def test_unchanged_corpus_costs_no_embedding_calls(tmp_path):
+    returns = tmp_path / "returns.txt"
+    shipping = tmp_path / "shipping.txt"
+    returns.write_text("Returns are accepted within 30 days of delivery.", encoding="utf-8")
+    shipping.write_text("Standard shipping takes three to five business days.", encoding="utf-8")
+    store, embeddings, index = _store()
+    manifest_path = tmp_path / "manifest.json"
+
+    first = _sync([returns, shipping], store, IngestionManifest(manifest_path))
+    assert first["chunks_upserted"] == 2
+    assert len(index.storage["docs"]) == 2
+
+    embeddings.texts.clear()
+    second = _sync([returns, shipping], store, IngestionManifest(manifest_path))
+    assert embeddings.texts == []
+    assert second == {
+        "sources_skipped": 2,
+        "sources_indexed": 0,
+        "chunks_upserted": 0,
+        "chunks_deleted": 0,
+        "duplicates_collapsed": 0,
+        "embedding_tokens_saved": 0,
+    }
+
+
+def test_changed_source_replaces_only_its_chunks(tmp_path):
+    returns = tmp_path / "returns.txt"
+    shipping = tmp_path / "shipping.txt"
+    returns.write_text("Returns are accepted within 30 days of delivery.", encoding="utf-8")
+    shipping.write_text("Standard shipping takes three to five business days.", encoding="utf-8")
+    store, embeddings, index = _store()
+    manifest = IngestionManifest(tmp_path / "manifest.json")
+    _sync([returns, shipping], store, manifest)
+
+    embeddings.texts.clear()
+    returns.write_text("Returns are accepted within 60 days of delivery.", encoding="utf-8")
+    stats = _sync([returns, shipping], store, manifest)
+
+    assert embeddings.texts == ["Returns are accepted within 60 days of delivery."]
+    assert (stats["sources_skipped"], stats["chunks_upserted"], stats["chunks_deleted"]) == (1, 1, 1)
+    texts = sorted(v["metadata"]["text"] for v in index.storage["docs"].values())
+    assert texts == [
+        "Returns are accepted within 60 days of delivery.",
+        "Standard shipping takes three to five business days.",
+    ]
+
+    # Dropping a source and pruning deletes its vectors
+    stats = _sync([returns], store, manifest, prune=True)
+    assert stats["chunks_deleted"] == 1
+    assert len(index.storage["docs"]) == 1
+    assert manifest.sources(manifest.scope("test-index", "docs")) == [str(returns)]
+
+
+def test_directory_streams_file_by_file_into_upserts(tmp_path, monkeypatch):
+    events: List[str] = []
+    manuals = [str(tmp_path / f"manual-{i}.pdf") for i in range(6)]
+
+    def load_pdf(path: str):
+        events.append(f"load {Path(path).name}")
+        return [Document(page_content=f"Contents of {Path(path).name}.", metadata={"source": path, "page": 0})]
+
+    monkeypatch.setattr(pipeline, "_pdf_files", lambda directory: manuals)
+    monkeypatch.setitem(pipeline._LOADERS, "pdf_file", load_pdf)
+    store, _, index = _store()
+    store.max_concurrency = 1
+    write = index.upsert
+
+    def logged_upsert(*, namespace, vectors):
+        events.append(f"upsert {len(vectors)}")
+        write(namespace=namespace, vectors=vectors)
+
+    monkeypatch.setattr(index, "upsert", logged_upsert)
+    manifest = IngestionManifest(tmp_path / "manifest.json")
+    stats = sync_sources([str(tmp_path)], "docs", semantic=False, store=store, manifest=manifest, batch_size=1)
+
+    assert stats["chunks_upserted"] == 6
+    # The first write lands before the later manuals are even loaded
+    assert events.index("upsert 1") < events.index("load manual-3.pdf")
@@ -0,0 +1,100 @@
+from __future__ import annotations
+
+import threading
+from pathlib import Path
+from types import SimpleNamespace
+
+import pytest
+from fastapi.testclient import TestClient
+
+from app.api.deps import get_ingest_jobs
+from app.api.main import create_app
+from src.ingestion.documents.manifest import IngestionManifest
+from src.ingestion.documents.pipeline import sync_sources
+from src.ingestion.jobs import IngestionJobManager
+from src.ingestion.progress import IngestionCancelled, IngestionProgress
+from src.vectorstores.pinecone_store import PineconeStore
+from tests.test_incremental_ingest import CountingEmbeddings
+from tests.utils.pinecone_stubs import FakePineconeClient
+
+
+def _store() -> PineconeStore:
+    return PineconeStore(
+        "test-index",
+        pinecone_client=FakePineconeClient(),
+        openai_client=SimpleNamespace(embeddings=CountingEmbeddings()),
+    )
+
+
+def _write_sources(tmp_path: Path, count: int):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"policy-{i}.txt"
+        path.write_text(f"Policy {i} applies to every order.", encoding="utf-8")
+        paths.append(str(path))
+    return paths
+
+
+def test_docs_job_reports_progress_over_the_api(tmp_path, monkeypatch):
+    sources = _write_sources(tmp_path, 3)
+    manifest = IngestionManifest(tmp_path / "manifest.json")
+
+    def ingest(sources, namespace, *, semantic, prune, progress):
+        stats = sync_sources(sources, namespace, semantic=semantic, store=_store(), manifest=manifest, progress=progress)
+        return stats["chunks_upserted"]
+
+    monkeypatch.setattr("app.api.routes.ingest_jobs.ingest_files_with_preprocessing", ingest)
+    jobs = IngestionJobManager()
+    app = create_app()
+    app.dependency_overrides[get_ingest_jobs] = lambda: jobs
+    client = TestClient(app)
+
+    accepted = client.post("/v1/ingest/jobs/docs", json={"sources": sources, "namespace": "docs", "semantic": False})
+    assert accepted.status_code == 202
+    job_id = accepted.json()["job_id"]
+    jobs.get(job_id).future.result(timeout=10)
+
+    body = client.get(f"/v1/ingest/jobs/{job_id}").json()
+    assert body["status"] == "succeeded"
+    assert body["result"] == {"vectors_upserted": 3}
+    progress = body["progress"]
+    assert progress["stage"] == "succeeded"
+    assert (progress["docs_processed"], progress["chunks_embedded"], progress["vectors_upserted"]) == (3, 3, 3)
+    assert (progress["units_done"], progress["units_total"]) == (3, 3)
+    assert [job["job_id"] for job in client.get("/v1/ingest/jobs").json()] == [job_id]
+
+
+def test_cancelling_a_running_job_stops_it_at_the_next_checkpoint():
+    jobs = IngestionJobManager()
+    started = threading.Event()
+
+    def runner(progress: IngestionProgress):
+        progress.set_stage("indexing")
+        started.set()
+        while True:
+            progress.check()
+            threading.Event().wait(0.01)
+
+    job = jobs.submit("docs", runner)
+    assert started.wait(timeout=5)
+    assert job.status == "running"
+
+    jobs.cancel(job.id)
+    job.future.result(timeout=5)
+    assert job.status == "cancelled"
+    assert job.progress.snapshot()["stage"] == "cancelled"
+    jobs.shutdown()
+
+
+def test_cancelled_sync_keeps_finished_sources(tmp_path):
+    sources = _write_sources(tmp_path, 3)
+    manifest = IngestionManifest(tmp_path / "manifest.json")
+    progress = IngestionProgress()
+    store = _store()
+    # Cancel as soon as the first source's vectors are written
+    store.delete = lambda ids, namespace=None: progress.cancel() or 0
+
+    with pytest.raises(IngestionCancelled):
+        sync_sources(sources, "docs", semantic=False, store=store, manifest=manifest, progress=progress)
+
+    assert manifest.sources(manifest.scope("test-index", "docs")) == [sources[0]]
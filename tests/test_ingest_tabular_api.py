@@ -44,7 +44,9 @@ def test_ingest_tabular_success(mock_close, mock_load_csvs, mock_create_engine,
         mock_engine,
         "data/fake_customers.csv",
         "data/fake_orders.csv", 
-        "data/fake_products.csv"
+        "data/fake_products.csv",
+        mode="insert",
+        order_cache=None,
     )
     mock_close.assert_called_once_with(mock_engine)
 
@@ -99,5 +101,5 @@ def test_ingest_tabular_optional_paths(client):
         assert data["status"] == "success"
         
         # load_csvs should be called with None for all CSV paths
-        mock_load.assert_called_once_with(mock_engine, None, None, None)
+        mock_load.assert_called_once_with(mock_engine, None, None, None, mode="insert", order_cache=None)
 
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+from src.ingestion.documents.dedupe import NearDuplicateIndex, simhash
+from src.ingestion.documents.manifest import IngestionManifest
+from src.ingestion.documents.pipeline import sync_sources
+from tests.test_incremental_ingest import _store
+
+FOOTER = (
+    "Questions about this policy can be sent to our customer care team at support@example.com "
+    "or by phone on 1-800-555-0100, Monday to Friday between 8am and 6pm Eastern time. "
+    "This document is provided for information only and does not form part of any contract of sale. "
+    "Example Retail Ltd reserves the right to amend this policy at any time without prior notice."
+)
+
+BODIES = {
+    "returns": "Returns are accepted within 30 days of delivery when items are unused and in original packaging. ",
+    "shipping": "Standard shipping takes three to five business days and express delivery arrives the next day. ",
+    "warranty": "Electronics carry a one year warranty covering manufacturing defects but not accidental damage. ",
+}
+
+
+def test_index_matches_near_identical_text_only():
+    index = NearDuplicateIndex(max_distance=6)
+    assert index.match("footer", FOOTER) == (None, simhash(FOOTER))
+
+    canonical, _ = index.match("footer-2", FOOTER.replace("Eastern", "Pacific"))
+    assert canonical == "footer"
+    assert index.match("body", BODIES["returns"] * 3)[0] is None
+    # Short texts differing in one word are different facts, not duplicates
+    assert index.match("a", "Policy 1 applies to every order.")[0] is None
+    assert index.match("b", "Policy 2 applies to every order.")[0] is None
+
+
+def test_repeated_boilerplate_is_embedded_once_and_lists_its_sources(tmp_path):
+    paths = []
+    for i, (name, body) in enumerate(BODIES.items()):
+        path = tmp_path / f"{name}.txt"
+        # Bodies long enough that the footer becomes a chunk of its own
+        footer = FOOTER.replace("Ltd", "Ltd.") if i == 2 else FOOTER
+        path.write_text(body * 6 + "\n\n" + footer, encoding="utf-8")
+        paths.append(str(path))
+    store, embeddings, index = _store()
+    manifest = IngestionManifest(tmp_path / "manifest.json")
+
+    stats = sync_sources(paths, "docs", semantic=False, store=store, manifest=manifest)
+
+    assert sum("customer care" in text for text in embeddings.texts) == 1
+    assert stats["duplicates_collapsed"] == 2
+    assert stats["embedding_tokens_saved"] > 2 * len(FOOTER) // 5
+    footers = [v["metadata"] for v in index.storage["docs"].values() if "customer care" in v["metadata"]["text"]]
+    assert len(footers) == 1
+    assert footers[0]["sources"] == paths
+    bodies = [v["metadata"] for v in index.storage["docs"].values() if "customer care" not in v["metadata"]["text"]]
+    assert [md["sources"] for md in bodies] == [[md["source"]] for md in bodies]
+
+    # Pruning the source that owns the footer hands it to one still sharing it
+    stats = sync_sources(paths[1:], "docs", semantic=False, store=store, manifest=manifest, prune=True)
+    assert stats["chunks_deleted"] == 1
+    footers = [v["metadata"] for v in index.storage["docs"].values() if "customer care" in v["metadata"]["text"]]
+    assert [(md["source"], md["sources"]) for md in footers] == [(paths[1], paths[1:])]
@@ -0,0 +1,134 @@
+from __future__ import annotations
+
+import asyncio
+from datetime import date
+from decimal import Decimal
+from unittest.mock import AsyncMock, patch
+
+from src.cache.order_cache import OrderLookupCache
+from src.graph.nodes.retrieve_sql import aretrieve_sql_node
+from src.graph.state import RAGState
+from src.persistence.redis import RedisKV
+from tests.test_session_memory import FakeRedis
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def _row(order_id: int = 1) -> dict:
+    return {
+        "order_id": order_id,
+        "order_date": date(2024, 5, 1),
+        "unit_price": Decimal("19.99"),
+        "first_name": "Alice",
+    }
+
+
+def test_lookups_fall_through_local_then_redis_then_loader():
+    kv = RedisKV("redis://localhost:6379/0", client=FakeRedis())
+    clock = FakeClock()
+    cache = OrderLookupCache(kv, local_ttl_seconds=5, ttl_seconds=60, clock=clock)
+    calls = []
+
+    def loader():
+        calls.append(1)
+        return _row()
+
+    assert cache.get_or_load("alice", 1, loader) == _row()
+    assert cache.get_or_load("alice", 1, loader) == _row()
+
+    clock.now = 10.0  # local entry expired, Redis copy still valid
+    row = cache.get_or_load("alice", 1, loader)
+    assert row["order_date"] == date(2024, 5, 1)
+    assert row["unit_price"] == Decimal("19.99")
+
+    # Unknown orders are cached as misses too
+    assert cache.get_or_load("alice", 999, lambda: None) is None
+    assert cache.get_or_load("alice", 999, loader) is None
+
+    assert len(calls) == 1
+    stats = cache.stats()
+    assert (stats["local_hits"], stats["redis_hits"], stats["misses"]) == (2, 1, 2)
+    assert stats["hit_ratio"] == 3 / 5
+
+
+def test_invalidate_bumps_generation_for_every_worker():
+    redis = FakeRedis()
+    clock = FakeClock()
+    worker_a = OrderLookupCache(RedisKV("redis://localhost:6379/0", client=redis), clock=clock)
+    worker_b = OrderLookupCache(RedisKV("redis://localhost:6379/0", client=redis), clock=clock)
+
+    worker_a.put("alice", 1, _row())
+    assert worker_b.get("alice", 1)[0] is True
+
+    worker_a.invalidate()
+    assert worker_a.get("alice", 1) == (False, None)
+    # Worker B keeps its local copy until the local TTL lapses
+    assert worker_b.get("alice", 1)[0] is True
+    clock.now = 10.0
+    assert worker_b.get("alice", 1) == (False, None)
+    assert worker_a.stats()["invalidations"] == 1
+
+
+def test_rows_loaded_across_an_invalidation_are_not_cached():
+    redis = FakeRedis()
+    worker_a = OrderLookupCache(RedisKV("redis://localhost:6379/0", client=redis))
+    worker_b = OrderLookupCache(RedisKV("redis://localhost:6379/0", client=redis))
+
+    def stale_loader():
+        worker_b.invalidate()  # another worker reloads the data mid-lookup
+        return _row()
+
+    assert worker_a.get_or_load("alice", 1, stale_loader) == _row()
+    assert worker_a.get("alice", 1) == (False, None)
+    assert redis.keys("orders:lookup:*:alice:1") == []
+
+    async def async_loader():
+        worker_b.invalidate()
+        return _row(2)
+
+    assert asyncio.run(worker_a.aget_or_load("alice", 2, async_loader)) == _row(2)
+    assert worker_a.get("alice", 2) == (False, None)
+
+    # Without a concurrent reload the async path fills both tiers
+    async def loader():
+        return _row(3)
+
+    assert asyncio.run(worker_a.aget_or_load("alice", 3, loader)) == _row(3)
+    assert worker_b.get("alice", 3)[0] is True
+
+
+def test_lru_evicts_least_recently_used():
+    cache = OrderLookupCache(None, max_entries=2)
+    cache.put("alice", 1, _row(1))
+    cache.put("alice", 2, _row(2))
+    cache.get("alice", 1)
+    cache.put("alice", 3, _row(3))
+
+    assert cache.get("alice", 2) == (False, None)
+    assert cache.get("alice", 1)[0] is True
+    assert cache.stats()["local_entries"] == 2
+
+
+@patch("src.graph.nodes.retrieve_sql.aget_order_for_user", new_callable=AsyncMock)
+def test_async_node_reads_through_order_cache(mock_aget_order):
+    mock_aget_order.return_value = {"order_id": 7, "first_name": "Alice"}
+    cache = OrderLookupCache(None)
+
+    for _ in range(3):
+        state = RAGState(
+            query="order #7",
+            user_id="user@example.com",
+            should_retrieve_sql=True,
+            pg_engine=object(),
+            order_cache=cache,
+        )
+        result = asyncio.run(aretrieve_sql_node(state))
+        assert result.sql_rows[0]["order_id"] == 7
+
+    mock_aget_order.assert_awaited_once()
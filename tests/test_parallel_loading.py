@@ -0,0 +1,33 @@
+from pathlib import Path
+
+from src.ingestion.documents import pipeline
+from src.ingestion.documents.loaders import load_from_pdf_dir
+from src.ingestion.documents.preprocess import preprocess_documents
+
+
+DATA_DIR = str(Path(__file__).resolve().parents[1] / "data")
+
+
+def _key(doc):
+    return doc.metadata["source"], doc.metadata["page"], doc.page_content
+
+
+def test_process_pool_matches_serial_loading_in_order(monkeypatch, tmp_path):
+    notes = tmp_path / "notes.txt"
+    notes.write_text("Gift cards cannot be returned.", encoding="utf-8")
+    sources = [str(notes), DATA_DIR]
+
+    serial = pipeline.load_source_groups(sources, preprocess=True, workers=1)
+    monkeypatch.setattr(pipeline, "PARALLEL_LOAD_MIN_TASKS", 0)
+    monkeypatch.setattr(pipeline.os, "cpu_count", lambda: 2)
+    parallel = pipeline.load_source_groups(sources, preprocess=True, workers=2)
+
+    assert [[d.page_content for d in group] for group in parallel] == [
+        [d.page_content for d in group] for group in serial
+    ]
+    assert [d.metadata for d in parallel[1]] == [d.metadata for d in serial[1]]
+    assert [d.metadata["source"] for d in parallel[0]] == [str(notes)]
+
+    # Same pages and text as the directory loader, in sorted file order
+    legacy = preprocess_documents(load_from_pdf_dir(DATA_DIR))
+    assert sorted(map(_key, legacy)) == list(map(_key, parallel[1]))
@@ -0,0 +1,140 @@
+from __future__ import annotations
+
+import threading
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+from langchain.schema import Document
+
+from src.utils.rate_limit import RateLimiter, TokenBucket
+from src.vectorstores.pinecone_store import PineconeStore
+from tests.utils.pinecone_stubs import FakePineconeClient, FakePineconeIndex
+
+
+class FakeClock:
+    def __init__(self) -> None:
+        self.now = 0.0
+        self.sleeps: List[float] = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+class RateLimitError(Exception):
+    status_code = 429
+    response = SimpleNamespace(headers={"retry-after": "0"})
+
+
+class FlakyEmbeddings:
+    """Answers 429 on the first call, then embeds every text as its length."""
+
+    def __init__(self) -> None:
+        self.calls = 0
+        self.embedded: List[str] = []
+        self._lock = threading.Lock()
+
+    def create(self, model: str, input: List[str]):
+        with self._lock:
+            self.calls += 1
+            if self.calls == 1:
+                raise RateLimitError("slow down")
+            self.embedded.extend(input)
+        return SimpleNamespace(data=[SimpleNamespace(embedding=[float(len(text))]) for text in input])
+
+
+def _store(embeddings, pinecone=None, **kwargs) -> PineconeStore:
+    return PineconeStore(
+        "test-index",
+        pinecone_client=pinecone or FakePineconeClient(),
+        openai_client=SimpleNamespace(embeddings=embeddings),
+        **kwargs,
+    )
+
+
+def _docs(count: int) -> List[Document]:
+    return [Document(page_content=f"policy text {i}", metadata={"source": "policy.txt", "page": i}) for i in range(count)]
+
+
+def test_token_bucket_spaces_requests_at_the_configured_rate():
+    clock = FakeClock()
+    limiter = RateLimiter(60, 600, clock=clock, sleep=clock.sleep)
+    limiter.requests = TokenBucket(60, capacity=1, clock=clock)
+
+    assert limiter.acquire(tokens=10) == 0.0
+    assert limiter.acquire(tokens=10) == pytest.approx(1.0)
+    # 590 tokens left; 600 tokens/min refill at 10/s, so 700 more waits 11s
+    assert limiter.acquire(tokens=700) == pytest.approx(11.0)
+    assert clock.sleeps == [pytest.approx(1.0), pytest.approx(11.0)]
+
+
+def test_upsert_retries_rate_limited_batches():
+    embeddings = FlakyEmbeddings()
+    pinecone = FakePineconeClient()
+    store = _store(embeddings, pinecone, max_concurrency=2)
+
+    assert store.upsert(_docs(5), namespace="docs", batch_size=2) == 5
+    assert sorted(embeddings.embedded) == sorted(doc.page_content for doc in _docs(5))
+    assert len(pinecone.index.storage["docs"]) == 5
+    assert store.last_upsert_stats["batches"] == 3
+    assert store.last_upsert_stats["chunks_per_second"] > 0
+
+
+class RateLimitedDeleteIndex(FakePineconeIndex):
+    """Answers 429 to the first delete request."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.delete_calls = 0
+
+    def delete(self, *, ids, namespace):
+        self.delete_calls += 1
+        if self.delete_calls == 1:
+            raise RateLimitError("slow down")
+        super().delete(ids=ids, namespace=namespace)
+
+
+def test_delete_retries_rate_limited_requests():
+    pinecone = FakePineconeClient()
+    pinecone.index = RateLimitedDeleteIndex()
+    store = _store(FlakyEmbeddings(), pinecone)
+    pinecone.index.storage["docs"] = {"a": {}, "b": {}}
+
+    assert store.delete(["a", "b"], namespace="docs") == 2
+    assert pinecone.index.delete_calls == 2
+    assert pinecone.index.storage["docs"] == {}
+
+
+class BlockingIndex(FakePineconeIndex):
+    """Holds the first write until the next batch's embedding has started."""
+
+    def __init__(self, next_embedding_started: threading.Event) -> None:
+        super().__init__()
+        self.next_embedding_started = next_embedding_started
+        self.overlapped = None
+
+    def upsert(self, *, namespace: str, vectors):
+        if self.overlapped is None:
+            self.overlapped = self.next_embedding_started.wait(timeout=5)
+        super().upsert(namespace=namespace, vectors=vectors)
+
+
+def test_next_batch_embeds_while_current_batch_is_written():
+    second_started = threading.Event()
+
+    class SignallingEmbeddings:
+        def create(self, model: str, input: List[str]):
+            if input == ["policy text 1"]:
+                second_started.set()
+            return SimpleNamespace(data=[SimpleNamespace(embedding=[1.0]) for _ in input])
+
+    pinecone = FakePineconeClient()
+    pinecone.index = BlockingIndex(second_started)
+    store = _store(SignallingEmbeddings(), pinecone, max_concurrency=1)
+
+    assert store.upsert(_docs(2), namespace="docs", batch_size=1) == 2
+    assert pinecone.index.overlapped is True
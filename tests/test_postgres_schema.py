@@ -0,0 +1,62 @@
+from __future__ import annotations
+
+import asyncio
+from typing import List
+
+from src.ingestion.tabular.loader import _ensure_schema
+from src.persistence.postgres.client import create_async_engine_from_dsn, create_sync_engine_from_dsn
+
+
+class RecordingConnection:
+    def __init__(self, columns=()) -> None:
+        self.statements: List[str] = []
+        self.columns = list(columns)
+
+    async def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        self.statements.append(sql)
+        return self.columns if "information_schema.columns" in sql else []
+
+
+def test_schema_indexes_cover_hot_lookups():
+    conn = RecordingConnection()
+    asyncio.run(_ensure_schema(conn))
+
+    assert "CREATE INDEX IF NOT EXISTS customers_user_id_idx ON customers (user_id)" in conn.statements
+    assert "CREATE INDEX IF NOT EXISTS orders_customer_id_idx ON orders (customer_id)" in conn.statements
+    # The user_id column must exist before it can be indexed
+    alter = conn.statements.index("ALTER TABLE customers ADD COLUMN IF NOT EXISTS user_id TEXT")
+    assert alter < conn.statements.index("CREATE INDEX IF NOT EXISTS customers_user_id_idx ON customers (user_id)")
+
+
+def test_psycopg_engines_prepare_statements_server_side(monkeypatch):
+    captured = {}
+
+    def fake_create_engine(dsn, **kwargs):
+        captured[dsn] = kwargs["connect_args"]
+
+    monkeypatch.setattr("src.persistence.postgres.client._sa_create_async_engine", fake_create_engine)
+    monkeypatch.setattr("src.persistence.postgres.client.create_engine", fake_create_engine)
+
+    create_async_engine_from_dsn("postgresql+psycopg://u:p@db/app", statement_timeout_ms=5000, prepare_threshold=0)
+    create_async_engine_from_dsn("postgresql+asyncpg://u:p@db/app", prepare_threshold=0)
+    create_sync_engine_from_dsn("postgresql+psycopg://u:p@db/sync", prepare_threshold=0)
+
+    assert captured["postgresql+psycopg://u:p@db/app"] == {
+        "options": "-c statement_timeout=5000",
+        "prepare_threshold": 0,
+    }
+    # asyncpg prepares and caches statements on its own
+    assert captured["postgresql+asyncpg://u:p@db/app"] == {}
+    assert captured["postgresql+psycopg://u:p@db/sync"] == {"prepare_threshold": 0}
+
+
+def test_schema_skips_columns_that_already_exist():
+    conn = RecordingConnection(columns=[("customers", "user_id"), ("customers", "passcode"), ("orders", "row_hash")])
+    asyncio.run(_ensure_schema(conn))
+
+    alters = [stmt for stmt in conn.statements if stmt.startswith("ALTER")]
+    assert alters == [
+        "ALTER TABLE customers ADD COLUMN IF NOT EXISTS row_hash TEXT",
+        "ALTER TABLE products ADD COLUMN IF NOT EXISTS row_hash TEXT",
+    ]
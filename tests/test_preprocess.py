@@ -1,6 +1,7 @@
 from pathlib import Path
 
 import pytest
+from langchain.schema import Document
 
 from src.ingestion.documents.loaders import load_from_pdf_dir
 from src.ingestion.documents.preprocess import preprocess_documents
@@ -33,3 +34,21 @@ def test_preprocess_removes_headers_and_hyphenation(pdf_name: str):
 
 
 
+
+
+def test_preprocess_output_matches_previous_implementation():
+    from benchmarks.preprocess import DATA_DIR, reference_preprocess
+
+    header = "Example Retail | Policy Handbook"
+    pages = [
+        f"{header}\r\nPage {i}\n\n\n  Orders are ship-\nped  with\ttracking\u00AD numbers.\x0c\n\x1c\n Footer text \n"
+        for i in range(4)
+    ]
+    docs = load_from_pdf_dir(DATA_DIR) + [
+        Document(page_content=page, metadata={"source": "synthetic.pdf", "page": i}) for i, page in enumerate(pages)
+    ] + [Document(page_content=" \n a-\n-\nb  ", metadata={"source": "edge.pdf"})]
+
+    expected = reference_preprocess(docs)
+    actual = preprocess_documents(docs)
+    assert [d.page_content.encode("utf-8") for d in actual] == [d.page_content.encode("utf-8") for d in expected]
+    assert [d.metadata for d in actual] == [d.metadata for d in expected]
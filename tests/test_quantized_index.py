@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import List
+
+import pytest
+from langchain.schema import Document
+
+from benchmarks.vector_recall import evaluate, synthetic_embeddings
+from src.vectorstores.pinecone_store import PineconeStore
+from src.config.settings import settings
+from src.vectorstores.quantized import LocalVectorClient, local_vector_client
+
+
+class ShortEmbeddings:
+    def __init__(self) -> None:
+        self.dimensions: List[int] = []
+
+    def create(self, model: str, input: List[str], dimensions: int = 1536):
+        self.dimensions.append(dimensions)
+        return SimpleNamespace(
+            data=[SimpleNamespace(embedding=[float(len(text)), 1.0] + [0.0] * (dimensions - 2)) for text in input]
+        )
+
+
+def test_quantized_recall_against_full_precision():
+    vectors = synthetic_embeddings(3050, 256, clusters=40)
+    results = {row["config"]: row for row in evaluate(vectors[50:], vectors[:50], k=10)}
+
+    assert results["float32"]["recall"] == 1.0
+    assert results["int8+rescore"]["recall"] >= 0.99
+    assert results["binary+rescore"]["recall"] >= 0.9
+    # Re-scoring is what keeps binary usable
+    assert results["binary+rescore"]["recall"] > results["binary"]["recall"]
+    assert results["int8"]["scan_mb"] < results["float32"]["scan_mb"] / 3
+    assert results["binary"]["scan_mb"] < results["float32"]["scan_mb"] / 25
+
+
+def test_store_embeds_at_reduced_dimension_into_local_index():
+    embeddings = ShortEmbeddings()
+    client = LocalVectorClient(quantization="int8")
+    store = PineconeStore(
+        "local-index",
+        pinecone_client=client,
+        openai_client=SimpleNamespace(embeddings=embeddings),
+        dimensions=64,
+    )
+    docs = [Document(page_content="x" * n, metadata={"source": f"doc-{n}.txt"}) for n in (10, 40, 90)]
+
+    assert store.upsert(docs, namespace="kb") == 3
+    assert embeddings.dimensions == [64]
+    assert client.list_indexes() == [{"name": "local-index", "dimension": 64}]
+    assert store.embedding_signature.endswith(":64d")
+
+    index = client.Index("local-index")
+    query = [40.0, 1.0] + [0.0] * 62
+    matches = index.query(vector=query, top_k=1, namespace="kb", filter={"sources": "doc-40.txt"}).matches
+    assert [m.metadata["source"] for m in matches] == ["doc-40.txt"]
+    assert abs(matches[0].score - 1.0) < 1e-6
+    assert index.stats("kb")["vectors"] == 3
+
+
+def test_store_rejects_existing_index_of_another_dimension():
+    embeddings = ShortEmbeddings()
+    client = LocalVectorClient(quantization="int8")
+    client.create_index("local-index", 1536)
+    store = PineconeStore(
+        "local-index",
+        pinecone_client=client,
+        openai_client=SimpleNamespace(embeddings=embeddings),
+        dimensions=64,
+    )
+
+    with pytest.raises(ValueError, match="dimension 1536"):
+        store.upsert([Document(page_content="text", metadata={"source": "doc.txt"})], namespace="kb")
+    assert embeddings.dimensions == []
+
+
+def test_local_backend_is_refused_in_prod(monkeypatch):
+    monkeypatch.setattr(settings, "environment", "prod")
+    local_vector_client.cache_clear()
+
+    with pytest.raises(ValueError, match="development and tests"):
+        local_vector_client()
@@ -0,0 +1,86 @@
+"""Exercise the store's Lua scripts directly on fakeredis' embedded Lua interpreter."""
+
+from __future__ import annotations
+
+import json
+import time
+
+import pytest
+
+fakeredis = pytest.importorskip("fakeredis")
+pytest.importorskip("lupa")
+
+from src.persistence.redis import RedisKV, RedisSessionStore
+from src.persistence.redis.store import ESCALATION_REPEAT_WINDOW_SECONDS
+
+
+def _store(recent_window: int = 2) -> RedisSessionStore:
+    client = fakeredis.FakeRedis(decode_responses=True)
+    return RedisSessionStore(
+        "redis://localhost:6379/0",
+        recent_window=recent_window,
+        ttl_days=1,
+        kv_client=RedisKV("redis://localhost:6379/0", client=client),
+    )
+
+
+def test_append_script_numbers_messages_and_spills_to_archive():
+    store = _store(recent_window=2)
+    client = store.kv.client
+    pubsub = client.pubsub()
+    pubsub.subscribe(store.events_channel("s1"))
+    pubsub.get_message(timeout=1)
+
+    store.write_session_meta("s1", {"user_id": "u"})
+    store.commit_turn("s1", {"user_id": "u"}, [{"role": "user", "content": f"m{i}"} for i in range(1, 4)])
+    store.append_message("s1", {})
+
+    assert client.llen("session:s1:messages") == 2
+    assert [entry_id for entry_id, _ in client.xrange("session:s1:archive")] == ["0-1", "0-2"]
+    assert 0 < client.ttl("session:s1:archive") <= 86400
+    history = store.get_all_messages("s1")
+    assert [m["seq"] for m in history] == [1, 2, 3, 4]
+    assert [m.get("content") for m in history] == ["m1", "m2", "m3", None]
+    event = json.loads(pubsub.get_message(timeout=1)["data"])
+    assert event == {"type": "message", "message": {"seq": 1, "role": "user", "content": "m1"}}
+
+
+def test_escalation_scripts_boost_repeats_with_expiring_counts():
+    store = _store()
+    client = store.kv.client
+    for sid in ("first", "billing", "repeat-1", "repeat-2"):
+        store.write_session_meta(sid, {"status": "pending_handoff"})
+
+    store.enqueue_escalation("first", user_id="alice")
+    store.enqueue_escalation("billing", user_id="bob", priority=1)
+    store.enqueue_escalation("repeat-1", user_id="carol")
+    store.enqueue_escalation("repeat-2", user_id="carol")
+    store.enqueue_escalation("anonymous")
+
+    assert client.get("escalations:user_count:carol") == "2"
+    assert 0 < client.ttl("escalations:user_count:carol") <= ESCALATION_REPEAT_WINDOW_SECONDS
+    assert not client.exists("escalations:user_counts")
+    assert store.pop_next_escalation() == "billing"
+    assert store.pop_next_escalation() == "repeat-2"
+    assert client.zcard("escalations:enqueued_at") == 3
+
+    # Once the window lapses the customer is back to base priority
+    client.delete("escalations:user_count:carol")
+    store.enqueue_escalation("repeat-3", user_id="carol")
+    assert client.get("escalations:user_count:carol") == "1"
+    assert [store.pop_next_escalation() for _ in range(4)] == ["first", "repeat-1", "anonymous", "repeat-3"]
+    assert store.pop_next_escalation() is None
+
+
+def test_legacy_pending_escalations_are_drained_on_first_read():
+    store = _store()
+    client = store.kv.client
+    client.sadd("escalations:pending", "old-1", "old-2")
+    client.hset("escalations:user_counts", "carol", 5)
+    for sid in ("old-1", "old-2", "new"):
+        store.write_session_meta(sid, {"status": "pending_handoff"})
+    store.enqueue_escalation("new", priority=1)
+
+    assert [m["session_id"] for m in store.list_escalations()] == ["new", "old-1", "old-2"]
+    assert not client.exists("escalations:pending", "escalations:user_counts")
+    assert store.escalation_queue_stats(now=time.time())["depth"] == 3
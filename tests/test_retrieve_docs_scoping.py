@@ -0,0 +1,116 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional
+
+from langchain.schema import Document
+
+from src.graph.nodes import retrieve_docs
+from src.graph.state import RAGState
+from src.retrievers.scoping import scope_documents
+from src.vectorstores.pinecone_store import PineconeStore
+from src.vectorstores.quantized import LocalVectorClient
+
+
+class BagOfWordsEmbeddings:
+    def create(self, model: str, input: List[str], dimensions: int = 64):
+        rows = []
+        for text in input:
+            row = [0.0] * dimensions
+            for word in re.findall(r"\w+", text.lower()):
+                row[hashlib.md5(word.encode()).digest()[0] % dimensions] += 1.0
+            rows.append(SimpleNamespace(embedding=row))
+        return SimpleNamespace(data=rows)
+
+
+class LocalRetriever:
+    def __init__(self, store: PineconeStore) -> None:
+        self.store = store
+        self.calls: List[tuple] = []
+        self.embedded: List[str] = []
+
+    def embed_query(self, query: str) -> List[float]:
+        self.embedded.append(query)
+        return self.store.embed([query])[0].tolist()
+
+    def retrieve_by_vector(
+        self, vector: List[float], k: int = 10, filter: Optional[Dict[str, Any]] = None
+    ) -> List[Document]:
+        self.calls.append((k, filter))
+        matches = self.store._get_index().query(vector=vector, top_k=k, namespace="kb", filter=filter).matches
+        return [Document(page_content=m.metadata["text"], metadata=m.metadata) for m in matches]
+
+
+def _retriever(monkeypatch) -> LocalRetriever:
+    store = PineconeStore(
+        "kb-index",
+        pinecone_client=LocalVectorClient(quantization="int8"),
+        openai_client=SimpleNamespace(embeddings=BagOfWordsEmbeddings()),
+        dimensions=64,
+    )
+    corpus = {
+        "/app/data/Returns_and_Exchanges_Policy.pdf": [
+            "Items can be returned within 30 days of delivery.",
+            "Damaged items are replaced or refunded after we receive the return.",
+            "Exchanges for a different size are free of charge.",
+            "Return shipping labels are emailed once the return is approved.",
+        ],
+        "/app/data/Shipping_and_Delivery_Policy.pdf": [
+            "Standard delivery takes three to five business days.",
+            "Express shipping arrives the next business day.",
+            "Delayed packages can be tracked from the order page.",
+        ],
+    }
+    store.upsert(
+        [
+            Document(page_content=text, metadata={"source": source, "page": page})
+            for source, texts in corpus.items()
+            for page, text in enumerate(texts)
+        ],
+        namespace="kb",
+    )
+    retriever = LocalRetriever(store)
+    monkeypatch.setattr(retrieve_docs, "_get_retriever", lambda: retriever)
+    monkeypatch.setattr(retrieve_docs, "_get_reranker", lambda: None)
+    return retriever
+
+
+def test_query_type_and_keywords_pick_documents():
+    assert scope_documents("Can I return a damaged item?", "policy_only") == ["Returns_and_Exchanges_Policy.pdf"]
+    assert scope_documents("I was charged twice", "billing_issue") == [
+        "Payment_and_Billing_Policy.pdf",
+        "Returns_and_Exchanges_Policy.pdf",
+    ]
+    assert scope_documents("What can you help me with?", "policy_only") is None
+    # Matching most of the catalogue is not worth a filter
+    assert scope_documents("return, shipping, password and product questions", "policy_only") is None
+
+
+def test_retrieval_is_filtered_to_scoped_documents(monkeypatch):
+    retriever = _retriever(monkeypatch)
+    state = RAGState(query="How do I return a damaged item?", query_type="policy_only", should_retrieve_docs=True)
+
+    state = retrieve_docs.retrieve_docs_node(state)
+
+    assert retriever.calls == [
+        (retrieve_docs.SCOPED_K, {"documents": {"$in": ["Returns_and_Exchanges_Policy.pdf"]}})
+    ]
+    assert len(state.docs) == retrieve_docs.FINAL_K
+    assert {d["source"] for d in state.docs} == {"/app/data/Returns_and_Exchanges_Policy.pdf"}
+
+
+def test_retrieval_widens_when_scoped_hits_are_too_few(monkeypatch):
+    retriever = _retriever(monkeypatch)
+    state = RAGState(query="Is this product in stock?", query_type="policy_only", should_retrieve_docs=True)
+
+    state = retrieve_docs.retrieve_docs_node(state)
+
+    assert [filter for _, filter in retriever.calls] == [
+        {"documents": {"$in": ["Product_Information_Guide.pdf"]}},
+        None,
+    ]
+    # The widened search reuses the scoped query's embedding
+    assert retriever.embedded == [state.query]
+    assert len(state.docs) == retrieve_docs.FINAL_K
@@ -1,8 +1,9 @@
 from __future__ import annotations
 
-from unittest.mock import patch
+import asyncio
+from unittest.mock import AsyncMock, patch
 
-from src.graph.nodes.retrieve_sql import retrieve_sql_node
+from src.graph.nodes.retrieve_sql import aretrieve_sql_node, retrieve_sql_node
 from src.graph.state import RAGState
 
 
@@ -57,3 +58,19 @@ def test_no_order_id_skips_lookup(mock_get_order):
     mock_get_order.assert_not_called()
     assert result.sql_rows == []
     assert result.order_id is None
+
+
+@patch("src.graph.nodes.retrieve_sql.get_order_for_user")
+@patch("src.graph.nodes.retrieve_sql.aget_order_for_user", new_callable=AsyncMock)
+def test_async_lookup_uses_shared_async_engine(mock_aget_order, mock_get_order):
+    engine = object()
+    mock_aget_order.return_value = {"order_id": 7, "first_name": "Alice"}
+
+    state = make_state("order #7")
+    state.pg_engine = engine
+    result = asyncio.run(aretrieve_sql_node(state))
+
+    mock_aget_order.assert_awaited_once_with(engine, state.user_id, 7)
+    mock_get_order.assert_not_called()
+    assert result.sql_rows[0]["order_id"] == 7
+    assert result.first_name == "Alice"
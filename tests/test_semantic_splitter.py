@@ -0,0 +1,76 @@
+from __future__ import annotations
+
+from types import SimpleNamespace
+from typing import List
+
+import numpy as np
+from langchain.schema import Document
+
+from src.ingestion.documents.semantic import SemanticSplitter
+from src.vectorstores.pinecone_store import PineconeStore
+from tests.utils.pinecone_stubs import FakePineconeClient
+
+
+class TopicEmbeddings:
+    """Embeds a sentence on the axis of the topic it mentions."""
+
+    TOPICS = ("refund", "shipping", "warranty")
+
+    def __init__(self) -> None:
+        self.texts: List[str] = []
+
+    def create(self, model: str, input: List[str]):
+        self.texts.extend(input)
+        data = []
+        for text in input:
+            vector = [float(topic in text.lower()) for topic in self.TOPICS]
+            data.append(SimpleNamespace(embedding=vector))
+        return SimpleNamespace(data=data)
+
+
+TEXT = (
+    "Refunds go back to the original card. A refund takes five days. Refund fees are never charged. "
+    "Shipping is free over $50. Shipping takes three days. Express shipping costs extra. "
+    "The warranty lasts a year. The warranty covers defects."
+)
+
+
+def _store(embeddings: TopicEmbeddings) -> PineconeStore:
+    return PineconeStore(
+        "test-index",
+        pinecone_client=FakePineconeClient(),
+        openai_client=SimpleNamespace(embeddings=embeddings),
+    )
+
+
+def test_breaks_on_topic_shift_and_reuses_sentence_embeddings():
+    embeddings = TopicEmbeddings()
+    store = _store(embeddings)
+    splitter = SemanticSplitter(store, buffer_size=0, breakpoint_percentile=50)
+    doc = Document(page_content=TEXT, metadata={"source": "policy.pdf", "page": 3})
+
+    chunks = splitter.split_documents([doc])
+
+    assert [chunk.page_content.split()[0] for chunk in chunks] == ["Refunds", "Shipping", "The"]
+    assert all(chunk.metadata == {"source": "policy.pdf", "page": 3} for chunk in chunks)
+    sentences = len(embeddings.texts)
+    assert sentences == 8
+
+    # Chunk vectors come from the sentence embeddings; upsert sends nothing new
+    assert store.upsert(chunks, namespace="docs") == 3
+    assert len(embeddings.texts) == sentences
+    stored = store._get_index().storage["docs"]
+    shipping = next(v for v in stored.values() if v["metadata"]["text"].startswith("Shipping"))
+    assert np.allclose(shipping["values"], [0.0, 1.0, 0.0])
+
+
+def test_exact_mode_embeds_chunks_at_upsert():
+    embeddings = TopicEmbeddings()
+    store = _store(embeddings)
+    splitter = SemanticSplitter(store, buffer_size=0, breakpoint_percentile=50, derive_chunk_embeddings=False)
+
+    chunks = splitter.split_documents([Document(page_content=TEXT, metadata={"source": "policy.pdf"})])
+    store.upsert(chunks, namespace="docs")
+
+    assert embeddings.texts[8:] == [chunk.page_content for chunk in chunks]
+    assert splitter.fingerprint == "numpy-semantic:b0:p50:exact"
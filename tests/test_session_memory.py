@@ -1,115 +1,45 @@
 from __future__ import annotations
 
+import asyncio
+import time
 from copy import deepcopy
 from datetime import datetime, timezone
 from types import SimpleNamespace
 from typing import Any, Dict, Iterable, List, Optional
 
-from src.persistence.redis import RedisKV, RedisSessionStore
-from src.persistence.mongo import Mongo, ObjectId, ReturnDocument
-
-
-class FakePipeline:
-    def __init__(self, client: "FakeRedis") -> None:
-        self.client = client
+import fakeredis
 
-    def lpush(self, key: str, value: str) -> "FakePipeline":
-        self.client.lpush(key, value)
-        return self
-
-    def ltrim(self, key: str, start: int, end: int) -> "FakePipeline":
-        self.client.ltrim(key, start, end)
-        return self
+from src.persistence.redis import RedisKV, RedisSessionStore
+from src.persistence.mongo import AsyncMongo, BulkWriteError, Mongo, ObjectId, ReturnDocument
 
-    def expire(self, key: str, ttl: int) -> "FakePipeline":
-        self.client.expire(key, ttl)
-        return self
 
-    def execute(self) -> List[Any]:
-        return []
+class FakeRedis(fakeredis.FakeRedis):
+    """In-memory Redis that runs the store's Lua scripts for real.
 
-    def __enter__(self) -> "FakePipeline":
-        return self
+    Each instance gets its own server. ``pipeline_executions`` and
+    ``mget_calls`` count round trips for the batching tests.
+    """
 
-    def __exit__(self, exc_type, exc, tb) -> None:
-        # No transactional behaviour to emulate
-        return None
+    def __init__(self, server: Optional["fakeredis.FakeServer"] = None) -> None:
+        self.server = server or fakeredis.FakeServer()
+        super().__init__(server=self.server, decode_responses=True)
+        self.pipeline_executions = 0
+        self.mget_calls = 0
 
+    def pipeline(self, transaction: bool = True, shard_hint: Any = None):
+        pipe = super().pipeline(transaction, shard_hint)
+        execute = pipe.execute
 
-class FakeRedis:
-    def __init__(self) -> None:
-        self.kv: Dict[str, str] = {}
-        self.lists: Dict[str, List[str]] = {}
-        self.expirations: Dict[str, int] = {}
-        self.sets: Dict[str, set] = {}
-
-    # Redis client interface -------------------------------------------------
-    def get(self, key: str) -> Optional[str]:
-        return self.kv.get(key)
-
-    def set(self, key: str, value: str, ex: Optional[int] = None) -> None:
-        self.kv[key] = value
-        if ex is not None:
-            self.expirations[key] = ex
-
-    def lpush(self, key: str, value: str) -> int:
-        items = self.lists.setdefault(key, [])
-        items.insert(0, value)
-        return len(items)
-
-    def ltrim(self, key: str, start: int, end: int) -> None:
-        items = self.lists.get(key, [])
-        if end == -1:
-            end = len(items) - 1
-        end = min(end, len(items) - 1)
-        self.lists[key] = items[start : end + 1] if items else []
-
-    def lrange(self, key: str, start: int, end: int) -> List[str]:
-        items = self.lists.get(key, [])
-        if end == -1:
-            end = len(items) - 1
-        if end < start:
-            return []
-        return items[start : end + 1]
-
-    def expire(self, key: str, ttl: int) -> None:
-        self.expirations[key] = ttl
-
-    def delete(self, *keys: str) -> None:
-        for key in keys:
-            self.kv.pop(key, None)
-            self.lists.pop(key, None)
-            self.expirations.pop(key, None)
-            self.sets.pop(key, None)
-            # remove from sets containing key entries
-        for s_key, values in list(self.sets.items()):
-            if not values:
-                continue
-            before = len(values)
-            values.difference_update(keys)
-            if not values or len(values) != before:
-                self.sets[s_key] = values
+        def counted(*args: Any, **kwargs: Any) -> List[Any]:
+            self.pipeline_executions += 1
+            return execute(*args, **kwargs)
 
-    def pipeline(self) -> FakePipeline:
-        return FakePipeline(self)
+        pipe.execute = counted
+        return pipe
 
-    def sadd(self, key: str, *values: str) -> int:
-        current = self.sets.setdefault(key, set())
-        before = len(current)
-        current.update(values)
-        return len(current) - before
-
-    def smembers(self, key: str):
-        return set(self.sets.get(key, set()))
-
-    def srem(self, key: str, value: str) -> None:
-        values = self.sets.get(key)
-        if values is not None:
-            values.discard(value)
-
-    # Compatibility with FastAPI teardown ------------------------------------
-    def close(self) -> None:
-        pass
+    def mget(self, keys: Any, *args: Any) -> List[Optional[str]]:
+        self.mget_calls += 1
+        return super().mget(keys, *args)
 
 
 class FakeCursor:
@@ -143,10 +73,15 @@ class FakeCursor:
 class FakeCollection:
     def __init__(self) -> None:
         self.docs: List[Dict[str, Any]] = []
+        self.indexes: List[Any] = []
+        self.dropped_indexes: List[str] = []
 
     # Indexes ----------------------------------------------------------------
     def create_indexes(self, indexes: Iterable[Any]) -> None:
-        return None
+        self.indexes.extend(indexes)
+
+    def drop_index(self, name: str) -> None:
+        self.dropped_indexes.append(name)
 
     # Helpers ----------------------------------------------------------------
     def _clone(self, doc: Dict[str, Any]) -> Dict[str, Any]:
@@ -154,10 +89,20 @@ class FakeCollection:
 
     def _matches(self, doc: Dict[str, Any], criteria: Dict[str, Any]) -> bool:
         for key, expected in criteria.items():
+            if key == "$or":
+                if not any(self._matches(doc, option) for option in expected):
+                    return False
+                continue
             value = doc.get(key)
             if isinstance(expected, dict):
+                if "$exists" in expected and (key in doc) != expected["$exists"]:
+                    return False
                 if "$ne" in expected and value == expected["$ne"]:
                     return False
+                if "$gt" in expected:
+                    compare = expected["$gt"]
+                    if value is None or not value > compare:
+                        return False
                 if "$lt" in expected:
                     compare = expected["$lt"]
                     if value is None or not value < compare:
@@ -191,7 +136,21 @@ class FakeCollection:
         self.docs.append(record)
         return SimpleNamespace(inserted_id=record["_id"])
 
-    def find_one(self, criteria: Dict[str, Any]):
+    def insert_many(self, docs: List[Dict[str, Any]], ordered: bool = True):
+        # Emulates the unique (session_id, seq) index on messages
+        inserted_ids: List[Any] = []
+        for index, doc in enumerate(docs):
+            if "seq" in doc and self._find_doc({"session_id": doc.get("session_id"), "seq": doc["seq"]}):
+                raise BulkWriteError(
+                    {"writeErrors": [{"index": index, "code": 11000}], "nInserted": len(inserted_ids)}
+                )
+            inserted_ids.append(self.insert_one(doc).inserted_id)
+        return SimpleNamespace(inserted_ids=inserted_ids)
+
+    def find_one(self, criteria: Dict[str, Any], projection: Optional[Dict[str, Any]] = None, sort=None):
+        if sort:
+            docs = list(self.find(criteria).sort(sort).limit(1))
+            return docs[0] if docs else None
         doc = self._find_doc(criteria)
         return self._clone(doc) if doc else None
 
@@ -228,8 +187,10 @@ class FakeCollection:
             self._apply_update(record, remaining)
         return SimpleNamespace(matched_count=0, upserted_id=record["_id"])
 
-    def find(self, criteria: Dict[str, Any]):
+    def find(self, criteria: Dict[str, Any], projection: Optional[Dict[str, Any]] = None):
         results = [self._clone(doc) for doc in self.docs if self._matches(doc, criteria)]
+        if projection:
+            results = [{k: v for k, v in doc.items() if k == "_id" or k in projection} for doc in results]
         return FakeCursor(results)
 
     def count_documents(self, criteria: Dict[str, Any]) -> int:
@@ -265,6 +226,68 @@ class FakeMongoClient:
         self.databases.clear()
 
 
+class FakeAsyncCursor:
+    def __init__(self, cursor: FakeCursor) -> None:
+        self._cursor = cursor
+
+    def sort(self, key, direction: int | None = None) -> "FakeAsyncCursor":
+        self._cursor.sort(key, direction)
+        return self
+
+    def limit(self, count: int) -> "FakeAsyncCursor":
+        self._cursor.limit(count)
+        return self
+
+    async def to_list(self, length: Optional[int] = None) -> List[Dict[str, Any]]:
+        docs = list(self._cursor)
+        return docs if length is None else docs[:length]
+
+
+class FakeAsyncCollection:
+    """Awaitable view over a FakeCollection, mirroring pymongo's async API."""
+
+    def __init__(self, collection: FakeCollection) -> None:
+        self.collection = collection
+
+    def find(self, criteria: Dict[str, Any], projection: Optional[Dict[str, Any]] = None) -> FakeAsyncCursor:
+        return FakeAsyncCursor(self.collection.find(criteria, projection))
+
+    def __getattr__(self, name: str):
+        method = getattr(self.collection, name)
+
+        async def call(*args: Any, **kwargs: Any) -> Any:
+            return method(*args, **kwargs)
+
+        return call
+
+
+class FakeAsyncAdmin:
+    async def command(self, _: str) -> Dict[str, Any]:
+        return {"ok": 1}
+
+
+class FakeAsyncMongoClient:
+    """Async client sharing storage with a FakeMongoClient so tests can assert either way."""
+
+    def __init__(self, sync_client: Optional[FakeMongoClient] = None) -> None:
+        self.sync_client = sync_client or FakeMongoClient()
+        self.admin = FakeAsyncAdmin()
+
+    def __getitem__(self, name: str) -> "FakeAsyncDatabase":
+        return FakeAsyncDatabase(self.sync_client[name])
+
+    async def close(self) -> None:
+        return None
+
+
+class FakeAsyncDatabase:
+    def __init__(self, database: FakeDatabase) -> None:
+        self.database = database
+
+    def __getitem__(self, name: str) -> FakeAsyncCollection:
+        return FakeAsyncCollection(self.database[name])
+
+
 def _build_session_store(recent_window: int = 3, ttl_days: int = 1) -> RedisSessionStore:
     fake_client = FakeRedis()
     kv = RedisKV("redis://localhost:6379/0", client=fake_client)
@@ -285,7 +308,7 @@ def test_redis_session_store_keeps_recent_messages():
     meta = store.read_session_meta("sess-1")
     assert meta is not None
     assert meta["user_id"] == "user-1"
-    assert redis_client.expirations["session:sess-1"] == 86400
+    assert redis_client.ttl("session:sess-1") == 86400
 
     for idx in range(4):
         store.append_message(
@@ -295,11 +318,40 @@ def test_redis_session_store_keeps_recent_messages():
 
     recent = store.get_recent_messages("sess-1")
     assert [msg["content"] for msg in recent] == ["msg-1", "msg-2", "msg-3"]
-    assert redis_client.expirations["session:sess-1:messages"] == 86400
+    assert redis_client.ttl("session:sess-1:messages") == 86400
 
     store.delete_session("sess-1")
     assert store.read_session_meta("sess-1") is None
-    assert redis_client.lists.get("session:sess-1:messages") is None
+    assert not redis_client.exists("session:sess-1:messages")
+
+
+def test_redis_message_window_spills_to_archive_stream():
+    store = _build_session_store(recent_window=2, ttl_days=1)
+    redis_client: FakeRedis = store.kv.client  # type: ignore[assignment]
+
+    store.write_session_meta("sess-4", {"user_id": "u"})
+    for idx in range(1, 6):
+        store.append_message("sess-4", {"role": "user", "content": f"msg-{idx}"})
+
+    assert redis_client.llen("session:sess-4:messages") == 2
+    assert redis_client.xlen("session:sess-4:archive") == 3
+    assert redis_client.ttl("session:sess-4:archive") == 86400
+
+    history = store.get_all_messages("sess-4")
+    assert [m["content"] for m in history] == [f"msg-{idx}" for idx in range(1, 6)]
+    assert [m["seq"] for m in history] == [1, 2, 3, 4, 5]
+    assert [m["content"] for m in store.get_all_messages("sess-4", limit=3)] == ["msg-3", "msg-4", "msg-5"]
+    assert [m["content"] for m in store.get_recent_messages("sess-4")] == ["msg-4", "msg-5"]
+
+    page, cursor = store.page_messages("sess-4", limit=2)
+    assert [m["seq"] for m in page] == [4, 5] and cursor == 4
+    page, cursor = store.page_messages("sess-4", limit=2, before=cursor)
+    assert [m["seq"] for m in page] == [2, 3] and cursor == 2
+    page, cursor = store.page_messages("sess-4", limit=2, before=cursor)
+    assert [m["seq"] for m in page] == [1] and cursor is None
+
+    store.delete_session("sess-4")
+    assert store.get_all_messages("sess-4") == []
 
 
 def test_redis_touch_session_refreshes_ttl():
@@ -310,12 +362,147 @@ def test_redis_touch_session_refreshes_ttl():
     store.append_message("sess-2", {"role": "user", "content": "hello"})
 
     # Simulate TTL decay then touch to refresh
-    redis_client.expirations["session:sess-2"] = 10
-    redis_client.expirations["session:sess-2:messages"] = 10
+    redis_client.expire("session:sess-2", 10)
+    redis_client.expire("session:sess-2:messages", 10)
 
     store.touch_session("sess-2")
-    assert redis_client.expirations["session:sess-2"] == 172800
-    assert redis_client.expirations["session:sess-2:messages"] == 172800
+    assert redis_client.ttl("session:sess-2") == 172800
+    assert redis_client.ttl("session:sess-2:messages") == 172800
+
+
+def test_redis_turn_context_and_commit_use_single_round_trips():
+    store = _build_session_store(recent_window=3, ttl_days=1)
+    redis_client: FakeRedis = store.kv.client  # type: ignore[assignment]
+
+    meta, recent = store.load_turn_context("sess-3")
+    assert meta is None and recent == []
+
+    store.commit_turn(
+        "sess-3",
+        {"user_id": "u", "status": "active"},
+        [
+            {"role": "assistant", "content": "greeting"},
+            {"role": "user", "content": "question"},
+            {"role": "assistant", "content": "answer"},
+        ],
+        user_id="u",
+        escalate=True,
+    )
+    assert redis_client.pipeline_executions == 2
+    assert redis_client.ttl("session:sess-3") == 86400
+    assert redis_client.ttl("session:sess-3:messages") == 86400
+    assert redis_client.smembers("user_sessions:u") == {"sess-3"}
+    assert redis_client.zrange("escalations:queue", 0, -1) == ["sess-3"]
+
+    store.commit_turn("sess-3", {"user_id": "u", "status": "active"}, [{"role": "user", "content": "again"}])
+    meta, recent = store.load_turn_context("sess-3")
+    assert redis_client.pipeline_executions == 4
+    assert meta is not None and meta["session_id"] == "sess-3"
+    assert [msg["content"] for msg in recent] == ["question", "answer", "again"]
+
+
+def test_redis_listings_use_mget_and_scan_pages():
+    store = _build_session_store()
+    redis_client: FakeRedis = store.kv.client  # type: ignore[assignment]
+
+    for idx in range(5):
+        sid = f"esc-{idx}"
+        store.write_session_meta(sid, {"user_id": "u", "status": "pending_handoff"})
+        store.register_session(sid, "u")
+        store.enqueue_escalation(sid)
+    # An id whose meta expired is skipped and pruned from the index
+    store.enqueue_escalation("esc-expired")
+
+    store.register_session("expired", "u")
+
+    seen = []
+    cursor = 0
+    while True:
+        cursor, page = store.scan_sessions("u", cursor=cursor, count=3)
+        seen.extend(m["session_id"] for m in page)
+        if cursor == 0:
+            break
+    assert sorted(seen) == [f"esc-{idx}" for idx in range(5)]
+    assert "expired" not in redis_client.smembers("user_sessions:u")
+    mget_calls = redis_client.mget_calls
+
+    cursor, page = store.scan_escalations(count=4)
+    assert cursor is not None
+    assert [m["session_id"] for m in page] == ["esc-0", "esc-1", "esc-2", "esc-3"]
+    cursor, page = store.scan_escalations(cursor=cursor, count=4)
+    assert cursor is None
+    assert [m["session_id"] for m in page] == ["esc-4"]
+    assert "esc-expired" not in redis_client.zrange("escalations:queue", 0, -1)
+    assert redis_client.mget_calls == mget_calls + 2
+
+
+def test_escalation_cursor_survives_claims_between_polls():
+    store = _build_session_store()
+    redis_client: FakeRedis = store.kv.client  # type: ignore[assignment]
+    for idx in range(6):
+        sid = f"esc-{idx}"
+        store.write_session_meta(sid, {"status": "pending_handoff"})
+        store.enqueue_escalation(sid)
+    # Give two entries the same score so the cursor has to break the tie by id
+    redis_client.zadd("escalations:queue", {"esc-0": 0, "esc-1": 1, "esc-2": 2, "esc-3": 2, "esc-4": 4, "esc-5": 5})
+
+    cursor, page = store.scan_escalations(count=3)
+    assert [m["session_id"] for m in page] == ["esc-0", "esc-1", "esc-2"]
+    store.dequeue_escalations(["esc-0", "esc-1"])
+
+    cursor, page = store.scan_escalations(cursor=cursor, count=3)
+    assert [m["session_id"] for m in page] == ["esc-3", "esc-4", "esc-5"]
+    assert cursor is None
+
+
+def test_mongo_archive_messages_is_bulk_and_idempotent():
+    mongo = _build_mongo()
+    mongo.create_session("sess-arch", "user-1")
+    history = [
+        {"seq": idx, "role": "user", "content": f"m{idx}", "created_at": f"2024-01-01T00:00:0{idx}+00:00"}
+        for idx in range(1, 4)
+    ]
+
+    assert mongo.archive_messages("sess-arch", history, user_id="user-1") == 3
+    # A retried close with a longer history only adds the missing suffix
+    history.append({"seq": 4, "role": "assistant", "content": "m4"})
+    assert mongo.archive_messages("sess-arch", history, user_id="user-1") == 1
+    assert mongo.archive_messages("sess-arch", history, user_id="user-1") == 0
+    assert [m["seq"] for m in mongo.get_messages("sess-arch", limit=10)] == [1, 2, 3, 4]
+
+    # A concurrent close raced past the seq lookup: duplicates are skipped
+    messages = mongo.messages()
+    messages.find_one = lambda *args, **kwargs: None  # type: ignore[method-assign]
+    history.append({"seq": 5, "role": "user", "content": "m5"})
+    assert mongo.archive_messages("sess-arch", history, user_id="user-1") == 1
+    assert mongo.count_messages("sess-arch") == 5
+
+
+def test_redis_escalation_queue_orders_by_priority_and_wait():
+    store = _build_session_store()
+    redis_client: FakeRedis = store.kv.client  # type: ignore[assignment]
+
+    for sid in ("first", "billing", "repeat"):
+        store.write_session_meta(sid, {"user_id": sid, "status": "pending_handoff"})
+    store.enqueue_escalation("first", user_id="alice")
+    store.enqueue_escalation("billing", user_id="bob", priority=1)
+    # Carol escalated before, so her new session gets a repeat boost
+    redis_client.incr("escalations:user_count:carol")
+    store.enqueue_escalation("repeat", user_id="carol")
+
+    assert [m["session_id"] for m in store.list_escalations()] == ["billing", "repeat", "first"]
+
+    stats = store.escalation_queue_stats(now=time.time() + 1000)
+    assert stats["depth"] == 3
+    assert stats["oldest_wait_seconds"] >= 1000
+    assert stats["waiting_over_seconds"] == {"300": 3, "900": 3, "1800": 0}
+
+    assert store.pop_next_escalation() == "billing"
+    store.dequeue_escalation("repeat")
+    assert store.pop_next_escalation() == "first"
+    assert store.pop_next_escalation() is None
+    assert store.escalation_queue_stats()["depth"] == 0
+    assert redis_client.zcard("escalations:enqueued_at") == 0
 
 
 def _build_mongo() -> Mongo:
@@ -323,6 +510,16 @@ def _build_mongo() -> Mongo:
     return Mongo("mongodb://localhost:27017", client=fake_client)
 
 
+def test_mongo_message_indexes_drop_redundant_prefix():
+    mongo = _build_mongo()
+    messages = mongo.messages()
+
+    names = [index.document["name"] for index in messages.indexes]
+    assert "session_id_1_created_at_1__id_1" in names
+    assert "session_id_1_created_at_1" not in names
+    assert messages.dropped_indexes == ["session_id_1_created_at_1"]
+
+
 def test_mongo_session_crud_and_messages():
     mongo = _build_mongo()
 
@@ -358,3 +555,59 @@ def test_mongo_session_crud_and_messages():
     assert summary_doc["summary"] == "Issue resolved"
     assert summary_doc["user_id"] == "user-123"
     assert mongo.get_session_summary("sess-A") == "Issue resolved"
+
+
+def test_async_mongo_matches_sync_store():
+    sync_client = FakeMongoClient()
+    mongo = AsyncMongo("mongodb://localhost:27017", client=FakeAsyncMongoClient(sync_client))
+
+    async def scenario() -> None:
+        await mongo.ensure_indexes()
+        session = await mongo.create_session("sess-B", "user-9", metadata={"channel": "web"})
+        assert session["status"] == "active"
+
+        await mongo.append_message("sess-B", "user", "Hi", user_id="user-9")
+        archived = await mongo.archive_messages(
+            "sess-B",
+            [{"seq": 2, "role": "assistant", "content": "Hello!"}],
+            user_id="user-9",
+        )
+        assert archived == 1
+        assert await mongo.count_messages("sess-B") == 2
+        history = await mongo.get_messages("sess-B")
+        assert [msg["content"] for msg in history] == ["Hi", "Hello!"]
+
+        assert [doc["session_id"] for doc in await mongo.list_sessions("user-9")] == ["sess-B"]
+        await mongo.close_session("sess-B", summary="Done")
+        assert await mongo.list_sessions("user-9") == []
+        assert await mongo.get_session_summary("sess-B") == "Done"
+
+    asyncio.run(scenario())
+    # Both stores read the same documents
+    sync_mongo = Mongo("mongodb://localhost:27017", client=sync_client)
+    assert sync_mongo.get_session("sess-B")["status"] == "closed"
+
+
+def test_mongo_keyset_cursor_pages_messages_sharing_a_timestamp():
+    mongo = _build_mongo()
+    mongo.create_session("sess-K", "user-1")
+    same_ts = datetime(2024, 1, 1, tzinfo=timezone.utc)
+    for idx in range(7):
+        mongo.append_message("sess-K", "user", f"m{idx}", created_at=same_ts, metadata={"n": idx})
+    mongo.messages().docs[0]["internal"] = "not returned"
+
+    seen: List[str] = []
+    cursor = None
+    pages = 0
+    while True:
+        page, cursor = mongo.get_messages_page("sess-K", limit=3, cursor=cursor)
+        pages += 1
+        seen = [doc["content"] for doc in page] + seen
+        assert all("internal" not in doc for doc in page)
+        if cursor is None:
+            break
+    assert pages == 3
+    assert seen == [f"m{idx}" for idx in range(7)]
+
+    # Legacy timestamp cursors keep working
+    assert mongo.get_messages("sess-K", cursor="2024-01-02T00:00:00+00:00")[0]["content"] == "m0"
@@ -6,8 +6,8 @@ from app.api.main import create_app
 from app.api.deps import get_mongo, get_session_store, get_semantic_cache
 from src.cache.pinecone_semantic import PineconeSemanticCache
 from src.persistence.redis import RedisKV, RedisSessionStore
-from src.persistence.mongo import Mongo
-from tests.test_session_memory import FakeMongoClient, FakeRedis
+from src.persistence.mongo import AsyncMongo, Mongo
+from tests.test_session_memory import FakeAsyncMongoClient, FakeMongoClient, FakeRedis
 from tests.utils.pinecone_stubs import FakeOpenAI, FakePineconeClient
 
 
@@ -44,7 +44,8 @@ def test_session_crud_endpoints():
     semantic_cache = _build_semantic_cache()
 
     app.dependency_overrides[get_session_store] = lambda: session_store
-    app.dependency_overrides[get_mongo] = lambda: mongo
+    async_mongo = AsyncMongo("mongodb://localhost:27017", client=FakeAsyncMongoClient(mongo.client))
+    app.dependency_overrides[get_mongo] = lambda: async_mongo
     app.dependency_overrides[get_semantic_cache] = lambda: semantic_cache
 
     client = TestClient(app)
@@ -118,3 +119,40 @@ def test_session_crud_endpoints():
         json={"user_id": "bob", "session_id": session_id},
     )
     assert conflict.status_code == 409
+
+
+def test_message_cursor_carries_across_archive():
+    app = create_app()
+    session_store = _build_session_store()
+    mongo = _build_mongo()
+    app.dependency_overrides[get_session_store] = lambda: session_store
+    app.dependency_overrides[get_mongo] = lambda: AsyncMongo(
+        "mongodb://localhost:27017", client=FakeAsyncMongoClient(mongo.client)
+    )
+    client = TestClient(app)
+
+    session_id = client.post("/v1/sessions", json={"user_id": "alice"}).json()["session_id"]
+    for idx in range(1, 6):
+        session_store.append_message(
+            session_id,
+            {"role": "user", "content": f"m{idx}", "created_at": f"2024-01-01T00:00:0{idx}+00:00"},
+        )
+
+    def page(cursor=None):
+        params = {"user_id": "alice", "limit": 2, **({"cursor": cursor} if cursor else {})}
+        body = client.get(f"/v1/sessions/{session_id}/messages", params=params).json()
+        return [m["content"] for m in body["messages"]], body["next_cursor"]
+
+    contents, cursor = page()
+    assert contents == ["m4", "m5"]
+    assert cursor == "r:4"
+
+    client.post(f"/v1/sessions/{session_id}/close", params={"user_id": "alice"}, json={})
+
+    # The live-session cursor resumes on the archived copy by seq
+    contents, cursor = page(cursor)
+    assert contents == ["m2", "m3"]
+    assert cursor.startswith("m:")
+    contents, cursor = page(cursor)
+    assert contents == ["m1"]
+    assert cursor is None
@@ -0,0 +1,187 @@
+from __future__ import annotations
+
+import asyncio
+import types
+from contextlib import asynccontextmanager
+from datetime import date
+from decimal import Decimal
+from typing import Any, Dict, List
+
+import pytest
+
+from src.ingestion.tabular.columnar import iter_column_batches
+from src.ingestion.tabular.loader import ADDED_COLUMNS, CUSTOMER_COLUMNS, SCHEMA_INDEXES, load_csvs
+
+
+class FakeAsyncpgConnection:
+    def __init__(self) -> None:
+        self.copied: Dict[str, Dict[str, Any]] = {}
+
+    async def copy_records_to_table(self, table, *, records, columns):
+        assert not isinstance(records, list), "records should be streamed, not materialised"
+        rows = list(records)
+        self.copied[table] = {"columns": columns, "rows": rows}
+        return f"COPY {len(rows)}"
+
+
+class FakeResult(list):
+    def __init__(self, rows=(), rowcount: int = -1) -> None:
+        super().__init__(rows)
+        self.rowcount = rowcount
+
+
+class FakeConnection:
+    def __init__(self) -> None:
+        self.statements: List[str] = []
+        self.transactions: List[List[str]] = []
+        self.dialect = types.SimpleNamespace(driver="asyncpg")
+        self.driver = FakeAsyncpgConnection()
+        self.merge_rowcount = 0
+        # (table, column) pairs and index names the fake database already has
+        self.columns: List[tuple] = []
+        self.indexes: List[str] = []
+
+    async def execute(self, statement, params=None):
+        sql = " ".join(str(statement).split())
+        self.statements.append(sql)
+        if self.transactions:
+            self.transactions[-1].append(sql)
+        if "information_schema.columns" in sql:
+            return FakeResult(self.columns)
+        if "pg_indexes" in sql:
+            return FakeResult([(name,) for name in self.indexes])
+        return FakeResult(rowcount=self.merge_rowcount if "ON CONFLICT" in sql else -1)
+
+    async def get_raw_connection(self):
+        return types.SimpleNamespace(driver_connection=self.driver)
+
+
+class FakeEngine:
+    def __init__(self) -> None:
+        self.conn = FakeConnection()
+
+    @asynccontextmanager
+    async def begin(self):
+        self.conn.transactions.append([])
+        yield self.conn
+
+
+def test_copy_mode_streams_coerced_rows():
+    engine = FakeEngine()
+    total = asyncio.run(
+        load_csvs(
+            engine,
+            "data/fake_customers.csv",
+            "data/fake_orders.csv",
+            "data/fake_products.csv",
+            mode="copy",
+        )
+    )
+
+    copied = engine.conn.driver.copied
+    assert total == 200 + 1000 + 778
+    assert copied["customers"]["columns"] == CUSTOMER_COLUMNS
+    first_customer = copied["customers"]["rows"][0]
+    assert first_customer[0] == 1
+    # Login columns are derived when the CSV has none
+    assert first_customer[-2:] == ("dmadocjones0@oracle.com", "12345")
+
+    order = copied["orders"]["rows"][0]
+    assert order == (1, 121, 1, 6, date(2023, 8, 25), date(2023, 8, 28))
+    assert copied["products"]["rows"][0][-1] == Decimal("2.99")
+    assert "TRUNCATE TABLE orders RESTART IDENTITY CASCADE" in engine.conn.statements
+
+
+def test_copy_mode_checks_files_before_truncating():
+    engine = FakeEngine()
+    with pytest.raises(FileNotFoundError):
+        asyncio.run(load_csvs(engine, orders_path="data/missing.csv", mode="copy"))
+    assert not any(stmt.startswith("TRUNCATE") for stmt in engine.conn.statements)
+
+
+def test_unknown_mode_is_rejected():
+    with pytest.raises(ValueError):
+        asyncio.run(load_csvs(FakeEngine(), mode="bulk"))
+
+
+def test_upsert_mode_merges_changed_rows_without_truncating():
+    engine = FakeEngine()
+    engine.conn.merge_rowcount = 3
+    total = asyncio.run(
+        load_csvs(engine, "data/fake_customers.csv", "data/fake_orders.csv", mode="upsert")
+    )
+
+    statements = engine.conn.statements
+    assert total == 6  # changed rows only, as reported by each merge
+    assert not any(stmt.startswith("TRUNCATE") for stmt in statements)
+    assert set(engine.conn.driver.copied) == {"customers_stage", "orders_stage"}
+    assert len(engine.conn.driver.copied["orders_stage"]["rows"]) == 1000
+
+    merge = next(stmt for stmt in statements if stmt.startswith("INSERT INTO orders"))
+    assert "FROM orders_stage" in merge
+    assert "ON CONFLICT (order_id) DO UPDATE SET customer_id = EXCLUDED.customer_id" in merge
+    assert "WHERE orders.row_hash IS DISTINCT FROM EXCLUDED.row_hash" in merge
+    # Customers are merged before the orders that reference them
+    customers_merge = next(i for i, stmt in enumerate(statements) if stmt.startswith("INSERT INTO customers"))
+    assert customers_merge < statements.index(merge)
+
+
+def test_upsert_merge_transaction_issues_no_ddl():
+    engine = FakeEngine()
+    engine.conn.columns = list(ADDED_COLUMNS)
+    engine.conn.indexes = list(SCHEMA_INDEXES)
+    asyncio.run(load_csvs(engine, "data/fake_customers.csv", "data/fake_orders.csv", mode="upsert"))
+
+    schema, merge = engine.conn.transactions
+    # Columns and indexes already exist, so nothing that locks a table runs
+    assert not any(stmt.startswith(("ALTER", "CREATE INDEX")) for stmt in schema)
+    assert any(stmt.startswith("INSERT INTO orders") for stmt in merge)
+    # Only session-local staging tables are created while merging
+    ddl = [stmt for stmt in merge if stmt.startswith(("ALTER", "CREATE", "DROP", "TRUNCATE"))]
+    assert ddl and all(stmt.startswith("CREATE TEMP TABLE") for stmt in ddl)
+
+
+def test_independent_files_are_parsed_in_a_process_pool(monkeypatch):
+    monkeypatch.setattr("src.ingestion.tabular.loader.PARALLEL_PARSE_MIN_BYTES", 0)
+    engine = FakeEngine()
+    total = asyncio.run(
+        load_csvs(engine, "data/fake_customers.csv", products_path="data/fake_products.csv", mode="copy", chunk_rows=64)
+    )
+
+    copied = engine.conn.driver.copied
+    assert total == 200 + 778
+    assert copied["customers"]["rows"][-1][0] == 200
+    assert copied["products"]["rows"][0][-1] == Decimal("2.99")
+
+
+def test_column_batches_mask_empty_typed_cells(tmp_path):
+    path = tmp_path / "orders.csv"
+    path.write_text(
+        "order_id,customer_id,note,order_date\n"
+        '1,7,"Suite 5, rear",2024-01-02\n'
+        "2,,x,\n"
+    )
+    types_ = {"order_id": "int", "customer_id": "int", "order_date": "date"}
+    (batch,) = list(iter_column_batches(str(path), types_))
+
+    assert batch.columns["order_id"].dtype == "int64"
+    assert list(batch.records(["order_id", "customer_id", "order_date", "product_id"])) == [
+        (1, 7, date(2024, 1, 2), None),
+        (2, None, None, None),
+    ]
+
+
+def test_column_batches_keep_hashes_and_quoted_commas(tmp_path):
+    path = tmp_path / "customers.csv"
+    path.write_text(
+        "customer_id,first_name,last_name,passcode\n"
+        '1,"Widget #5, large",O\'Neil,pa#ss\n'
+        '2,"Say ""hi""",#hash,"a,b#c"\n'
+    )
+    types_ = {"customer_id": "int", "first_name": "text", "last_name": "text", "passcode": "text"}
+    (batch,) = list(iter_column_batches(str(path), types_))
+
+    assert list(batch.records(["customer_id", "first_name", "last_name", "passcode"])) == [
+        (1, "Widget #5, large", "O'Neil", "pa#ss"),
+        (2, 'Say "hi"', "#hash", "a,b#c"),
+    ]
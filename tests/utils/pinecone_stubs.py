@@ -61,9 +61,18 @@ class FakePineconeIndex:
             ns.pop(vector_id, None)
 
 
+    def update(self, *, id: str, set_metadata: Dict[str, Any], namespace: str) -> None:
+        vector = self.storage.get(namespace, {}).get(id)
+        if vector is not None:
+            vector["metadata"].update(set_metadata)
+
+
 class FakePineconeClient:
     def __init__(self) -> None:
         self.index = FakePineconeIndex()
 
     def Index(self, _: str) -> FakePineconeIndex:
         return self.index
+
+    def list_indexes(self) -> List[Dict[str, Any]]:
+        return [{"name": "test-index"}]